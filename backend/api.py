@@ -4,7 +4,9 @@ FastAPI Backend for Legal AI.d - Nigerian Tax Reform Acts RAG Integration
 This API provides endpoints for the React Native mobile app to query the RAG system.
 """
 
+import os
 import sys
+import logging
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -28,15 +30,32 @@ load_dotenv(Path(__file__).parent.parent / ".env.backend")
 
 # Import RAG components
 try:
-    from retriever import TaxActRetriever
+    from retriever import TaxActRetriever, cosine_score
     from generator import RAGPipeline
+    import tracing
+    from request_log import get_request_log, build_record
 except ImportError as e:
     print(f"Error importing RAG modules: {e}")
     print("Make sure you're running from the correct directory")
     sys.exit(1)
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Log lines carry the request ID of the request they belong to
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
+    format="%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+)
+tracing.install_log_filter()
+logger = logging.getLogger("api")
+
+# Routes written to the structured request log (see scripts/analyze_request_log.py)
+LOGGED_ROUTES = ("/chat", "/search")
+request_log = get_request_log()
+
+# Initialize rate limiter (RATE_LIMIT_ENABLED=false for local load tests)
+limiter = Limiter(
+    key_func=get_remote_address,
+    enabled=os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -56,8 +75,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID", "traceparent"],
 )
 
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Trace each request and return its request ID and trace context in the response headers."""
+    with tracing.start_trace(
+        f"{request.method} {request.url.path}",
+        request_id=request.headers.get("x-request-id"),
+        traceparent=request.headers.get("traceparent"),
+        attributes={"http.request.method": request.method, "url.path": request.url.path}
+    ) as root:
+        response = await call_next(request)
+        root.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 500:
+            root.set_status("ERROR", f"HTTP {response.status_code}")
+
+    response.headers["X-Request-ID"] = root.trace.request_id
+    response.headers["traceparent"] = tracing.traceparent(root)
+
+    if request_log and request.url.path in LOGGED_ROUTES and request.method == "POST":
+        # Endpoints leave the query and its classification in request.state
+        request_log.log(build_record(
+            request.url.path,
+            response.status_code,
+            root,
+            query=getattr(request.state, "query", None),
+            query_type=getattr(request.state, "query_type", None),
+            chunks=getattr(request.state, "chunks", None)
+        ))
+    return response
+
 # Global RAG pipeline instance (initialized once)
 rag_pipeline = None
 
@@ -97,14 +146,21 @@ async def startup_event():
 
     print("🔧 Initializing RAG pipeline...")
     try:
-        # Use FAISS backend (ChromaDB has dimension issues)
-        retriever = TaxActRetriever(top_k=5, use_chromadb=False)
+        # Both backends search the same OpenAI vectors; see benchmarks/bench_backends.py
+        use_chromadb = os.getenv("VECTOR_BACKEND", "faiss").lower() == "chromadb"
+        retriever = TaxActRetriever(top_k=5, use_chromadb=use_chromadb)
         rag_pipeline = RAGPipeline(retriever)
         print("✅ RAG pipeline initialized successfully!")
     except Exception as e:
         print(f"❌ Error initializing RAG pipeline: {e}")
         print("API will run but RAG features will be disabled")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Write out buffered request log records."""
+    if request_log:
+        request_log.close()
+
 @app.get("/", include_in_schema=False)
 async def root_redirect():
     """Redirect to simple frontend."""
@@ -194,6 +250,7 @@ async def chat(request: Request, chat_request: ChatRequest):
             )
 
         message = chat_request.message.strip()
+        request.state.query = message
 
         if not message:
             raise HTTPException(
@@ -201,8 +258,10 @@ async def chat(request: Request, chat_request: ChatRequest):
                 detail="Message cannot be empty"
             )
 
-        # Check if query is tax-related
-        if not is_tax_related_query(message):
+        # Check if query is tax-related (or asks for a term the Acts define)
+        if not is_tax_related_query(message) and not rag_pipeline.definitions.match_question(message):
+            request.state.query_type = "non_tax_related"
+            request.state.chunks = 0
             return {
                 "answer": (
                     "I specialize in Nigerian tax law, particularly the Tax Reform Acts 2025-2026. "
@@ -226,6 +285,9 @@ async def chat(request: Request, chat_request: ChatRequest):
 
         # Use RAG pipeline to answer
         result = rag_pipeline.query(message, temperature=0.1)
+        query_type = "definition" if result.get("finish_reason") == "definition" else "tax_related"
+        request.state.query_type = query_type
+        request.state.chunks = result.get("retrieved_chunks", 0)
 
         # Format response
         return {
@@ -237,14 +299,14 @@ async def chat(request: Request, chat_request: ChatRequest):
             "metadata": {
                 "model": result.get("model"),
                 "tokens_used": result.get("tokens_used"),
-                "query_type": "tax_related"
+                "query_type": query_type
             }
         }
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error processing chat request: {e}")
+        logger.exception("Error processing chat request: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing request: {str(e)}"
@@ -265,18 +327,26 @@ async def search_documents(request: Request, query: str, top_k: int = 5):
             )
 
         # Retrieve relevant chunks
+        request.state.query = query
+        request.state.query_type = "search"
         results = rag_pipeline.retriever.retrieve(query)
+        request.state.chunks = min(len(results), top_k)
 
         # Format results
         chunks = []
         for result in results[:top_k]:
+            # Results merged across collections carry the score they were ranked by
+            if "score" in result:
+                relevance = result["score"]
+            else:
+                relevance = cosine_score(result.get("distance", 0.0), rag_pipeline.retriever.metric)
             chunks.append({
                 "text": result.get("text", ""),
                 "document": result.get("metadata", {}).get("document_name", ""),
                 "section": result.get("metadata", {}).get("section_number", ""),
                 "title": result.get("metadata", {}).get("section_title", ""),
                 "page": result.get("metadata", {}).get("page_start", ""),
-                "relevance_score": float(result.get("distance", 0.0))
+                "relevance_score": float(relevance)
             })
 
         return {
@@ -289,7 +359,7 @@ async def search_documents(request: Request, query: str, top_k: int = 5):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error processing search request: {e}")
+        logger.exception("Error processing search request: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error processing request: {str(e)}"
@@ -305,7 +375,20 @@ async def get_stats():
                 "message": "RAG system not initialized"
             }
 
-        # Get index metadata
+        # Describe the index version the retriever loaded
+        manifest = rag_pipeline.retriever.manifest
+        if manifest:
+            return {
+                "status": "online",
+                "total_chunks": manifest.get("chunk_count", 0),
+                "embedding_model": manifest.get("model", "unknown"),
+                "embedding_dimension": manifest.get("dimension", 0),
+                "index_version": manifest.get("version", "unknown"),
+                "last_updated": manifest.get("timestamp", "unknown"),
+                "timezone": manifest.get("timezone", "Africa/Lagos")
+            }
+
+        # Unversioned index: fall back to the flat index metadata
         embeddings_dir = Path(__file__).parent.parent / "data" / "embeddings"
         metadata_file = embeddings_dir / "index_metadata.json"
 
@@ -350,7 +433,6 @@ async def not_found_handler(request: Request, exc):
     }
 
 if __name__ == "__main__":
-    import os
     port = int(os.getenv("PORT", 8000))
 
     print("=" * 70)
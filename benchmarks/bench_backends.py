@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the retriever's vector backends.
+Compares FAISS (exact L2) and ChromaDB (HNSW) on the same vectors, queried by
+embedding exactly as TaxActRetriever does: latency percentiles for single and
+batched queries, ChromaDB with a native metadata filter, and ChromaDB's
+recall against the exact FAISS results.
+"""
+
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from typing import List, Dict, Any, Callable
+
+import numpy as np
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    import faiss
+    import chromadb
+except ImportError as e:
+    print(f"❌ Error: Missing required library: {e}")
+    print("Run: pip install -r requirements.txt")
+    sys.exit(1)
+
+from retriever import chroma_where
+
+DOCUMENTS = [f"act_{i}.pdf" for i in range(8)]
+BATCH_SIZE = 1000
+
+def make_vectors(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+    """
+    Build unit vectors clustered by document, like embeddings of related chunks.
+
+    Args:
+        count: Number of vectors
+        dimension: Vector dimension
+        seed: Random seed
+
+    Returns:
+        float32 array of shape (count, dimension)
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((len(DOCUMENTS), dimension))
+    vectors = centers[np.arange(count) % len(DOCUMENTS)] + 0.8 * rng.standard_normal((count, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+def percentiles(timings: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 and mean of timings, in milliseconds."""
+    ordered = sorted(timings)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "mean": statistics.mean(ordered) * 1000}
+
+def time_calls(func: Callable[[Any], Any], inputs: List[Any]) -> List[float]:
+    """Time func on each input, after one warm-up call."""
+    func(inputs[0])
+    timings = []
+    for item in inputs:
+        start = time.perf_counter()
+        func(item)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def main():
+    """Run the benchmark."""
+    arg_parser = argparse.ArgumentParser(description="Benchmark FAISS against ChromaDB")
+    arg_parser.add_argument("--chunks", type=int, default=10000, help="Vectors in the index (default: 10000)")
+    arg_parser.add_argument("--dimension", type=int, default=1536, help="Vector dimension (default: 1536)")
+    arg_parser.add_argument("--queries", type=int, default=200, help="Timed queries (default: 200)")
+    arg_parser.add_argument("--batch", type=int, default=16, help="Queries per batched call (default: 16)")
+    arg_parser.add_argument("--top-k", type=int, default=5, help="Results per query (default: 5)")
+    args = arg_parser.parse_args()
+
+    print("=" * 70)
+    print("Vector Backend Benchmark")
+    print("=" * 70)
+
+    vectors = make_vectors(args.chunks, args.dimension)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32) / np.sqrt(args.dimension)
+    batches = [queries[i:i + args.batch] for i in range(0, len(queries) - args.batch + 1, args.batch)]
+
+    faiss_index = faiss.IndexFlatL2(args.dimension)
+    faiss_index.add(vectors)
+
+    chroma_dir = Path(tempfile.mkdtemp(prefix="bench_chroma_"))
+    try:
+        start = time.perf_counter()
+        collection = chromadb.PersistentClient(path=str(chroma_dir)).create_collection(name="bench")
+        for i in range(0, len(vectors), BATCH_SIZE):
+            ids = range(i, min(i + BATCH_SIZE, len(vectors)))
+            collection.add(
+                ids=[str(j) for j in ids],
+                embeddings=vectors[i:i + BATCH_SIZE].tolist(),
+                documents=[f"chunk {j}" for j in ids],
+                metadatas=[{"document_name": DOCUMENTS[j % len(DOCUMENTS)]} for j in ids]
+            )
+        chroma_build = time.perf_counter() - start
+
+        include = ["documents", "metadatas", "distances"]
+        where = chroma_where({"document_name": DOCUMENTS[:2]})
+
+        def faiss_search(batch):
+            return faiss_index.search(np.asarray(batch, dtype=np.float32).reshape(-1, args.dimension), args.top_k)
+
+        def chroma_search(batch, where=None):
+            return collection.query(
+                query_embeddings=np.asarray(batch).reshape(-1, args.dimension).tolist(),
+                n_results=args.top_k,
+                where=where,
+                include=include
+            )
+
+        rows = [
+            ("FAISS single", time_calls(faiss_search, list(queries)), 1),
+            ("ChromaDB single", time_calls(chroma_search, list(queries)), 1),
+            (f"FAISS batch of {args.batch}", time_calls(faiss_search, batches), args.batch),
+            (f"ChromaDB batch of {args.batch}", time_calls(chroma_search, batches), args.batch),
+            ("ChromaDB filtered", time_calls(lambda batch: chroma_search(batch, where), list(queries)), 1),
+        ]
+
+        # HNSW is approximate: measure how many exact neighbours it finds
+        _, exact = faiss_search(queries)
+        approximate = chroma_search(queries)["ids"]
+        recall = np.mean([
+            len({str(j) for j in exact[q]} & set(approximate[q])) / args.top_k for q in range(len(queries))
+        ])
+
+        print(f"Vectors: {args.chunks:,} x {args.dimension}  Queries: {len(queries)}  Top-k: {args.top_k}")
+        print(f"ChromaDB build: {chroma_build:.1f}s  ChromaDB recall@{args.top_k} vs exact FAISS: {recall:.3f}")
+        print()
+        print(f"{'Variant':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'Queries/sec':>13}")
+        for name, timings, per_call in rows:
+            stats = percentiles(timings)
+            rate = per_call * len(timings) / sum(timings)
+            print(f"{name:<24}{stats['p50']:>9.2f}{stats['p95']:>9.2f}{stats['p99']:>9.2f}{rate:>13,.0f}")
+        print()
+        print("Latencies exclude the query embedding request, which both backends share.")
+    finally:
+        shutil.rmtree(chroma_dir, ignore_errors=True)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark for ChunkStore.
+Compares the retriever's columnar chunk store against the original list of
+chunk dictionaries: memory, objects tracked by the garbage collector, load
+time and the cost of building search results.
+"""
+
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from pathlib import Path
+from typing import List, Dict, Any
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from chunk_store import ChunkStore
+
+CHUNKS_FILE = Path(__file__).parent.parent / "data" / "processed" / "chunks.jsonl"
+
+def make_corpus(chunk_count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Build a corpus by repeating the real chunks with unique hashes and texts.
+
+    Args:
+        chunk_count: Number of chunks
+        seed: Random seed
+
+    Returns:
+        List of chunk dictionaries
+    """
+    with open(CHUNKS_FILE, 'r', encoding='utf-8') as f:
+        templates = [json.loads(line) for line in f if line.strip()]
+
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(chunk_count):
+        chunk = dict(rng.choice(templates))
+        chunk["text"] = f"[{i}] {chunk['text']}"
+        chunk["hash"] = f"{i:032x}"
+        corpus.append(chunk)
+    return corpus
+
+def measure(build):
+    """Return (result, bytes retained, GC-tracked objects added, seconds) for a builder."""
+    gc.collect()
+    start = time.perf_counter()
+    build()
+    elapsed = time.perf_counter() - start
+
+    # Memory is traced on a second build, since tracing slows allocation down
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated, len(gc.get_objects()) - objects_before, elapsed
+
+def best_of(func, repeat: int) -> float:
+    """Return the fastest of several timed runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    """Run the benchmark."""
+    arg_parser = argparse.ArgumentParser(description="Benchmark columnar chunk storage")
+    arg_parser.add_argument("--chunks", type=int, default=100000, help="Chunks in the corpus (default: 100000)")
+    arg_parser.add_argument("--results", type=int, default=20000, help="Search results to build (default: 20000)")
+    args = arg_parser.parse_args()
+
+    if not CHUNKS_FILE.exists():
+        print(f"❌ Error: {CHUNKS_FILE} not found. Run 03_make_chunks.py first.")
+        return 1
+
+    print("=" * 70)
+    print("Chunk Store Benchmark")
+    print("=" * 70)
+
+    corpus = make_corpus(args.chunks)
+    lines = [json.dumps(chunk, ensure_ascii=False) for chunk in corpus]
+    del corpus
+
+    dicts, dict_bytes, dict_objects, dict_time = measure(lambda: [json.loads(line) for line in lines])
+    store, store_bytes, store_objects, store_time = measure(
+        lambda: ChunkStore.from_chunks(json.loads(line) for line in lines)
+    )
+
+    # Every field must read back exactly
+    for row in range(0, len(dicts), max(1, len(dicts) // 1000)):
+        expected = {key: value for key, value in dicts[row].items() if key != "text"}
+        assert store.view(row).to_dict() == expected, f"metadata differs at row {row}"
+        assert store.text(row) == dicts[row]["text"], f"text differs at row {row}"
+
+    rows = [random.randrange(len(dicts)) for _ in range(args.results)]
+
+    def dict_results():
+        return [{"text": dicts[row]["text"], "metadata": dicts[row]} for row in rows]
+
+    def store_results():
+        return [{"text": store.text(row), "metadata": store.view(row)} for row in rows]
+
+    def read_citation(results):
+        return [(r["metadata"].get("document_name"), r["metadata"].get("page_start")) for r in results]
+
+    dict_query_time = best_of(lambda: read_citation(dict_results()), 5)
+    store_query_time = best_of(lambda: read_citation(store_results()), 5)
+
+    print(f"Chunks: {len(dicts):,}  Text: {len(store.text_buffer) / 1e6:.1f} MB UTF-8")
+    print()
+    print(f"{'Variant':<20}{'Memory (MB)':>13}{'GC objects':>13}{'Load (ms)':>11}{'Results (ms)':>14}")
+    for name, allocated, objects, load_time, query_time in [
+        ("list of dicts", dict_bytes, dict_objects, dict_time, dict_query_time),
+        ("ChunkStore", store_bytes, store_objects, store_time, store_query_time),
+    ]:
+        print(f"{name:<20}{allocated / 1e6:>13.1f}{objects:>13,}{load_time * 1000:>11.0f}{query_time * 1000:>14.1f}")
+    print()
+    print(f"Memory: {dict_bytes / store_bytes:.1f}x smaller, "
+          f"GC-tracked objects: {dict_objects:,} -> {store_objects:,}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark for SemanticChunker.
+Compares the token-sized chunker (precompiled feature scanner, single hash per
+chunk, linear overlap) against the original character-sized chunker with
+per-chunk regex scans on a large synthetic section.
+"""
+
+import re
+import sys
+import statistics
+import time
+import random
+import argparse
+import importlib
+from pathlib import Path
+from typing import List, Dict, Any
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+make_chunks = importlib.import_module("03_make_chunks")
+SemanticChunker = make_chunks.SemanticChunker
+
+SENTENCES = [
+    "The taxable income of a company for a year of assessment shall be computed in accordance with this Act.",
+    "In this Act, \"digital asset\" means a digital representation of value that can be traded or transferred.",
+    "Value added tax shall be charged at the rate of 7.5% on the supply of taxable goods and services.",
+    "Companies with turnover below ₦50,000,000 are exempt, unless the Service directs otherwise.",
+    "A return shall be filed not later than 30 June 2026 or such other date as the Minister may prescribe.",
+    "The rates of 10%, 15% and 25% apply to the bands specified in the Fourth Schedule.",
+    "Section 23 of the Companies Income Tax Act is hereby amended by substituting a new subsection.",
+    "Notwithstanding the provisions of subsection (1), the Service may grant an extension of time.",
+    "Any person who fails to comply shall be liable to a penalty of NGN 100,000 for the first month.",
+    "The Board shall consist of the Chairman and one representative of each State.",
+]
+
+# Fields the legacy chunker never produced
+CHUNKER_ONLY_FIELDS = {"token_count", "tokenizer", "section_id", "section_start", "section_end"}
+
+class LegacySemanticChunker(SemanticChunker):
+    """Original implementation: regexes compiled per call, hash computed twice, quadratic overlap."""
+
+    def normalize_text(self, text: str) -> str:
+        text = re.sub(r'\s+', ' ', text)
+        text = re.sub(r'[^\w\s.,;:!?\-()]', '', text)
+        return text.strip().lower()
+
+    def is_duplicate(self, text: str, threshold: float = 0.95) -> bool:
+        chunk_hash = self.compute_hash(text)
+        if chunk_hash in self.seen_hashes:
+            return True
+        self.seen_hashes.add(chunk_hash)
+        return False
+
+    def chunk_sentences(self, sentences, section, document_context):
+        chunks = []
+        current_chunk = []
+        current_size = 0
+
+        for sentence in sentences:
+            sentence_size = len(sentence)
+            if current_size + sentence_size > self.chunk_size and current_chunk:
+                chunk_text = " ".join(current_chunk)
+                if not self.is_duplicate(chunk_text):
+                    chunks.append(self.create_chunk_metadata(chunk_text, section, document_context))
+
+                overlap_size = 0
+                overlap_sentences = []
+                for sent in reversed(current_chunk):
+                    if overlap_size + len(sent) <= self.overlap:
+                        overlap_sentences.insert(0, sent)
+                        overlap_size += len(sent)
+                    else:
+                        break
+
+                current_chunk = overlap_sentences
+                current_size = overlap_size
+
+            current_chunk.append(sentence)
+            current_size += sentence_size
+
+        if current_chunk:
+            chunk_text = " ".join(current_chunk)
+            if not self.is_duplicate(chunk_text):
+                chunks.append(self.create_chunk_metadata(chunk_text, section, document_context))
+
+        return chunks
+
+    def create_chunk_metadata(self, text, section, document_context, chunk_hash=None):
+        return {
+            "text": text.strip(),
+            "document_name": document_context["document_name"],
+            "document_type": document_context["document_type"],
+            "section_type": section.get("type", ""),
+            "section_number": str(section.get("number", "")),
+            "section_title": section.get("title", ""),
+            "page_start": section.get("page_start", 0),
+            "page_end": section.get("page_end", 0),
+            "char_count": len(text),
+            "word_count": len(text.split()),
+            "hash": self.compute_hash(text),
+            "contains_definition": self.contains_definition(text),
+            "contains_rate": self.contains_rate(text),
+            "contains_date": self.contains_date(text),
+            "contains_amount": self.contains_amount(text),
+            "uncertainty_notes": self.detect_uncertainties(text)
+        }
+
+    def contains_definition(self, text: str) -> bool:
+        patterns = [
+            r'means\s+',
+            r'refers to\s+',
+            r'includes\s+',
+            r'["""].*?["""].*?(?:means|refers|includes)'
+        ]
+        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+
+    def contains_rate(self, text: str) -> bool:
+        return bool(re.search(r'\d+(?:\.\d+)?%|\d+\s*per\s*cent', text, re.IGNORECASE))
+
+    def contains_date(self, text: str) -> bool:
+        patterns = [
+            r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
+            r'\d{4}[-/]\d{1,2}[-/]\d{1,2}',
+            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
+            r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}'
+        ]
+        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+
+    def contains_amount(self, text: str) -> bool:
+        patterns = [
+            r'₦\s*\d+(?:,\d{3})*(?:\.\d{2})?',
+            r'NGN\s*\d+(?:,\d{3})*(?:\.\d{2})?',
+            r'Naira\s+\d+(?:,\d{3})*(?:\.\d{2})?'
+        ]
+        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+
+    def detect_uncertainties(self, text: str, features=None) -> List[str]:
+        notes = []
+        if re.search(r'(?:may|might|could|should|would|uncertain|unclear|subject to)', text, re.IGNORECASE):
+            notes.append("Contains conditional or uncertain language")
+        rates = re.findall(r'(\d+(?:\.\d+)?%)', text)
+        if len(rates) > 2:
+            # Originally joined in set order; sorted here so runs are comparable
+            notes.append(f"Multiple rates mentioned: {', '.join(sorted(set(rates)))}")
+        if re.search(r'(?:amend|repeal|replace|substitute|modify|change)', text, re.IGNORECASE):
+            notes.append("Contains amendments or changes to existing law")
+        if re.search(r'(?:except|unless|provided that|save|notwithstanding)', text, re.IGNORECASE):
+            notes.append("Contains exceptions or special conditions")
+        return notes
+
+def make_synthetic_section(sentence_count: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Build one large section from varied legal sentences.
+
+    A counter is mixed into each sentence so chunks are not deduplicated away.
+
+    Args:
+        sentence_count: Number of sentences
+        seed: Random seed
+
+    Returns:
+        Section dictionary
+    """
+    rng = random.Random(seed)
+    sentences = []
+    for i in range(sentence_count):
+        sentence = rng.choice(SENTENCES)
+        sentences.append(f"Paragraph {i}: {sentence}")
+
+    return {
+        "type": "section",
+        "number": "1",
+        "title": "Synthetic Provisions",
+        "page_start": 1,
+        "page_end": 1,
+        "content": " ".join(sentences)
+    }
+
+def comparable(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sort the rate lists inside uncertainty notes so outputs can be compared."""
+    result = []
+    for chunk in chunks:
+        chunk = {key: value for key, value in chunk.items() if key not in CHUNKER_ONLY_FIELDS}
+        notes = []
+        for note in chunk["uncertainty_notes"]:
+            if note.startswith("Multiple rates mentioned: "):
+                rates = note[len("Multiple rates mentioned: "):].split(", ")
+                note = "Multiple rates mentioned: " + ", ".join(sorted(rates))
+            notes.append(note)
+        result.append({**chunk, "uncertainty_notes": notes})
+    return result
+
+def best_of(func, repeat: int) -> float:
+    """Return the fastest of several timed runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    """Run the benchmark."""
+    arg_parser = argparse.ArgumentParser(description="Benchmark semantic chunking")
+    arg_parser.add_argument("--sentences", type=int, default=50000, help="Sentences in the section (default: 50000)")
+    arg_parser.add_argument("--chunk-size", type=int, default=800,
+                            help="Legacy chunk size in characters (default: 800)")
+    arg_parser.add_argument("--overlap", type=int, default=200, help="Legacy overlap in characters (default: 200)")
+    arg_parser.add_argument("--chunk-tokens", type=int, default=make_chunks.CHUNK_TOKENS,
+                            help=f"Chunk size in tokens (default: {make_chunks.CHUNK_TOKENS})")
+    arg_parser.add_argument("--overlap-tokens", type=int, default=make_chunks.CHUNK_OVERLAP_TOKENS,
+                            help=f"Overlap in tokens (default: {make_chunks.CHUNK_OVERLAP_TOKENS})")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Timed runs per variant (default: 3)")
+    args = arg_parser.parse_args()
+
+    print("=" * 70)
+    print("Semantic Chunker Benchmark")
+    print("=" * 70)
+
+    section = make_synthetic_section(args.sentences)
+    document_context = {"document_name": "synthetic.pdf", "document_type": "primary_legislation"}
+
+    def run_legacy():
+        chunker = LegacySemanticChunker(chunk_size=args.chunk_size, overlap=args.overlap)
+        return chunker.create_chunks_from_section(section, document_context)
+
+    def run_new():
+        chunker = SemanticChunker(chunk_size=args.chunk_tokens, overlap=args.overlap_tokens)
+        return chunker.create_chunks_from_section(section, document_context)
+
+    legacy_chunks = run_legacy()
+    chunks = run_new()
+
+    # Same chunk text must yield the same metadata as the original detectors
+    legacy_chunker = LegacySemanticChunker()
+    legacy_metadata = [
+        legacy_chunker.create_chunk_metadata(chunk["text"], section, document_context) for chunk in chunks
+    ]
+    assert comparable(legacy_metadata) == comparable(chunks), "chunk metadata differs from legacy implementation"
+
+    legacy_time = best_of(run_legacy, args.repeat)
+    new_time = best_of(run_new, args.repeat)
+
+    counter = SemanticChunker().counter
+    print(f"Sentences: {args.sentences:,}  Characters: {len(section['content']):,}  Tokenizer: {counter.name}")
+    print()
+    print(f"{'Variant':<28}{'Chunks':>8}{'Time (ms)':>12}{'Chunks/sec':>13}{'Speedup':>10}"
+          f"{'Max tok':>9}{'Tok stdev':>11}")
+    for name, elapsed, variant_chunks in [
+        (f"legacy ({args.chunk_size} chars)", legacy_time, legacy_chunks),
+        (f"tokens ({args.chunk_tokens} tokens)", new_time, chunks),
+    ]:
+        token_counts = [counter.count(chunk["text"]) for chunk in variant_chunks]
+        rate = len(variant_chunks) / elapsed
+        print(f"{name:<28}{len(variant_chunks):>8,}{elapsed * 1000:>12.1f}{rate:>13,.0f}"
+              f"{rate / (len(legacy_chunks) / legacy_time):>9.2f}x"
+              f"{max(token_counts):>9}{statistics.pstdev(token_counts):>11.1f}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Offline retrieval benchmark for TaxActRetriever.
+Runs a labelled query set against the published index under several
+retrieval configurations and reports recall@k, hit rate, MRR and latency
+percentiles, writing everything to JSON so runs can be compared.
+
+Queries are embedded without network access: either replayed from the
+persistent embedding cache (--record fills it once through the API), or
+with a local hashing embedder that also re-embeds the chunks, which
+measures the retrieval machinery rather than the embedding model.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import importlib
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Set
+
+import numpy as np
+
+# Add src, scripts and tests directories to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "tests"))
+
+import faiss
+
+from retriever import TaxActRetriever
+from embedding_cache import EmbeddingCache, text_key
+from providers import get_provider, hashed_embedding
+
+DEFAULT_OUTPUT = Path(__file__).parent / "retrieval_results.json"
+
+# Retrieval configurations: TaxActRetriever keyword arguments
+CONFIGURATIONS = {
+    "faiss": {"use_chromadb": False},
+    "faiss_no_expansion": {"use_chromadb": False, "use_query_expansion": False},
+    "faiss_mmr": {"use_chromadb": False, "use_mmr": True},
+    "faiss_small_to_big": {"use_chromadb": False, "small_to_big": True},
+    "chromadb": {"use_chromadb": True},
+}
+
+WHITESPACE = re.compile(r"\s+")
+
+class HashingEmbedder:
+    """Local bag-of-words embedder: hashed unigrams and bigrams, log term frequency, unit length."""
+
+    name = "hashed"
+
+    def __init__(self, dimension: int = 1024):
+        """
+        Initialize embedder.
+
+        Args:
+            dimension: Vector dimension
+        """
+        self.dimension = dimension
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """Embed texts."""
+        return [hashed_embedding(text, self.dimension) for text in texts]
+
+class CacheEmbedder:
+    """Replays query embeddings from the persistent embedding cache, optionally recording misses."""
+
+    name = "cache"
+
+    def __init__(self, model: str, record: bool = False):
+        """
+        Initialize embedder.
+
+        Args:
+            model: Embedding model the index was built with
+            record: Embed cache misses through the OpenAI API and store them
+        """
+        self.model = model
+        self.record = record
+        self.cache = EmbeddingCache()
+        self.provider = get_provider("openai") if record else None
+
+    def embed(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embed texts from the cache.
+
+        Raises:
+            KeyError: If a text is not cached and recording is off
+        """
+        keys = [text_key(text) for text in texts]
+        found = self.cache.get_many(keys, self.model, 0)
+        missing = [text for text, key in zip(texts, keys) if key not in found]
+
+        if missing and not self.record:
+            raise KeyError(
+                f"{len(missing)} queries have no cached embedding for {self.model} "
+                f"(first: {missing[0]!r}); run once with --record"
+            )
+        if missing:
+            created = [np.array(embedding, dtype=np.float32) for embedding in self.provider.embed(missing, self.model)]
+            self.cache.put_many(zip((text_key(text) for text in missing), created), self.model, 0)
+            found.update(zip((text_key(text) for text in missing), created))
+
+        return [found[key] for key in keys]
+
+class OfflineRetriever(TaxActRetriever):
+    """TaxActRetriever whose queries (and optionally chunks) are embedded by a benchmark embedder."""
+
+    def __init__(self, embedder, reindex: bool = False, **kwargs):
+        """
+        Initialize retriever.
+
+        Args:
+            embedder: HashingEmbedder or CacheEmbedder
+            reindex: Replace the FAISS index with the embedder's vectors of the chunks
+            **kwargs: TaxActRetriever arguments
+        """
+        self.embedder = embedder
+        self.query_vectors: Dict[str, np.ndarray] = {}
+        # The labels cover the Acts only, and --reindex does not re-embed the knowledge base
+        kwargs.setdefault("kb_top_k", 0)
+        super().__init__(**kwargs)
+
+        if reindex:
+            vectors = np.array(
+                self.embedder.embed([self.chunks.text(row) for row in range(len(self.chunks))]),
+                dtype=np.float32
+            )
+            self.faiss_index = faiss.IndexFlatL2(vectors.shape[1])
+            self.faiss_index.add(vectors)
+            self.embeddings = vectors
+
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Embed queries with the benchmark embedder, once per distinct text."""
+        missing = [query for query in dict.fromkeys(queries) if query not in self.query_vectors]
+        if missing:
+            self.query_vectors.update(zip(missing, self.embedder.embed(missing)))
+        return [self.query_vectors[query] for query in queries]
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace for passage matching."""
+    return WHITESPACE.sub(" ", text).strip().lower()
+
+def result_hash(result: Dict[str, Any]) -> str:
+    """Chunk hash of a search result (FAISS metadata, or the ChromaDB id)."""
+    return result["metadata"].get("hash") or result.get("id", "").split("_")[0]
+
+def relevant_hashes(retriever: TaxActRetriever, query: Dict[str, Any]) -> Set[str]:
+    """
+    Resolve a query's labels to the indexed chunks they designate.
+
+    Args:
+        retriever: Loaded retriever
+        query: Labelled query (with expected_text)
+
+    Returns:
+        Hashes of indexed chunks containing an expected passage
+    """
+    passages = [normalize(passage) for passage in query.get("expected_text", [])]
+    hashes = set()
+    for row in range(len(retriever.chunks)):
+        if any(passage in normalize(retriever.chunks.text(row)) for passage in passages):
+            hashes.add(retriever.chunks.get(row, "hash", ""))
+    return hashes
+
+def percentiles(timings: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 and mean of timings, in milliseconds."""
+    ordered = sorted(timings)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "mean": statistics.mean(ordered) * 1000}
+
+def evaluate(
+    retriever: TaxActRetriever,
+    queries: List[Dict[str, Any]],
+    ks: List[int],
+    repeat: int
+) -> Dict[str, Any]:
+    """
+    Run the labelled queries and score them.
+
+    Args:
+        retriever: Retriever configured for one variant (top_k >= max(ks))
+        queries: Labelled queries
+        ks: Cut-offs for recall and hit rate
+        repeat: Timed runs per query (after one untimed run that embeds it)
+
+    Returns:
+        Metrics dictionary
+    """
+    timings = []
+    per_query = []
+
+    for query in queries:
+        relevant = relevant_hashes(retriever, query)
+        results = retriever.retrieve(query["question"])
+        for _ in range(repeat):
+            start = time.perf_counter()
+            retriever.retrieve(query["question"])
+            timings.append(time.perf_counter() - start)
+
+        ranked = [result_hash(result) for result in results]
+        first = next((rank for rank, chunk_hash in enumerate(ranked, 1) if chunk_hash in relevant), None)
+        per_query.append({
+            "id": query["id"],
+            "relevant": len(relevant),
+            "first_relevant_rank": first,
+            "recall": {str(k): len(relevant & set(ranked[:k])) / len(relevant) if relevant else 0.0 for k in ks},
+            "retrieved": ranked
+        })
+
+    scored = [entry for entry in per_query if entry["relevant"]]
+    return {
+        "queries": len(queries),
+        "labelled": len(scored),
+        "recall": {
+            str(k): statistics.mean(entry["recall"][str(k)] for entry in scored) if scored else 0.0 for k in ks
+        },
+        "hit_rate": {
+            str(k): statistics.mean(
+                1.0 if entry["first_relevant_rank"] and entry["first_relevant_rank"] <= k else 0.0
+                for entry in scored
+            ) if scored else 0.0
+            for k in ks
+        },
+        "mrr": statistics.mean(
+            1.0 / entry["first_relevant_rank"] if entry["first_relevant_rank"] else 0.0 for entry in scored
+        ) if scored else 0.0,
+        "latency_ms": percentiles(timings),
+        "per_query": per_query
+    }
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], max_drop: float) -> bool:
+    """
+    Print metric changes against a previous report.
+
+    Args:
+        report: Current report
+        baseline: Previous report
+        max_drop: Largest tolerated drop in recall, hit rate or MRR
+
+    Returns:
+        True if no quality metric dropped by more than max_drop
+    """
+    ok = True
+    print("\n" + "─" * 70)
+    print(f"Compared with {baseline.get('timestamp', 'baseline')}:")
+    for name, metrics in report["configurations"].items():
+        previous = baseline.get("configurations", {}).get(name)
+        if not previous:
+            continue
+        changes = [("MRR", metrics["mrr"], previous["mrr"])]
+        for k, value in metrics["recall"].items():
+            if k in previous["recall"]:
+                changes.append((f"R@{k}", value, previous["recall"][k]))
+        parts = []
+        for label, value, old in changes:
+            flag = ""
+            if old - value > max_drop:
+                ok = False
+                flag = " ❌"
+            parts.append(f"{label} {value - old:+.3f}{flag}")
+        latency = metrics["latency_ms"]["p95"] - previous["latency_ms"]["p95"]
+        parts.append(f"p95 {latency:+.2f} ms")
+        print(f"   {name:<22}{'  '.join(parts)}")
+    return ok
+
+def main():
+    """Run the benchmark."""
+    arg_parser = argparse.ArgumentParser(description="Offline retrieval benchmark")
+    arg_parser.add_argument("--embedder", choices=["cache", "hashed"], default="cache",
+                            help="Replay cached query embeddings, or embed queries and chunks locally "
+                                 "(default: cache)")
+    arg_parser.add_argument("--record", action="store_true",
+                            help="Embed uncached queries through the OpenAI API and cache them")
+    arg_parser.add_argument("--queries", type=Path,
+                            help="Labelled queries JSON (default: TEST_QUERIES from tests/test_retrieval.py)")
+    arg_parser.add_argument("--configs", default=",".join(CONFIGURATIONS),
+                            help=f"Configurations to run (default: {','.join(CONFIGURATIONS)})")
+    arg_parser.add_argument("--k", default="1,3,5,10", help="Recall cut-offs (default: 1,3,5,10)")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query (default: 5)")
+    arg_parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT,
+                            help=f"Results JSON (default: {DEFAULT_OUTPUT.name})")
+    arg_parser.add_argument("--baseline", type=Path, help="Previous results JSON to compare against")
+    arg_parser.add_argument("--max-drop", type=float, default=0.02,
+                            help="Fail if recall or MRR drops by more than this against the baseline")
+    args = arg_parser.parse_args()
+
+    if args.queries:
+        with open(args.queries, 'r', encoding='utf-8') as f:
+            queries = json.load(f)
+    else:
+        queries = importlib.import_module("test_retrieval").TEST_QUERIES
+
+    ks = sorted(int(k) for k in args.k.split(","))
+    names = [name.strip() for name in args.configs.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CONFIGURATIONS]
+    if unknown:
+        print(f"❌ Error: unknown configurations: {', '.join(unknown)}")
+        return 1
+
+    # The retriever constructs the OpenAI provider but never calls it
+    if not args.record:
+        os.environ.setdefault("OPENAI_API_KEY", "offline")
+
+    model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    embedder = HashingEmbedder() if args.embedder == "hashed" else CacheEmbedder(model, record=args.record)
+
+    print("=" * 70)
+    print("Retrieval Benchmark")
+    print("=" * 70)
+    print(f"Queries: {len(queries)}  Embedder: {embedder.name}  k: {ks}  Repeat: {args.repeat}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "timezone": "Africa/Lagos",
+        "embedder": embedder.name,
+        "model": model,
+        "k": ks,
+        "configurations": {}
+    }
+
+    for name in names:
+        params = CONFIGURATIONS[name]
+        if args.embedder == "hashed" and params.get("use_chromadb"):
+            print(f"   Skipping {name}: the hashed embedder only re-indexes FAISS")
+            continue
+
+        retriever = OfflineRetriever(
+            embedder,
+            reindex=args.embedder == "hashed",
+            top_k=max(ks),
+            **params
+        )
+        report.setdefault("index_version", retriever.manifest["version"] if retriever.manifest else "unversioned")
+
+        try:
+            metrics = evaluate(retriever, queries, ks, args.repeat)
+        except KeyError as e:
+            print(f"❌ Error: {e.args[0]}")
+            return 1
+        report["configurations"][name] = {"params": params, **metrics}
+
+    print()
+    header = "".join(f"{'R@' + str(k):>7}" for k in ks)
+    print(f"{'Configuration':<22}{header}{'Hit@' + str(ks[-1]):>8}{'MRR':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, metrics in report["configurations"].items():
+        recall = "".join(f"{metrics['recall'][str(k)]:>7.3f}" for k in ks)
+        latency = metrics["latency_ms"]
+        print(f"{name:<22}{recall}{metrics['hit_rate'][str(ks[-1])]:>8.3f}{metrics['mrr']:>7.3f}"
+              f"{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}")
+    print("\nLatencies exclude query embedding, which is replayed or computed locally.")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n📁 Results saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.max_drop):
+            print(f"\n❌ Retrieval quality dropped by more than {args.max_drop}")
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
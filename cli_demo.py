@@ -6,9 +6,13 @@ Interactive command-line interface for querying tax legislation.
 
 import os
 import sys
+import json
+import time
 import argparse
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
@@ -154,60 +158,213 @@ def single_query_mode(pipeline: RAGPipeline, query: str, verbose: bool = False):
             traceback.print_exc()
         return 1
 
-def batch_mode(pipeline: RAGPipeline, queries_file: Path, output_file: Path):
+def load_checkpoint(checkpoint_file: Path) -> set:
     """
-    Process queries from a file.
+    Load the set of queries already answered in a previous batch run.
+
+    Args:
+        checkpoint_file: Checkpoint file (one completed query per line)
+
+    Returns:
+        Set of completed queries (a truncated last line is skipped)
+    """
+    if not checkpoint_file.exists():
+        return set()
+
+    completed = set()
+    with open(checkpoint_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                completed.add(json.loads(line))
+            except json.JSONDecodeError:
+                # Cut short by an interrupted run: the query is answered again
+                continue
+    return completed
+
+def compact_output(output_file: Path, retry: set) -> int:
+    """
+    Rewrite a batch output file so each query keeps only its last record.
+
+    Records of queries about to be retried (the error records of a previous
+    run) are dropped, so a rerun does not leave duplicates behind. A line
+    cut short by an interrupted run is dropped as well.
+
+    Args:
+        output_file: Output JSONL file of a previous run
+        retry: Queries that will be answered again
+
+    Returns:
+        Number of records removed
+    """
+    if not output_file.exists():
+        return 0
+
+    total = 0
+    records = {}
+    with open(output_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            total += 1
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            query = record.get("query")
+            if query in retry:
+                continue
+            # Later records replace earlier ones and move to the end
+            records.pop(query, None)
+            records[query] = record
+
+    removed = total - len(records)
+    if removed:
+        temp_file = output_file.with_name(output_file.name + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            for record in records.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(temp_file, output_file)
+
+    return removed
+
+def format_duration(seconds: float) -> str:
+    """Format a duration in seconds as H:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+def run_batch_query(pipeline: RAGPipeline, query: str) -> dict:
+    """
+    Run one batch query and build its output record.
+
+    Args:
+        pipeline: RAGPipeline instance
+        query: Query string
+
+    Returns:
+        Result record (contains "error" if the query failed)
+    """
+    try:
+        result = pipeline.query(query)
+        return {
+            "query": query,
+            "answer": result.get("answer"),
+            "sources": result.get("source_list"),
+            "metadata": {
+                "retrieved_chunks": result.get("retrieved_chunks"),
+                "tokens_used": result.get("tokens_used")
+            }
+        }
+    except Exception as e:
+        return {
+            "query": query,
+            "error": str(e)
+        }
+
+def batch_mode(
+    pipeline: RAGPipeline,
+    queries_file: Path,
+    output_file: Path,
+    workers: int = 4,
+    checkpoint_file: Optional[Path] = None
+):
+    """
+    Process queries from a file with bounded concurrency.
+
+    Results are appended to a JSONL output file as they complete. Every
+    successfully answered query is also recorded in a checkpoint file, so a
+    rerun with the same output skips work that is already done. Failed
+    queries are written to the output but not checkpointed, so they are
+    retried on the next run, which first removes their error records.
 
     Args:
         pipeline: RAGPipeline instance
         queries_file: File containing queries (one per line)
-        output_file: Output file for results
+        output_file: Output JSONL file for results
+        workers: Number of queries to run concurrently
+        checkpoint_file: Checkpoint file (default: <output>.checkpoint)
     """
+    checkpoint_file = checkpoint_file or output_file.with_name(output_file.name + ".checkpoint")
+
     print_header()
     print(f"Batch Mode")
     print(f"Input: {queries_file}")
     print(f"Output: {output_file}")
+    print(f"Checkpoint: {checkpoint_file}")
+    print(f"Workers: {workers}")
     print()
 
     try:
-        # Read queries
+        # Read queries (duplicates are only answered once)
         with open(queries_file, 'r', encoding='utf-8') as f:
-            queries = [line.strip() for line in f if line.strip()]
-
-        print(f"Processing {len(queries)} queries...")
-
-        results = []
-
-        for i, query in enumerate(queries, 1):
-            print(f"\n[{i}/{len(queries)}] {query}")
-
-            try:
-                result = pipeline.query(query)
-                results.append({
-                    "query": query,
-                    "answer": result.get("answer"),
-                    "sources": result.get("source_list"),
-                    "metadata": {
-                        "retrieved_chunks": result.get("retrieved_chunks"),
-                        "tokens_used": result.get("tokens_used")
-                    }
-                })
-                print("  ✓ Done")
-
-            except Exception as e:
-                print(f"  ✗ Error: {e}")
-                results.append({
-                    "query": query,
-                    "error": str(e)
-                })
-
-        # Save results
-        import json
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-
-        print(f"\n✅ Results saved to: {output_file}")
-        return 0
+            queries = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+
+        completed = load_checkpoint(checkpoint_file)
+        pending = [query for query in queries if query not in completed]
+
+        removed = compact_output(output_file, set(pending))
+        if removed:
+            print(f"Removed {removed} stale records from {output_file}")
+
+        print(f"Processing {len(pending)} queries "
+              f"({len(queries) - len(pending)} already answered)...")
+
+        if not pending:
+            print(f"\n✅ Nothing to do, results are in: {output_file}")
+            return 0
+
+        done = 0
+        failed = 0
+        start_time = time.monotonic()
+        pending_iter = iter(pending)
+
+        with open(output_file, 'a', encoding='utf-8') as out, \
+                open(checkpoint_file, 'a', encoding='utf-8') as checkpoint, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+
+            def submit_next(in_flight: set) -> None:
+                query = next(pending_iter, None)
+                if query is not None:
+                    in_flight.add(executor.submit(run_batch_query, pipeline, query))
+
+            # Keep at most `workers` queries in flight
+            in_flight = set()
+            for _ in range(workers):
+                submit_next(in_flight)
+
+            while in_flight:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    record = future.result()
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    out.flush()
+
+                    if "error" in record:
+                        failed += 1
+                        print(f"\n  ✗ Error: {record['query']}: {record['error']}")
+                    else:
+                        checkpoint.write(json.dumps(record["query"], ensure_ascii=False) + '\n')
+                        checkpoint.flush()
+
+                    done += 1
+                    elapsed = time.monotonic() - start_time
+                    rate = done / elapsed if elapsed > 0 else 0.0
+                    eta = (len(pending) - done) / rate if rate > 0 else 0.0
+                    print(f"\r  [{done}/{len(pending)}] {rate:.2f} q/s | "
+                          f"ETA {format_duration(eta)} | errors: {failed}",
+                          end='', flush=True)
+
+                    submit_next(in_flight)
+
+        elapsed = time.monotonic() - start_time
+        print(f"\n\n✅ Processed {done} queries in {format_duration(elapsed)} "
+              f"({failed} failed)")
+        print(f"   Results appended to: {output_file}")
+        if failed:
+            print("   Rerun the same command to retry failed queries.")
+        return 0 if failed == 0 else 1
 
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -229,11 +386,14 @@ Examples:
   # Verbose output
   python cli_demo.py "Define taxable income" --verbose
 
-  # Batch processing
-  python cli_demo.py --batch queries.txt --output results.json
+  # Batch processing (resumable, 8 concurrent queries)
+  python cli_demo.py --batch queries.txt --output results.jsonl --workers 8
 
   # Use FAISS instead of ChromaDB
   python cli_demo.py "VAT rate?" --use-faiss
+
+  # Diverse results (maximal marginal relevance re-ranking)
+  python cli_demo.py "VAT rate?" --mmr --mmr-lambda 0.7
         """
     )
 
@@ -268,6 +428,18 @@ Examples:
         help="Use FAISS instead of ChromaDB"
     )
 
+    parser.add_argument(
+        "--mmr",
+        action="store_true",
+        help="Re-rank results for diversity with maximal marginal relevance"
+    )
+
+    parser.add_argument(
+        "--mmr-lambda",
+        type=float,
+        help="MMR relevance/diversity trade-off, 0-1 (default: 0.5)"
+    )
+
     parser.add_argument(
         "--batch",
         type=Path,
@@ -277,7 +449,20 @@ Examples:
     parser.add_argument(
         "--output",
         type=Path,
-        help="Output file for batch mode results"
+        help="Output JSONL file for batch mode results (appended to)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Concurrent queries in batch mode (default: 4)"
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="Checkpoint file for batch mode (default: <output>.checkpoint)"
     )
 
     args = parser.parse_args()
@@ -285,13 +470,17 @@ Examples:
     # Validate batch mode arguments
     if args.batch and not args.output:
         parser.error("--output is required when using --batch")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
 
     # Initialize retriever
     try:
         print("🔧 Initializing retriever...")
         retriever = TaxActRetriever(
             top_k=args.top_k,
-            use_chromadb=not args.use_faiss
+            use_chromadb=not args.use_faiss,
+            use_mmr=True if args.mmr else None,
+            mmr_lambda=args.mmr_lambda
         )
         print("✓ Retriever initialized")
 
@@ -314,7 +503,13 @@ Examples:
 
     # Run appropriate mode
     if args.batch:
-        return batch_mode(pipeline, args.batch, args.output)
+        return batch_mode(
+            pipeline,
+            args.batch,
+            args.output,
+            workers=args.workers,
+            checkpoint_file=args.checkpoint
+        )
     elif args.query:
         return single_query_mode(pipeline, args.query, args.verbose)
     else:
@@ -6,18 +6,40 @@ Fetches from National Assembly and other official government sources.
 
 import os
 import sys
+import json
+import argparse
+import threading
 import requests
 from pathlib import Path
 from datetime import datetime
-import json
+from email.utils import formatdate
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from ingest_manifest import file_sha256
+
 # Output directory
 DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# Concurrency
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "4"))
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "2"))
+REQUEST_TIMEOUT = 30
+
+# Set headers to mimic a browser request
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'application/pdf,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+# Fields recorded per source by the fetcher
+FETCH_FIELDS = ("etag", "last_modified", "sha256", "fetched_at")
+
 # Official sources for Nigerian Tax Reform Acts 2025-2026
 SOURCES = [
     {
@@ -50,29 +72,100 @@ SOURCES = [
     }
 ]
 
-def download_file(url: str, output_path: Path, description: str) -> bool:
+class HostLimiter:
+    """Limits concurrent connections per host."""
+
+    def __init__(self, per_host: int = FETCH_PER_HOST):
+        """
+        Initialize limiter.
+
+        Args:
+            per_host: Maximum concurrent downloads from one host
+        """
+        self.per_host = max(1, per_host)
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> threading.Semaphore:
+        """Return the semaphore guarding the URL's host."""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(self.per_host)
+            return self._semaphores[host]
+
+def download_file(
+    url: str,
+    output_path: Path,
+    description: str,
+    session: Optional[requests.Session] = None,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    conditional: bool = True
+) -> Dict[str, Any]:
     """
-    Download a file from URL with progress indication.
+    Download a file from URL, conditionally and resumably.
+
+    If the file exists, the request carries If-None-Match/If-Modified-Since
+    and a 304 leaves it untouched. Bytes are written to "<name>.part" and
+    renamed into place only when complete; an interrupted transfer resumes
+    from the .part file with a Range request (guarded by If-Range).
 
     Args:
         url: URL to download from
         output_path: Path to save the file
         description: Description for logging
+        session: HTTP session (a new one is used if omitted)
+        etag: ETag recorded for the current file
+        last_modified: Last-Modified recorded for the current file
+        conditional: Send validators for an existing file (False forces a full download)
 
     Returns:
-        True if successful, False otherwise
+        Dictionary with status ("downloaded", "not_modified" or "error"),
+        validators, sha256, size and any error message
     """
+    session = session or requests.Session()
+    part_path = output_path.with_name(output_path.name + ".part")
+    part_meta_path = output_path.with_name(output_path.name + ".part.json")
+    result = {"status": "error", "etag": etag, "last_modified": last_modified, "error": None}
+
     try:
         print(f"\n📥 Downloading: {description}")
         print(f"   URL: {url}")
 
-        # Set headers to mimic a browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'application/pdf,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        }
+        headers = dict(REQUEST_HEADERS)
+        resume_from = 0
+
+        # Resume an interrupted transfer if we know which version it belongs to
+        if part_path.exists() and part_meta_path.exists():
+            with open(part_meta_path, 'r', encoding='utf-8') as f:
+                part_validator = json.load(f).get("validator")
+            if part_validator and part_path.stat().st_size > 0:
+                resume_from = part_path.stat().st_size
+                headers["Range"] = f"bytes={resume_from}-"
+                headers["If-Range"] = part_validator
+                print(f"   Resuming from byte {resume_from}")
+        elif output_path.exists() and conditional:
+            # Conditional request: only transfer if upstream changed
+            if etag:
+                headers["If-None-Match"] = etag
+            headers["If-Modified-Since"] = last_modified or formatdate(output_path.stat().st_mtime, usegmt=True)
+
+        response = session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+
+        if response.status_code == 304:
+            response.close()
+            print(f"   ✅ Not modified: {output_path.name}")
+            result["status"] = "not_modified"
+            return result
+
+        if response.status_code == 416 and resume_from:
+            # Stale or already-complete partial file: start over
+            response.close()
+            part_path.unlink(missing_ok=True)
+            part_meta_path.unlink(missing_ok=True)
+            return download_file(url, output_path, description, session, etag, last_modified, conditional)
 
-        response = requests.get(url, headers=headers, stream=True, timeout=30)
         response.raise_for_status()
 
         # Check if content is actually PDF
@@ -80,30 +173,219 @@ def download_file(url: str, output_path: Path, description: str) -> bool:
         if 'pdf' not in content_type.lower() and 'application/octet-stream' not in content_type.lower():
             print(f"   ⚠️  Warning: Content-Type is {content_type}, expected PDF")
 
-        total_size = int(response.headers.get('content-length', 0))
+        new_etag = response.headers.get("ETag")
+        new_last_modified = response.headers.get("Last-Modified")
+
+        if response.status_code == 206 and resume_from:
+            content_range = response.headers.get("Content-Range", "")
+            if not content_range.startswith(f"bytes {resume_from}-"):
+                raise requests.exceptions.RequestException(f"unexpected Content-Range: {content_range}")
+            mode = 'ab'
+            total_size = resume_from + int(response.headers.get('content-length', 0))
+        else:
+            # Full response (new download, or the server ignored/refused the range)
+            resume_from = 0
+            mode = 'wb'
+            total_size = int(response.headers.get('content-length', 0))
+            # If-Range needs a strong ETag; fall back to Last-Modified
+            strong_etag = new_etag if new_etag and not new_etag.startswith("W/") else None
+            with open(part_meta_path, 'w', encoding='utf-8') as f:
+                json.dump({"url": url, "validator": strong_etag or new_last_modified}, f)
 
-        with open(output_path, 'wb') as f:
-            if total_size == 0:
-                f.write(response.content)
-            else:
-                downloaded = 0
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        percent = (downloaded / total_size) * 100
-                        print(f"\r   Progress: {percent:.1f}%", end='', flush=True)
+        downloaded = resume_from
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                if chunk:
+                    f.write(chunk)
+                    downloaded += len(chunk)
 
-        print(f"\n   ✅ Saved to: {output_path}")
-        print(f"   Size: {output_path.stat().st_size / 1024:.2f} KB")
-        return True
+        if total_size and downloaded != total_size:
+            raise requests.exceptions.RequestException(
+                f"transfer incomplete ({downloaded}/{total_size} bytes), will resume next run"
+            )
+
+        # Atomic publish of the complete file
+        sha256 = file_sha256(part_path)
+        os.replace(part_path, output_path)
+        part_meta_path.unlink(missing_ok=True)
+
+        print(f"   ✅ Saved to: {output_path}")
+        print(f"   Size: {output_path.stat().st_size / 1024:.2f} KB  SHA-256: {sha256[:16]}…")
+
+        result.update({
+            "status": "downloaded",
+            "etag": new_etag,
+            "last_modified": new_last_modified,
+            "sha256": sha256
+        })
+        return result
 
     except requests.exceptions.RequestException as e:
         print(f"   ❌ Error downloading: {e}")
-        return False
+        result["error"] = str(e)
+        return result
     except Exception as e:
         print(f"   ❌ Unexpected error: {e}")
-        return False
+        result["error"] = str(e)
+        return result
+
+def load_sources(output_dir: Path = DATA_DIR, base_sources: Optional[list] = None) -> list:
+    """
+    Combine the official sources with any extra sources already recorded.
+
+    Locally added documents (url "local") only exist in sources_metadata.json,
+    so they are kept when the metadata is rewritten. Validators from the
+    previous fetch (ETag, Last-Modified, SHA-256) are carried over.
+
+    Args:
+        output_dir: Directory containing sources_metadata.json
+        base_sources: Source definitions to use instead of SOURCES
+
+    Returns:
+        List of source dictionaries
+    """
+    sources = [dict(source) for source in (SOURCES if base_sources is None else base_sources)]
+    by_filename = {source["filename"]: source for source in sources}
+
+    metadata_path = output_dir / "sources_metadata.json"
+    if metadata_path.exists():
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            for recorded in json.load(f).get("sources", []):
+                source = by_filename.get(recorded.get("filename"))
+                if source is None:
+                    source = {
+                        key: value for key, value in recorded.items()
+                        if key not in ("downloaded", "file_size_bytes", "local_path")
+                    }
+                    sources.append(source)
+                    by_filename[source.get("filename")] = source
+                else:
+                    # Keep validators and checksums from the previous fetch
+                    source.update({key: recorded[key] for key in FETCH_FIELDS if key in recorded})
+
+    return sources
+
+def source_metadata(source: dict, output_dir: Path = DATA_DIR) -> dict:
+    """
+    Describe a source and its local file.
+
+    Args:
+        source: Source dictionary
+        output_dir: Download directory
+
+    Returns:
+        Source dictionary with download status and local path
+    """
+    file_path = output_dir / source["filename"]
+    return {
+        **source,
+        "downloaded": file_path.exists(),
+        "file_size_bytes": file_path.stat().st_size if file_path.exists() else 0,
+        "local_path": str(file_path)
+    }
+
+def fetch_source(
+    source: dict,
+    output_dir: Path = DATA_DIR,
+    session: Optional[requests.Session] = None,
+    limiter: Optional[HostLimiter] = None,
+    force: bool = False,
+    refresh: bool = True
+) -> dict:
+    """
+    Fetch one source, re-downloading only if upstream changed.
+
+    Args:
+        source: Source dictionary (with validators from load_sources)
+        output_dir: Download directory
+        session: HTTP session (a new one per download if omitted)
+        limiter: Per-host connection limiter
+        force: Download even if the local copy is current
+        refresh: Check existing files with a conditional request (False skips them)
+
+    Returns:
+        Source metadata (see source_metadata) after the fetch
+    """
+    output_path = output_dir / source["filename"]
+    url = source.get("url", "local")
+
+    if url == "local":
+        if output_path.exists():
+            print(f"\n⏭️  Local document: {source['name']}")
+        else:
+            print(f"\n⚠️  Missing local document: {source['name']} ({output_path})")
+        result = {"status": "local" if output_path.exists() else "error"}
+    elif output_path.exists() and not refresh and not force:
+        print(f"\n⏭️  Skipping (already exists): {source['name']}")
+        result = {"status": "not_checked"}
+    else:
+        semaphore = (limiter or HostLimiter()).for_url(url)
+        with semaphore:
+            result = download_file(
+                url,
+                output_path,
+                source["name"],
+                session=session,
+                etag=source.get("etag"),
+                last_modified=source.get("last_modified"),
+                conditional=not force
+            )
+
+    metadata = source_metadata(source, output_dir)
+    metadata["fetch_status"] = result["status"]
+
+    if result["status"] == "downloaded":
+        metadata.update({
+            "etag": result["etag"],
+            "last_modified": result["last_modified"],
+            "sha256": result["sha256"],
+            "fetched_at": datetime.now().isoformat()
+        })
+    elif result.get("error"):
+        # An existing copy stays usable when a refresh fails
+        metadata["fetch_error"] = result["error"]
+
+    if metadata["downloaded"] and not metadata.get("sha256"):
+        metadata["sha256"] = file_sha256(output_path)
+
+    return metadata
+
+def fetch_all(
+    sources: list,
+    output_dir: Path = DATA_DIR,
+    session: Optional[requests.Session] = None,
+    workers: int = FETCH_WORKERS,
+    per_host: int = FETCH_PER_HOST,
+    force: bool = False,
+    refresh: bool = True
+) -> list:
+    """
+    Fetch sources concurrently with a per-host connection limit.
+
+    Args:
+        sources: Source dictionaries
+        output_dir: Download directory
+        session: Shared HTTP session (one per download if omitted)
+        workers: Concurrent downloads overall
+        per_host: Concurrent downloads per host
+        force: Download even if local copies are current
+        refresh: Check existing files with conditional requests
+
+    Returns:
+        Source metadata in the same order as sources
+    """
+    limiter = HostLimiter(per_host)
+    results = [None] * len(sources)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(fetch_source, source, output_dir, session, limiter, force, refresh): i
+            for i, source in enumerate(sources)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    return results
 
 def save_metadata(sources: list, output_dir: Path):
     """Save metadata about downloaded sources."""
@@ -114,14 +396,11 @@ def save_metadata(sources: list, output_dir: Path):
     }
 
     for source in sources:
-        file_path = output_dir / source["filename"]
-        source_meta = {
-            **source,
-            "downloaded": file_path.exists(),
-            "file_size_bytes": file_path.stat().st_size if file_path.exists() else 0,
-            "local_path": str(file_path)
-        }
-        metadata["sources"].append(source_meta)
+        # Per-run status is reported, not stored
+        metadata["sources"].append({
+            key: value for key, value in source_metadata(source, output_dir).items()
+            if key not in ("fetch_status", "fetch_error")
+        })
 
     metadata_path = output_dir / "sources_metadata.json"
     with open(metadata_path, 'w', encoding='utf-8') as f:
@@ -131,35 +410,61 @@ def save_metadata(sources: list, output_dir: Path):
 
 def main():
     """Main execution function."""
+    arg_parser = argparse.ArgumentParser(description="Fetch Nigerian Tax Reform Act sources")
+    arg_parser.add_argument("--workers", type=int, default=FETCH_WORKERS,
+                            help=f"Concurrent downloads (default: {FETCH_WORKERS})")
+    arg_parser.add_argument("--per-host", type=int, default=FETCH_PER_HOST,
+                            help=f"Concurrent downloads per host (default: {FETCH_PER_HOST})")
+    arg_parser.add_argument("--force", action="store_true",
+                            help="Download every source even if the local copy is current")
+    arg_parser.add_argument("--no-refresh", action="store_true",
+                            help="Skip sources that already exist instead of checking upstream")
+    arg_parser.add_argument("--sources", type=str,
+                            help="JSON file with source definitions to use instead of the built-in list")
+    arg_parser.add_argument("--output-dir", type=str, default=str(DATA_DIR),
+                            help="Download directory (default: data/raw)")
+    args = arg_parser.parse_args()
+
     print("=" * 70)
     print("Nigerian Tax Reform Acts 2025-2026 - Source Fetcher")
     print("=" * 70)
 
-    success_count = 0
-    total_count = len(SOURCES)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
 
-    for source in SOURCES:
-        output_path = DATA_DIR / source["filename"]
-
-        # Skip if already downloaded
-        if output_path.exists():
-            print(f"\n⏭️  Skipping (already exists): {source['name']}")
-            print(f"   Path: {output_path}")
-            success_count += 1
-            continue
+    if args.sources:
+        with open(args.sources, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        sources = load_sources(output_dir, loaded.get("sources", []) if isinstance(loaded, dict) else loaded)
+    else:
+        sources = load_sources(output_dir)
 
-        # Download the file
-        if download_file(source["url"], output_path, source["name"]):
-            success_count += 1
+    results = fetch_all(
+        sources,
+        output_dir,
+        workers=args.workers,
+        per_host=args.per_host,
+        force=args.force,
+        refresh=not args.no_refresh
+    )
+    total_count = len(results)
+    success_count = sum(1 for metadata in results if metadata["downloaded"])
+    downloaded_count = sum(1 for metadata in results if metadata["fetch_status"] == "downloaded")
+    unchanged_count = sum(1 for metadata in results if metadata["fetch_status"] == "not_modified")
 
     # Save metadata
-    save_metadata(SOURCES, DATA_DIR)
+    save_metadata(results, output_dir)
 
     # Summary
     print("\n" + "=" * 70)
-    print(f"Download Summary: {success_count}/{total_count} successful")
+    print(f"Download Summary: {success_count}/{total_count} available "
+          f"({downloaded_count} downloaded, {unchanged_count} not modified)")
     print("=" * 70)
 
+    for metadata in results:
+        if metadata.get("fetch_error"):
+            print(f"   ⚠️  {metadata['name']}: {metadata['fetch_error']}")
+
     if success_count == total_count:
         print("✅ All sources downloaded successfully!")
         return 0
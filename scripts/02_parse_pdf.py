@@ -8,11 +8,17 @@ import os
 import sys
 import json
 import re
+import time
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 import fitz  # PyMuPDF
 
+from ingest_manifest import IngestManifest, file_sha256, combine_hashes
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -21,150 +27,302 @@ RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
 PROCESSED_DIR = Path(__file__).parent.parent / "data" / "processed"
 PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
 
+# Version of the *_pages.jsonl layout written by TaxActParser.write_pages
+PAGES_FORMAT_VERSION = 1
+
+# Version of the fields in the parsed JSON (2: full definition text,
+# 3: sections located by heading instead of carrying their text)
+PARSED_FORMAT_VERSION = 3
+
+# Definitions: "term" means / refers to / includes / has the same meaning as ...
+DEFINITION_TERM = re.compile(
+    r'["“”]([^"“”]+)["“”](?:\s+means|\s+refers to|\s+includes|\s+has the same meaning as)',
+    re.IGNORECASE
+)
+
+# A definition ends at a line ending in "." or ";" unless the next line continues a "(a)" list
+DEFINITION_END = re.compile(r'[.;]\s*(?:\n(?!\s*\()|$)')
+
+# '"virtual asset" has the same meaning as digital asset' makes the term an alias
+SAME_MEANING = re.compile(
+    r'\s+has the same meaning as\s+(?:in\s+)?["“]?(?:the\s+|an?\s+)?([^"”;.,\n]+)',
+    re.IGNORECASE
+)
+
+MAX_DEFINITION_CHARS = 2000
+
+# Heading patterns for Nigerian legal documents, combined into one matcher:
+# PART/CHAPTER n, SCHEDULE [n], and "Section n" / "Article n" / bare "n." headings
+HEADING_PATTERN = re.compile(
+    r'^(?:'
+    r'(?i:(?P<keyword>PART|CHAPTER)\s+(?P<keyword_number>[IVXLCDM]+|[0-9]+)[:\s\-]+(?P<keyword_title>.+?))'
+    r'|(?i:SCHEDULE\s+(?P<schedule_number>[IVXLCDM]+|[0-9]+)?[:\s\-]*(?P<schedule_title>.+?))'
+    r'|(?:(?P<label>Section|Article)\s+)?(?P<number>\d+)[.\s\-]+(?P<title>.+?)'
+    r')$'
+)
+
+# PyMuPDF span flag for bold text
+BOLD_FLAG = 16
+
+# A bare numbered line is a heading only if it is bold or this much larger than body text
+HEADING_SIZE_DELTA = 1.0
+
 class TaxActParser:
     """Parser for Nigerian Tax Reform Act PDFs."""
 
-    def __init__(self, pdf_path: Path):
+    def __init__(self, pdf_path: Path, verbose: bool = True):
         """
         Initialize parser with PDF path.
 
         Args:
             pdf_path: Path to the PDF file
+            verbose: Print progress messages
         """
         self.pdf_path = pdf_path
+        self.verbose = verbose
         self.doc = None
         self.metadata = {}
         self.toc = []
         self.sections = []
 
+    def log(self, message: str):
+        """Print a progress message when running verbosely."""
+        if self.verbose:
+            print(message)
+
     def open_document(self) -> bool:
         """Open the PDF document."""
         try:
             self.doc = fitz.open(self.pdf_path)
             self.metadata = self.doc.metadata
             self.toc = self.doc.get_toc()  # Table of Contents
-            print(f"   📄 Opened: {self.pdf_path.name}")
-            print(f"   Pages: {len(self.doc)}")
-            print(f"   Title: {self.metadata.get('title', 'N/A')}")
+            self.log(f"   📄 Opened: {self.pdf_path.name}")
+            self.log(f"   Pages: {len(self.doc)}")
+            self.log(f"   Title: {self.metadata.get('title', 'N/A')}")
             return True
         except Exception as e:
-            print(f"   ❌ Error opening PDF: {e}")
+            print(f"   ❌ Error opening PDF {self.pdf_path.name}: {e}")
             return False
 
-    def extract_text_with_structure(self) -> List[Dict[str, Any]]:
+    def iter_pages(self) -> Iterator[Dict[str, Any]]:
         """
-        Extract text with hierarchical structure preservation.
+        Extract pages one at a time with hierarchical structure preservation.
 
-        Returns:
-            List of page dictionaries with extracted content
-        """
-        pages = []
+        Each page is read with a single get_text("dict") call; the page text
+        is derived from the block structure (identical to get_text("text")).
 
+        Yields:
+            Page dictionaries with extracted content
+        """
         for page_num in range(len(self.doc)):
             page = self.doc[page_num]
 
-            # Extract text with layout preservation
-            text = page.get_text("text")
-
             # Extract text blocks with position info
             blocks = page.get_text("dict")["blocks"]
 
-            # Filter text blocks
+            text_parts = []
             text_blocks = []
+            lines = []
+            size_chars = Counter()
             for block in blocks:
                 if block["type"] == 0:  # Text block
                     block_text = ""
                     for line in block.get("lines", []):
-                        for span in line.get("spans", []):
-                            block_text += span.get("text", "")
-                        block_text += "\n"
-
+                        spans = [span for span in line.get("spans", []) if span.get("text", "").strip()]
+                        line_text = "".join(span.get("text", "") for span in line.get("spans", []))
+                        block_text += line_text + "\n"
+
+                        # Font metadata used to confirm section headings
+                        size = max((round(span.get("size", 0.0), 1) for span in spans), default=0.0)
+                        bold = bool(spans) and all(
+                            span.get("flags", 0) & BOLD_FLAG or "bold" in span.get("font", "").lower()
+                            for span in spans
+                        )
+                        for span in spans:
+                            size_chars[round(span.get("size", 0.0), 1)] += len(span["text"])
+                        lines.append({"text": line_text, "size": size, "bold": bold})
+
+                    text_parts.append(block_text)
                     text_blocks.append({
                         "text": block_text.strip(),
-                        "bbox": block["bbox"],
-                        "page": page_num + 1
+                        "bbox": [round(coord, 2) for coord in block["bbox"]]
                     })
 
-            page_data = {
+            yield {
                 "page_number": page_num + 1,
-                "text": text,
+                "text": "".join(text_parts),
                 "blocks": text_blocks,
+                "lines": lines,
+                "body_font_size": size_chars.most_common(1)[0][0] if size_chars else 0.0,
                 "width": page.rect.width,
                 "height": page.rect.height
             }
 
-            pages.append(page_data)
+    def extract_text_with_structure(self) -> List[Dict[str, Any]]:
+        """
+        Extract text with hierarchical structure preservation.
+
+        Returns:
+            List of page dictionaries with extracted content
+        """
+        return list(self.iter_pages())
+
+    def write_pages(self, pages_path: Path) -> List[Dict[str, Any]]:
+        """
+        Stream pages to a compact JSONL file (header record, then one line per page).
+
+        Args:
+            pages_path: Output *_pages.jsonl path
 
-        return pages
+        Returns:
+            Lightweight page list (text and line font metadata) for section scanning
+        """
+        header = {
+            "type": "header",
+            "format_version": PAGES_FORMAT_VERSION,
+            "source_file": str(self.pdf_path),
+            "filename": self.pdf_path.name,
+            "page_count": len(self.doc),
+            "metadata": self.metadata
+        }
 
-    def identify_sections(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        page_texts = []
+        tmp_path = pages_path.with_name(pages_path.name + ".tmp")
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(header, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+            for page_data in self.iter_pages():
+                # Line font metadata is only needed for section detection
+                lines = page_data.pop("lines")
+                body_font_size = page_data.pop("body_font_size")
+
+                f.write(json.dumps({"type": "page", **page_data}, ensure_ascii=False, separators=(",", ":")) + "\n")
+                page_texts.append({
+                    "page_number": page_data["page_number"],
+                    "text": page_data["text"],
+                    "lines": lines,
+                    "body_font_size": body_font_size
+                })
+
+        os.replace(tmp_path, pages_path)
+        return page_texts
+
+    def identify_sections(
+        self,
+        pages: Iterable[Dict[str, Any]],
+        definitions: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
         """
         Identify sections, parts, and articles from the document.
 
+        Each line is tested once against the combined HEADING_PATTERN. When a
+        page carries line font metadata, bare numbered lines ("12. Title")
+        only count as headings if they are bold or larger than the page's
+        body text, so numbered list items stay in the section content.
+
+        Sections are returned as a table of contents: each records where its
+        heading is (page_start and heading_line, the line's index in the page
+        text split on newlines) instead of its text, which 03_make_chunks.py
+        reads back from the *_pages.jsonl stream. Only the current section's
+        text is held while scanning.
+
         Args:
-            pages: List of page data
+            pages: Iterable of page data
+            definitions: Definitions to tag with the number and title of the
+                section they appear in (the first section quoting the term,
+                else the first non-empty section spanning its page)
 
         Returns:
             List of section dictionaries
         """
+        definitions = definitions or []
         sections = []
         current_section = None
+        content_lines = []
+        quoted_in: Dict[int, Dict[str, Any]] = {}
+        on_page_of: Dict[int, Dict[str, Any]] = {}
 
-        # Regex patterns for Nigerian legal documents
-        patterns = {
-            "part": re.compile(r'^PART\s+([IVXLCDM]+|[0-9]+)[:\s\-]+(.+?)$', re.IGNORECASE | re.MULTILINE),
-            "section": re.compile(r'^(?:Section\s+)?(\d+)[.\s\-]+(.+?)$', re.MULTILINE),
-            "article": re.compile(r'^(?:Article\s+)?(\d+)[.\s\-]+(.+?)$', re.MULTILINE),
-            "chapter": re.compile(r'^CHAPTER\s+([IVXLCDM]+|[0-9]+)[:\s\-]+(.+?)$', re.IGNORECASE | re.MULTILINE),
-            "schedule": re.compile(r'^SCHEDULE\s+([IVXLCDM]+|[0-9]+)?[:\s\-]*(.+?)$', re.IGNORECASE | re.MULTILINE)
-        }
+        def close_section():
+            if not current_section:
+                return
+            sections.append(current_section)
+            content = "".join(content_lines)
+            if not content:
+                return
+            for i, definition in enumerate(definitions):
+                if i not in quoted_in and f'"{definition["term"]}"' in content:
+                    quoted_in[i] = current_section
+                elif current_section["page_start"] <= definition.get("page", 0) <= current_section["page_end"]:
+                    on_page_of.setdefault(i, current_section)
 
         for page_data in pages:
-            text = page_data["text"]
             page_num = page_data["page_number"]
+            body_font_size = page_data.get("body_font_size", 0.0)
+
+            # Prefer lines with font metadata; fall back to plain text
+            lines = page_data.get("lines")
+            if lines is None:
+                lines = [{"text": line} for line in page_data["text"].split('\n')]
 
-            # Split into lines for processing
-            lines = text.split('\n')
+            line_index = 0
+            for line_data in lines:
+                heading_line = line_index
+                line_index += line_data["text"].count('\n') + 1
 
-            for i, line in enumerate(lines):
-                line = line.strip()
+                line = line_data["text"].strip()
                 if not line:
                     continue
 
-                # Check for section patterns
-                for section_type, pattern in patterns.items():
-                    match = pattern.match(line)
-                    if match:
-                        # Save previous section
-                        if current_section:
-                            sections.append(current_section)
-
-                        # Create new section
-                        if section_type in ["part", "chapter", "schedule"]:
-                            number = match.group(1) if match.group(1) else ""
-                            title = match.group(2).strip()
-                        else:
-                            number = match.group(1)
-                            title = match.group(2).strip()
-
-                        current_section = {
-                            "type": section_type,
-                            "number": number,
-                            "title": title,
-                            "page_start": page_num,
-                            "page_end": page_num,
-                            "content": ""
-                        }
-                        break
-                else:
+                match = HEADING_PATTERN.match(line)
+
+                if match and match.group("number") and not match.group("label") and "size" in line_data:
+                    # Bare numbered line: confirm with font weight/size
+                    is_heading_style = line_data["bold"] or (
+                        body_font_size and line_data["size"] >= body_font_size + HEADING_SIZE_DELTA
+                    )
+                    if not is_heading_style:
+                        match = None
+
+                if match:
+                    # Save previous section
+                    close_section()
+
+                    # Create new section
+                    if match.group("keyword"):
+                        section_type = match.group("keyword").lower()
+                        number = match.group("keyword_number")
+                        title = match.group("keyword_title")
+                    elif match.group("schedule_title"):
+                        section_type = "schedule"
+                        number = match.group("schedule_number") or ""
+                        title = match.group("schedule_title")
+                    else:
+                        section_type = "article" if match.group("label") == "Article" else "section"
+                        number = match.group("number")
+                        title = match.group("title")
+
+                    current_section = {
+                        "type": section_type,
+                        "number": number,
+                        "title": title.strip(),
+                        "page_start": page_num,
+                        "page_end": page_num,
+                        "heading_line": heading_line
+                    }
+                    content_lines = []
+                elif current_section:
                     # Add content to current section
-                    if current_section:
-                        current_section["content"] += line + "\n"
-                        current_section["page_end"] = page_num
+                    content_lines.append(line + "\n")
+                    current_section["page_end"] = page_num
 
         # Add last section
-        if current_section:
-            sections.append(current_section)
+        close_section()
+
+        for i, definition in enumerate(definitions):
+            section = quoted_in.get(i) or on_page_of.get(i) or {}
+            definition["section_number"] = str(section.get("number", ""))
+            definition["section_title"] = section.get("title", "")
 
         return sections
 
@@ -186,7 +344,7 @@ class TaxActParser:
 
         return toc_entries
 
-    def extract_definitions(self, pages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    def extract_definitions(self, pages: Iterable[Dict[str, Any]]) -> List[Dict[str, str]]:
         """
         Extract definitions section.
 
@@ -208,46 +366,68 @@ class TaxActParser:
 
             if in_definitions:
                 # Pattern: "term" means ...
-                pattern = r'["""]([^"""]+)["""](?:\s+means|\s+refers to|\s+includes)'
-                matches = re.finditer(pattern, text, re.IGNORECASE)
+                matches = list(DEFINITION_TERM.finditer(text))
 
-                for match in matches:
+                for i, match in enumerate(matches):
                     term = match.group(1).strip()
                     # Get context around the definition
                     start = max(0, match.start() - 50)
                     end = min(len(text), match.end() + 200)
                     context = text[start:end].strip()
 
-                    definitions.append({
+                    # Full definition: up to its closing punctuation or the next definition
+                    next_start = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+                    segment = text[match.start():min(next_start, match.start() + MAX_DEFINITION_CHARS)]
+                    closing = DEFINITION_END.search(segment, match.end() - match.start())
+                    if closing:
+                        segment = segment[:closing.start()]
+
+                    definition = {
                         "term": term,
                         "context": context,
+                        "definition": " ".join(segment.split()),
                         "page": page_data["page_number"]
-                    })
+                    }
+
+                    same_meaning = SAME_MEANING.match(segment, len(match.group(1)) + 2)
+                    if same_meaning:
+                        definition["same_as"] = same_meaning.group(1).strip()
+
+                    definitions.append(definition)
 
         return definitions
 
-    def parse(self) -> Dict[str, Any]:
+    def parse(self, pages_path: Optional[Path] = None) -> Dict[str, Any]:
         """
         Main parsing method.
 
+        Page content is streamed to a *_pages.jsonl file; the returned
+        dictionary is a small header (metadata, table of contents, section
+        headings and definitions) that points to that file.
+
+        Args:
+            pages_path: Output *_pages.jsonl path (default: next to the parsed JSON)
+
         Returns:
             Dictionary containing all extracted data
         """
         if not self.open_document():
             return None
 
-        print("   🔍 Extracting text and structure...")
-        pages = self.extract_text_with_structure()
+        pages_path = pages_path or PROCESSED_DIR / (self.pdf_path.stem + "_pages.jsonl")
 
-        print("   📑 Identifying sections...")
-        sections = self.identify_sections(pages)
+        self.log("   🔍 Extracting text and structure...")
+        pages = self.write_pages(pages_path)
 
-        print("   📋 Parsing table of contents...")
-        toc = self.parse_toc()
-
-        print("   📖 Extracting definitions...")
+        self.log("   📖 Extracting definitions...")
         definitions = self.extract_definitions(pages)
 
+        self.log("   📑 Identifying sections...")
+        sections = self.identify_sections(pages, definitions)
+
+        self.log("   📋 Parsing table of contents...")
+        toc = self.parse_toc()
+
         result = {
             "source_file": str(self.pdf_path),
             "filename": self.pdf_path.name,
@@ -258,18 +438,157 @@ class TaxActParser:
             "toc": toc,
             "sections": sections,
             "definitions": definitions,
-            "pages": pages
+            "pages_file": pages_path.name
         }
 
         self.doc.close()
 
-        print(f"   ✅ Found {len(sections)} sections")
-        print(f"   ✅ Found {len(definitions)} definitions")
+        self.log(f"   ✅ Found {len(sections)} sections")
+        self.log(f"   ✅ Found {len(definitions)} definitions")
 
         return result
 
+def parse_source(source: Dict[str, Any], verbose: bool = True) -> Dict[str, Any]:
+    """
+    Parse one source PDF and write its parsed JSON.
+
+    Runs in a worker process when parsing in parallel, so any error is
+    caught and reported instead of aborting the other documents.
+
+    Args:
+        source: Source entry from sources_metadata.json
+        verbose: Print parser progress messages
+
+    Returns:
+        Dictionary with output path, page count, timing and any error
+    """
+    pdf_path = Path(source["local_path"])
+    start_time = time.perf_counter()
+    outcome = {
+        "name": source["name"],
+        "output_path": None,
+        "pages_path": None,
+        "page_count": 0,
+        "elapsed": 0.0,
+        "error": None
+    }
+
+    try:
+        # Parse PDF
+        parser = TaxActParser(pdf_path, verbose=verbose)
+        result = parser.parse()
+
+        if result:
+            # Save parsed result
+            output_filename = pdf_path.stem + "_parsed.json"
+            output_path = PROCESSED_DIR / output_filename
+
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, separators=(",", ":"))
+
+            outcome["output_path"] = str(output_path)
+            outcome["pages_path"] = str(PROCESSED_DIR / result["pages_file"])
+            outcome["page_count"] = result["page_count"]
+        else:
+            outcome["error"] = "could not open PDF"
+
+    except Exception as e:
+        outcome["error"] = str(e)
+
+    outcome["elapsed"] = time.perf_counter() - start_time
+    return outcome
+
+def parse_input_hash(pdf_path: Path) -> str:
+    """
+    Hash everything that determines a PDF's parsed output.
+
+    Args:
+        pdf_path: Path to PDF file
+
+    Returns:
+        Hex digest over the PDF bytes and the output format versions
+    """
+    return combine_hashes([file_sha256(pdf_path), PAGES_FORMAT_VERSION, PARSED_FORMAT_VERSION])
+
+def unchanged_outcome(source: Dict[str, Any], manifest: IngestManifest, input_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Return a skipped outcome if the source was already parsed from identical input.
+
+    Args:
+        source: Source entry from sources_metadata.json
+        manifest: Ingest manifest
+        input_hash: Result of parse_input_hash for the source PDF
+
+    Returns:
+        Outcome dictionary marked as skipped, or None if the PDF must be parsed
+    """
+    entry = manifest.get("parse", Path(source["local_path"]).name)
+    if not entry or not manifest.is_fresh(
+        "parse", Path(source["local_path"]).name, input_hash, [entry["output_path"], entry["pages_path"]]
+    ):
+        return None
+
+    return {
+        "name": source["name"],
+        "output_path": entry["output_path"],
+        "pages_path": entry["pages_path"],
+        "page_count": entry.get("page_count", 0),
+        "elapsed": 0.0,
+        "error": None,
+        "skipped": True
+    }
+
+def record_parse(manifest: IngestManifest, source: Dict[str, Any], input_hash: str, outcome: Dict[str, Any]):
+    """
+    Record a successful parse so an unchanged PDF is skipped next time.
+
+    Args:
+        manifest: Ingest manifest
+        source: Source entry from sources_metadata.json
+        input_hash: Result of parse_input_hash for the source PDF
+        outcome: Outcome returned by parse_source
+    """
+    manifest.record(
+        "parse",
+        Path(source["local_path"]).name,
+        input_hash,
+        output_path=outcome["output_path"],
+        pages_path=outcome["pages_path"],
+        output_sha256=file_sha256(Path(outcome["output_path"])),
+        pages_sha256=file_sha256(Path(outcome["pages_path"])),
+        page_count=outcome["page_count"]
+    )
+
+def report_outcome(outcome: Dict[str, Any]):
+    """Print the per-document result of parse_source."""
+    if outcome["error"]:
+        print(f"   ❌ {outcome['name']}: {outcome['error']}")
+        return
+
+    elapsed = outcome["elapsed"]
+    pages_per_sec = outcome["page_count"] / elapsed if elapsed > 0 else 0.0
+    print(f"   💾 {outcome['name']}: {outcome['page_count']} pages in {elapsed:.2f}s "
+          f"({pages_per_sec:.1f} pages/sec) -> {outcome['output_path']}")
+
 def main():
     """Main execution function."""
+    arg_parser = argparse.ArgumentParser(description="Parse Nigerian Tax Reform Act PDFs")
+    arg_parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of documents to parse in parallel processes (default: 1)"
+    )
+    arg_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse every PDF even if it is unchanged since the last run"
+    )
+    args = arg_parser.parse_args()
+
+    if args.workers < 1:
+        arg_parser.error("--workers must be at least 1")
+
     print("=" * 70)
     print("Nigerian Tax Reform Acts - PDF Parser")
     print("=" * 70)
@@ -284,39 +603,77 @@ def main():
     with open(metadata_path, 'r') as f:
         metadata = json.load(f)
 
-    parsed_count = 0
     total_count = len(metadata["sources"])
+    manifest = IngestManifest()
+    sources = []
+    input_hashes = {}
+    outcomes = {}
 
     for source in metadata["sources"]:
         if not source["downloaded"]:
             print(f"\n⏭️  Skipping {source['name']} (not downloaded)")
             continue
 
+        # Skip PDFs whose content (and the page format) is unchanged
         pdf_path = Path(source["local_path"])
+        if pdf_path.exists():
+            input_hashes[source["name"]] = parse_input_hash(pdf_path)
+            skipped = None if args.force else unchanged_outcome(source, manifest, input_hashes[source["name"]])
+            if skipped:
+                print(f"\n⏭️  Unchanged: {source['name']}")
+                outcomes[source["name"]] = skipped
+                continue
+
+        sources.append(source)
+
+    start_time = time.perf_counter()
+
+    if args.workers == 1:
+        for source in sources:
+            print(f"\n📄 Parsing: {source['name']}")
+            outcomes[source["name"]] = parse_source(source)
+            report_outcome(outcomes[source["name"]])
+    else:
+        print(f"\n📄 Parsing {len(sources)} documents with {args.workers} workers...")
 
-        print(f"\n📄 Parsing: {source['name']}")
-
-        # Parse PDF
-        parser = TaxActParser(pdf_path)
-        result = parser.parse()
-
-        if result:
-            # Save parsed result
-            output_filename = pdf_path.stem + "_parsed.json"
-            output_path = PROCESSED_DIR / output_filename
-
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result, f, indent=2, ensure_ascii=False)
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(parse_source, source, False): source
+                for source in sources
+            }
 
-            print(f"   💾 Saved to: {output_path}")
-            parsed_count += 1
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    # Worker process died (e.g. crash inside PyMuPDF)
+                    outcome = {"name": source["name"], "page_count": 0, "elapsed": 0.0, "error": str(e)}
+                outcomes[source["name"]] = outcome
+                report_outcome(outcome)
+
+    elapsed = time.perf_counter() - start_time
+    parsed = [outcomes[source["name"]] for source in sources if not outcomes[source["name"]]["error"]]
+    parsed_count = len(parsed)
+    skipped_count = sum(1 for outcome in outcomes.values() if outcome.get("skipped"))
+    total_pages = sum(outcome["page_count"] for outcome in parsed)
+
+    # Record parsed outputs so unchanged PDFs are skipped next time
+    for source in sources:
+        outcome = outcomes[source["name"]]
+        if not outcome["error"] and source["name"] in input_hashes:
+            record_parse(manifest, source, input_hashes[source["name"]], outcome)
+    manifest.save()
 
     # Summary
     print("\n" + "=" * 70)
-    print(f"Parsing Summary: {parsed_count}/{total_count} successful")
+    print(f"Parsing Summary: {parsed_count + skipped_count}/{total_count} successful "
+          f"({parsed_count} parsed, {skipped_count} unchanged)")
+    print(f"Pages: {total_pages} in {elapsed:.2f}s "
+          f"({total_pages / elapsed if elapsed > 0 else 0.0:.1f} pages/sec)")
     print("=" * 70)
 
-    if parsed_count > 0:
+    if parsed_count + skipped_count > 0:
         print("✅ Parsing completed!")
         return 0
     else:
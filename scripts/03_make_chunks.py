@@ -9,41 +9,143 @@ import sys
 import json
 import re
 import hashlib
+import argparse
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Iterable, Iterator, Optional, TextIO, Tuple
 from collections import defaultdict
+from functools import lru_cache
 
-# Add parent directory to path
+# Add parent and src directories to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv(Path(__file__).parent.parent / ".env.backend")
 
+from ingest_manifest import IngestManifest, file_sha256, combine_hashes
+from near_duplicates import NEAR_DUP_THRESHOLD, mark_near_duplicates, save_clusters
+from token_counter import TokenCounter, get_token_counter
+from definitions import DefinitionIndex
+
 # Directories
 PROCESSED_DIR = Path(__file__).parent.parent / "data" / "processed"
 OUTPUT_FILE = PROCESSED_DIR / "chunks.jsonl"
+SECTIONS_FILE = PROCESSED_DIR / "sections.jsonl"
+
+# Configuration (chunk sizes are in tokens of the embedding model)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "200"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+MIN_CHUNK_SIZE = 100  # characters
+
+# Bumped when the section records or the chunk fields pointing into them change
+SECTION_FORMAT = 1
+
+# Distinct sentences, clauses and words whose token counts are memoized per chunker
+TOKEN_CACHE_SIZE = 65536
+
+# Sentence boundary: terminal punctuation, whitespace, then a capital letter
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# Where an over-long sentence may be cut: after ; : or , and before "(a)", "(iv)", "(2)"
+CLAUSE_BOUNDARY = re.compile(r'(?<=[;:,])\s+|\s+(?=\((?:[a-z]{1,4}|\d{1,3})\)\s)')
+
+# Text normalization for the deduplication hash
+WHITESPACE = re.compile(r'\s+')
+NON_TEXT_CHARS = re.compile(r'[^\w\s.,;:!?\-()]')
+
+MONTHS = r'(?:january|february|march|april|may|june|july|august|september|october|november|december)'
+
+# Chunk features, matched case-sensitively against lowercased text
+FEATURE_PATTERNS = {
+    "definition": [
+        r'means\s+',
+        r'refers to\s+',
+        r'includes\s+',
+        r'["""].*?["""].*?(?:means|refers|includes)'
+    ],
+    "rate": [
+        r'\d+(?:\.\d+)?%|\d+\s*per\s*cent'
+    ],
+    "date": [
+        r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
+        r'\d{4}[-/]\d{1,2}[-/]\d{1,2}',
+        MONTHS + r'\s+\d{1,2},?\s+\d{4}',
+        r'\d{1,2}\s+' + MONTHS + r'\s+\d{4}'
+    ],
+    "amount": [
+        r'₦\s*\d+(?:,\d{3})*(?:\.\d{2})?',
+        r'ngn\s*\d+(?:,\d{3})*(?:\.\d{2})?',
+        r'naira\s+\d+(?:,\d{3})*(?:\.\d{2})?'
+    ],
+    "conditional": [
+        r'(?:may|might|could|should|would|uncertain|unclear|subject to)'
+    ],
+    "amendment": [
+        r'(?:amend|repeal|replace|substitute|modify|change)'
+    ],
+    "exception": [
+        r'(?:except|unless|provided that|save|notwithstanding)'
+    ]
+}
+
+FEATURE_REGEXES = {
+    feature: [re.compile(pattern) for pattern in patterns]
+    for feature, patterns in FEATURE_PATTERNS.items()
+}
+
+PERCENT_RATE = re.compile(r'(\d+(?:\.\d+)?%)')
+
+def scan_features(text: str) -> Set[str]:
+    """
+    Find which chunk features occur in text.
 
-# Configuration
-CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "800"))
-CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", "200"))
-MIN_CHUNK_SIZE = 100
+    The text is lowercased once and each feature stops at its first match.
+    Features are searched independently, so text matching two features at
+    the same place (e.g. "May 2026" is both a date and conditional
+    language) sets both.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        Set of feature names from FEATURE_PATTERNS
+    """
+    lowered = text.lower()
+    return {
+        feature for feature, regexes in FEATURE_REGEXES.items()
+        if any(regex.search(lowered) for regex in regexes)
+    }
 
 class SemanticChunker:
     """Creates semantic chunks from parsed tax documents."""
 
-    def __init__(self, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP):
+    def __init__(
+        self,
+        chunk_size: int = CHUNK_TOKENS,
+        overlap: int = CHUNK_OVERLAP_TOKENS,
+        counter: Optional[TokenCounter] = None,
+        sections_out: Optional[TextIO] = None
+    ):
         """
         Initialize chunker.
 
         Args:
-            chunk_size: Target chunk size in characters
-            overlap: Overlap between chunks in characters
+            chunk_size: Target chunk size in tokens
+            overlap: Overlap between chunks in tokens
+            counter: Token counter (defaults to the embedding model's tokenizer)
+            sections_out: Text stream the section records are written to as
+                JSON lines (default: sections are not recorded)
         """
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self.counter = counter or get_token_counter(EMBEDDING_MODEL)
+        self.count_tokens = lru_cache(maxsize=TOKEN_CACHE_SIZE)(self.counter.count)
         self.seen_hashes: Set[str] = set()
+        self.sections_out = sections_out
+        self.section_count = 0
 
     def normalize_text(self, text: str) -> str:
         """
@@ -56,9 +158,9 @@ class SemanticChunker:
             Normalized text
         """
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = WHITESPACE.sub(' ', text)
         # Remove special characters but keep punctuation
-        text = re.sub(r'[^\w\s.,;:!?\-()]', '', text)
+        text = NON_TEXT_CHARS.sub('', text)
         return text.strip().lower()
 
     def compute_hash(self, text: str) -> str:
@@ -76,22 +178,35 @@ class SemanticChunker:
 
     def is_duplicate(self, text: str, threshold: float = 0.95) -> bool:
         """
-        Check if chunk is a near-duplicate.
+        Check if chunk is an exact duplicate (after normalization).
+
+        Near-duplicates are clustered across the whole corpus when chunks are
+        saved (see near_duplicates.mark_near_duplicates).
 
         Args:
             text: Text to check
-            threshold: Similarity threshold (not used in simple hash method)
+            threshold: Unused, kept for compatibility (see NEAR_DUP_THRESHOLD)
 
         Returns:
             True if duplicate
         """
-        chunk_hash = self.compute_hash(text)
+        return not self.claim_hash(self.compute_hash(text))
+
+    def claim_hash(self, chunk_hash: str) -> bool:
+        """
+        Record a chunk hash.
+
+        Args:
+            chunk_hash: Hash from compute_hash
 
+        Returns:
+            True if the hash is new, False if it is a duplicate
+        """
         if chunk_hash in self.seen_hashes:
-            return True
+            return False
 
         self.seen_hashes.add(chunk_hash)
-        return False
+        return True
 
     def split_by_sentences(self, text: str) -> List[str]:
         """
@@ -104,9 +219,53 @@ class SemanticChunker:
             List of sentences
         """
         # Split on sentence boundaries
-        sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
+        sentences = SENTENCE_BOUNDARY.split(text)
         return [s.strip() for s in sentences if s.strip()]
 
+    def split_long_sentence(self, sentence: str) -> List[Tuple[str, int]]:
+        """
+        Cut a sentence longer than the chunk size into pieces that fit.
+
+        Legal text often runs for pages without a full stop, so the sentence
+        is cut at clause boundaries first and only falls back to word
+        boundaries for a single clause that is still too long.
+
+        Args:
+            sentence: Sentence over the chunk size
+
+        Returns:
+            List of (piece, token count) tuples, in order
+        """
+        pieces = []
+        current: List[str] = []
+        current_tokens = 0
+
+        def flush():
+            nonlocal current, current_tokens
+            if current:
+                pieces.append((" ".join(current), current_tokens))
+            current, current_tokens = [], 0
+
+        for clause in CLAUSE_BOUNDARY.split(sentence):
+            clause = clause.strip()
+            if not clause:
+                continue
+
+            # Clauses that fit are packed whole; longer ones are packed word by word
+            clause_tokens = self.joined_tokens(clause)
+            units = [(clause, clause_tokens)] if clause_tokens <= self.chunk_size else [
+                (word, self.joined_tokens(word)) for word in clause.split()
+            ]
+
+            for unit, unit_tokens in units:
+                if current and current_tokens + unit_tokens > self.chunk_size:
+                    flush()
+                current.append(unit)
+                current_tokens += unit_tokens
+
+        flush()
+        return pieces
+
     def create_chunks_from_section(
         self,
         section: Dict[str, Any],
@@ -122,75 +281,165 @@ class SemanticChunker:
         Returns:
             List of chunk dictionaries
         """
-        chunks = []
         content = section.get("content", "")
 
         if not content or len(content) < MIN_CHUNK_SIZE:
-            return chunks
+            return []
 
         # Split into sentences
-        sentences = self.split_by_sentences(content)
+        return self.chunk_sentences(self.split_by_sentences(content), section, document_context)
 
-        if not sentences:
-            return chunks
+    def chunk_sentences(
+        self,
+        sentences: Iterable[str],
+        section: Dict[str, Any],
+        document_context: Dict[str, str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Pack a stream of sentences into overlapping chunks of at most
+        chunk_size tokens (sentences longer than that are split first).
+
+        Sentences are consumed lazily, so a generator over a large document
+        never needs the full text in memory. The section record is written
+        to sections_out as the sentences arrive (its text first, then the
+        other fields once the chunk spans are known), and each chunk gets its
+        section_id and the character span (section_start, section_end) it
+        covers in the section's text, so retrieval can expand a chunk to its
+        surroundings.
+
+        Args:
+            sentences: Iterable of sentences
+            section: Section dictionary the sentences belong to
+            document_context: Document-level context
+
+        Returns:
+            List of chunk dictionaries
+        """
+        chunks = []
+        section_id = f"{document_context['document_name']}#{self.section_count}"
+        section_tokens = 0
+        spans = []
+        offset = 0
+
+        def emit(pieces: List[str], start: int):
+            chunk_text = " ".join(pieces)
+            chunk_hash = self.compute_hash(chunk_text)
+            end = start + len(chunk_text)
+            spans.append({"hash": chunk_hash, "start": start, "end": end})
+
+            # Skip if duplicate
+            if self.claim_hash(chunk_hash):
+                chunk = self.create_chunk_metadata(chunk_text, section, document_context, chunk_hash)
+                chunk["section_id"] = section_id
+                chunk["section_start"] = start
+                chunk["section_end"] = end
+                chunks.append(chunk)
 
         # Build chunks with overlap
         current_chunk = []
+        current_sizes = []
+        current_offsets = []
         current_size = 0
 
-        for sentence in sentences:
-            sentence_size = len(sentence)
-
+        for sentence, sentence_size in self.measure_sentences(sentences):
             # If adding this sentence exceeds chunk size and we have content
             if current_size + sentence_size > self.chunk_size and current_chunk:
-                # Create chunk
-                chunk_text = " ".join(current_chunk)
-
-                # Skip if duplicate
-                if not self.is_duplicate(chunk_text):
-                    chunk = self.create_chunk_metadata(
-                        chunk_text,
-                        section,
-                        document_context
-                    )
-                    chunks.append(chunk)
+                emit(current_chunk, current_offsets[0])
 
                 # Start new chunk with overlap
-                # Keep last few sentences for context
+                # Keep last few sentences for context, leaving room for this sentence
                 overlap_size = 0
-                overlap_sentences = []
+                overlap_start = len(current_chunk)
+                room = min(self.overlap, self.chunk_size - sentence_size)
 
-                for sent in reversed(current_chunk):
-                    if overlap_size + len(sent) <= self.overlap:
-                        overlap_sentences.insert(0, sent)
-                        overlap_size += len(sent)
-                    else:
-                        break
+                while overlap_start > 0 and overlap_size + current_sizes[overlap_start - 1] <= room:
+                    overlap_start -= 1
+                    overlap_size += current_sizes[overlap_start]
 
-                current_chunk = overlap_sentences
+                current_chunk = current_chunk[overlap_start:]
+                current_sizes = current_sizes[overlap_start:]
+                current_offsets = current_offsets[overlap_start:]
                 current_size = overlap_size
 
             current_chunk.append(sentence)
+            current_sizes.append(sentence_size)
+            current_offsets.append(offset)
             current_size += sentence_size
 
+            # The section text joins every piece with a space, exactly like a chunk.
+            # tiktoken never merges across the space that starts a word, so the
+            # pieces' counts add up to the section's.
+            if self.sections_out is not None:
+                if offset:
+                    self.sections_out.write(" ")
+                    section_tokens += sentence_size
+                else:
+                    self.sections_out.write('{"text":"')
+                    section_tokens = self.counter.count(sentence)
+                self.sections_out.write(json.dumps(sentence, ensure_ascii=False)[1:-1])
+            offset += len(sentence) + 1
+
         # Add final chunk
         if current_chunk:
-            chunk_text = " ".join(current_chunk)
-            if not self.is_duplicate(chunk_text):
-                chunk = self.create_chunk_metadata(
-                    chunk_text,
-                    section,
-                    document_context
-                )
-                chunks.append(chunk)
+            emit(current_chunk, current_offsets[0])
+
+        if offset:
+            self.section_count += 1
+            if self.sections_out is not None:
+                record = {
+                    "section_id": section_id,
+                    "document_name": document_context["document_name"],
+                    "section_type": section.get("type", ""),
+                    "section_number": str(section.get("number", "")),
+                    "section_title": section.get("title", ""),
+                    "page_start": section.get("page_start", 0),
+                    "page_end": section.get("page_end", 0),
+                    "token_count": section_tokens,
+                    "tokenizer": self.counter.name,
+                    "chunks": spans
+                }
+                self.sections_out.write('",' + json.dumps(record, ensure_ascii=False)[1:] + "\n")
 
         return chunks
 
+    def joined_tokens(self, text: str) -> int:
+        """
+        Count the tokens text adds when joined to a chunk with a space.
+
+        Counting the separator keeps the sum over a chunk's pieces an upper
+        bound of the chunk's own token count.
+
+        Args:
+            text: Sentence, clause or word
+
+        Returns:
+            Token count (memoized)
+        """
+        return self.count_tokens(" " + text)
+
+    def measure_sentences(self, sentences: Iterable[str]) -> Iterator[Tuple[str, int]]:
+        """
+        Count the tokens of each sentence, splitting any that exceed the chunk size.
+
+        Args:
+            sentences: Iterable of sentences
+
+        Yields:
+            (sentence or piece, token count) tuples
+        """
+        for sentence in sentences:
+            tokens = self.joined_tokens(sentence)
+            if tokens <= self.chunk_size:
+                yield sentence, tokens
+            else:
+                yield from self.split_long_sentence(sentence)
+
     def create_chunk_metadata(
         self,
         text: str,
         section: Dict[str, Any],
-        document_context: Dict[str, str]
+        document_context: Dict[str, str],
+        chunk_hash: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Create chunk with rich metadata.
@@ -199,12 +448,14 @@ class SemanticChunker:
             text: Chunk text
             section: Source section
             document_context: Document context
+            chunk_hash: Hash from compute_hash, if already computed
 
         Returns:
             Chunk dictionary
         """
         # Detect if this chunk contains specific types of information
-        uncertainty_notes = self.detect_uncertainties(text)
+        features = scan_features(text)
+        uncertainty_notes = self.detect_uncertainties(text, features)
 
         chunk = {
             "text": text.strip(),
@@ -217,11 +468,13 @@ class SemanticChunker:
             "page_end": section.get("page_end", 0),
             "char_count": len(text),
             "word_count": len(text.split()),
-            "hash": self.compute_hash(text),
-            "contains_definition": self.contains_definition(text),
-            "contains_rate": self.contains_rate(text),
-            "contains_date": self.contains_date(text),
-            "contains_amount": self.contains_amount(text),
+            "token_count": self.counter.count(text.strip()),
+            "tokenizer": self.counter.name,
+            "hash": chunk_hash or self.compute_hash(text),
+            "contains_definition": "definition" in features,
+            "contains_rate": "rate" in features,
+            "contains_date": "date" in features,
+            "contains_amount": "amount" in features,
             "uncertainty_notes": uncertainty_notes
         }
 
@@ -229,80 +482,178 @@ class SemanticChunker:
 
     def contains_definition(self, text: str) -> bool:
         """Check if text contains a definition."""
-        patterns = [
-            r'means\s+',
-            r'refers to\s+',
-            r'includes\s+',
-            r'["""].*?["""].*?(?:means|refers|includes)'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+        return "definition" in scan_features(text)
 
     def contains_rate(self, text: str) -> bool:
         """Check if text contains tax rates or percentages."""
-        return bool(re.search(r'\d+(?:\.\d+)?%|\d+\s*per\s*cent', text, re.IGNORECASE))
+        return "rate" in scan_features(text)
 
     def contains_date(self, text: str) -> bool:
         """Check if text contains dates."""
-        patterns = [
-            r'\d{1,2}[-/]\d{1,2}[-/]\d{2,4}',
-            r'\d{4}[-/]\d{1,2}[-/]\d{1,2}',
-            r'(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}',
-            r'\d{1,2}\s+(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{4}'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
+        return "date" in scan_features(text)
 
     def contains_amount(self, text: str) -> bool:
         """Check if text contains monetary amounts."""
-        patterns = [
-            r'₦\s*\d+(?:,\d{3})*(?:\.\d{2})?',
-            r'NGN\s*\d+(?:,\d{3})*(?:\.\d{2})?',
-            r'Naira\s+\d+(?:,\d{3})*(?:\.\d{2})?'
-        ]
-        return any(re.search(pattern, text, re.IGNORECASE) for pattern in patterns)
-
-    def detect_uncertainties(self, text: str) -> List[str]:
+        return "amount" in scan_features(text)
+
+    def detect_uncertainties(self, text: str, features: Optional[Set[str]] = None) -> List[str]:
         """
         Detect conflicting or uncertain information.
 
         Args:
             text: Text to analyze
+            features: Result of scan_features(text), if already computed
 
         Returns:
             List of uncertainty notes
         """
+        if features is None:
+            features = scan_features(text)
+
         notes = []
 
         # Check for conditional language
-        if re.search(r'(?:may|might|could|should|would|uncertain|unclear|subject to)', text, re.IGNORECASE):
+        if "conditional" in features:
             notes.append("Contains conditional or uncertain language")
 
         # Check for conflicting rates (multiple percentages)
-        rates = re.findall(r'(\d+(?:\.\d+)?%)', text)
+        rates = PERCENT_RATE.findall(text) if "%" in text else []
         if len(rates) > 2:
-            notes.append(f"Multiple rates mentioned: {', '.join(set(rates))}")
+            notes.append(f"Multiple rates mentioned: {', '.join(dict.fromkeys(rates))}")
 
         # Check for amendments or changes
-        if re.search(r'(?:amend|repeal|replace|substitute|modify|change)', text, re.IGNORECASE):
+        if "amendment" in features:
             notes.append("Contains amendments or changes to existing law")
 
         # Check for exceptions
-        if re.search(r'(?:except|unless|provided that|save|notwithstanding)', text, re.IGNORECASE):
+        if "exception" in features:
             notes.append("Contains exceptions or special conditions")
 
         return notes
 
-def process_document(parsed_file: Path, chunker: SemanticChunker) -> List[Dict[str, Any]]:
+def iter_page_records(pages_file: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read page records from a *_pages.jsonl file.
+
+    Args:
+        pages_file: Path to the pages JSONL written by 02_parse_pdf.py
+
+    Yields:
+        Page dictionaries (the header record is skipped)
+    """
+    with open(pages_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") != "header":
+                yield record
+
+def read_pages_header(pages_file: Path) -> Dict[str, Any]:
+    """
+    Read the header record of a *_pages.jsonl file.
+
+    Args:
+        pages_file: Path to the pages JSONL
+
+    Returns:
+        Header dictionary (empty if the file has no header)
+    """
+    with open(pages_file, 'r', encoding='utf-8') as f:
+        record = json.loads(f.readline() or "{}")
+    return record if record.get("type") == "header" else {}
+
+def iter_section_contents(
+    pages: Iterable[Dict[str, Any]],
+    sections: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read the text of each section back from a stream of pages.
+
+    The parsed JSON only records where each section's heading is
+    (page_start, heading_line); its content is every non-blank line after
+    the heading up to the next heading, as 02_parse_pdf.py scanned it. One
+    section's text is held at a time.
+
+    Args:
+        pages: Iterable of page dictionaries, in order
+        sections: Sections from the parsed JSON, in document order
+
+    Yields:
+        Each section with its "content" filled in
+    """
+    sections = iter(sections)
+    current = None
+    upcoming = next(sections, None)
+    content_lines = []
+
+    for page in pages:
+        page_number = page["page_number"]
+
+        for index, line in enumerate(page.get("text", "").split("\n")):
+            if upcoming is not None and (page_number, index) >= (upcoming["page_start"], upcoming["heading_line"]):
+                if current is not None:
+                    yield {**current, "content": "".join(content_lines)}
+                current, upcoming, content_lines = upcoming, next(sections, None), []
+                continue
+
+            line = line.strip()
+            if current is not None and line:
+                content_lines.append(line + "\n")
+
+    if current is not None:
+        yield {**current, "content": "".join(content_lines)}
+
+def iter_document_sentences(
+    pages: Iterable[Dict[str, Any]],
+    chunker: SemanticChunker
+) -> Iterator[str]:
+    """
+    Split a stream of pages into sentences, one page at a time.
+
+    The last sentence of each page is carried over to the next page, so a
+    sentence that continues across a page break is split exactly as if the
+    pages had been joined with blank lines.
+
+    Args:
+        pages: Iterable of page dictionaries
+        chunker: SemanticChunker used to split sentences
+
+    Yields:
+        Sentences in document order
+    """
+    carry = None
+
+    for page in pages:
+        text = page.get("text")
+        if not text:
+            continue
+
+        # Split the raw text so the carried-over tail keeps its whitespace
+        pieces = SENTENCE_BOUNDARY.split(text if carry is None else carry + "\n\n" + text)
+
+        for piece in pieces[:-1]:
+            if piece.strip():
+                yield piece.strip()
+        carry = pieces[-1]
+
+    if carry is not None and carry.strip():
+        yield carry.strip()
+
+def process_document(parsed_file: Path, chunker: SemanticChunker, verbose: bool = True) -> List[Dict[str, Any]]:
     """
     Process a parsed document and create chunks.
 
     Args:
         parsed_file: Path to parsed JSON file
         chunker: SemanticChunker instance
+        verbose: Print progress messages
 
     Returns:
         List of chunks
     """
-    print(f"\n📄 Processing: {parsed_file.name}")
+    log = print if verbose else (lambda *args, **kwargs: None)
+    log(f"\n📄 Processing: {parsed_file.name}")
 
     with open(parsed_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
@@ -315,37 +666,141 @@ def process_document(parsed_file: Path, chunker: SemanticChunker) -> List[Dict[s
     all_chunks = []
 
     sections = data.get("sections", [])
-    print(f"   Found {len(sections)} sections")
+    log(f"   Found {len(sections)} sections")
 
     if sections:
-        # Process documents with section structure
+        # Process documents with section structure; older parsed files carry the text inline
+        if "content" not in sections[0]:
+            pages_file = parsed_file.parent / data["pages_file"]
+            sections = iter_section_contents(iter_page_records(pages_file), sections)
+
         for section in sections:
             chunks = chunker.create_chunks_from_section(section, document_context)
             all_chunks.extend(chunks)
     else:
         # Process documents without sections - chunk the full text from pages
-        pages = data.get("pages", [])
-        if pages:
-            # Extract text from all pages
-            full_text = "\n\n".join(page.get("text", "") for page in pages if page.get("text"))
-            if full_text:
-                print(f"   No sections found, chunking full text from {len(pages)} pages ({len(full_text)} characters)")
-                # Create a pseudo-section for the full document
-                pseudo_section = {
-                    "type": "full_document",
-                    "number": "",
-                    "title": data.get("metadata", {}).get("title", "Document"),
-                    "content": full_text,  # Changed from "text" to "content"
-                    "page_start": 1,
-                    "page_end": len(pages)
-                }
-                chunks = chunker.create_chunks_from_section(pseudo_section, document_context)
-                all_chunks.extend(chunks)
+        if data.get("pages_file"):
+            # Streamed page output: read pages lazily from the JSONL file
+            pages_file = parsed_file.parent / data["pages_file"]
+            page_count = read_pages_header(pages_file).get("page_count", data.get("page_count", 0))
+            pages = iter_page_records(pages_file)
+        else:
+            # Older parsed files carry the pages inline
+            page_count = len(data.get("pages", []))
+            pages = iter(data.get("pages", []))
+
+        if page_count:
+            log(f"   No sections found, chunking full text from {page_count} pages")
+            # Create a pseudo-section for the full document
+            pseudo_section = {
+                "type": "full_document",
+                "number": "",
+                "title": data.get("metadata", {}).get("title", "Document"),
+                "page_start": 1,
+                "page_end": page_count
+            }
+            sentences = iter_document_sentences(pages, chunker)
+            chunks = chunker.chunk_sentences(sentences, pseudo_section, document_context)
+            all_chunks.extend(chunks)
 
-    print(f"   ✅ Created {len(all_chunks)} chunks")
+    log(f"   ✅ Created {len(all_chunks)} chunks")
 
     return all_chunks
 
+def chunk_document(parsed_file: Path, verbose: bool = False) -> List[Dict[str, Any]]:
+    """
+    Chunk one parsed document with its own chunker.
+
+    Safe to run in a worker process. Only duplicates within the document
+    are dropped; use deduplicate_chunks across documents.
+
+    Args:
+        parsed_file: Path to parsed JSON file
+        verbose: Print progress messages
+
+    Returns:
+        List of chunks
+    """
+    parsed_file = Path(parsed_file)
+
+    # Sections are written as they are chunked
+    with open(sections_path(parsed_file), 'w', encoding='utf-8') as sections_out:
+        chunker = SemanticChunker(chunk_size=CHUNK_TOKENS, overlap=CHUNK_OVERLAP_TOKENS, sections_out=sections_out)
+        chunks = process_document(parsed_file, chunker, verbose=verbose)
+
+    save_document_records(document_chunks_path(parsed_file), chunks)
+    return chunks
+
+def sections_path(parsed_file: Path) -> Path:
+    """Path of the per-document sections JSONL next to a parsed file."""
+    return parsed_file.with_name(parsed_file.name.replace("_parsed.json", "_sections.jsonl"))
+
+def document_chunks_path(parsed_file: Path) -> Path:
+    """Path of the per-document chunks JSONL (before cross-document dedup) next to a parsed file."""
+    return parsed_file.with_name(parsed_file.name.replace("_parsed.json", "_chunks.jsonl"))
+
+def save_document_records(path: Path, records: List[Dict[str, Any]]):
+    """
+    Write one document's chunks, one JSON record per line.
+
+    Args:
+        path: Result of document_chunks_path
+        records: The chunks, after chunking the document
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def merge_sections(all_chunks: List[Dict[str, Any]]) -> int:
+    """
+    Combine the per-document sections of the chunked documents into sections.jsonl.
+
+    Args:
+        all_chunks: Final chunks of every document, in order
+
+    Returns:
+        Number of sections written
+    """
+    document_names = list(dict.fromkeys(chunk.get("document_name", "") for chunk in all_chunks))
+    by_document = defaultdict(list)
+
+    for path in sorted(PROCESSED_DIR.glob("*_sections.jsonl")):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    section = json.loads(line)
+                    by_document[section["document_name"]].append(section)
+
+    count = 0
+    with open(SECTIONS_FILE, 'w', encoding='utf-8') as f:
+        for document_name in document_names:
+            for section in by_document.get(document_name, []):
+                f.write(json.dumps(section, ensure_ascii=False) + '\n')
+                count += 1
+
+    return count
+
+def deduplicate_chunks(chunks: List[Dict[str, Any]], seen_hashes: Set[str]) -> List[Dict[str, Any]]:
+    """
+    Drop chunks already seen in earlier documents.
+
+    Applying this to documents in order gives the same result as chunking
+    them all with one shared chunker.
+
+    Args:
+        chunks: Chunks of one document
+        seen_hashes: Hashes of chunks kept so far (updated in place)
+
+    Returns:
+        Chunks not seen before
+    """
+    kept = []
+    for chunk in chunks:
+        if chunk["hash"] not in seen_hashes:
+            seen_hashes.add(chunk["hash"])
+            kept.append(chunk)
+    return kept
+
 def validate_chunks(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Validate chunks and generate quality report.
@@ -388,34 +843,124 @@ def validate_chunks(chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
 
     return report
 
-def main():
-    """Main execution function."""
-    print("=" * 70)
-    print("Nigerian Tax Reform Acts - Semantic Chunker")
-    print("=" * 70)
-    print(f"Chunk size: {CHUNK_SIZE}")
-    print(f"Overlap: {CHUNK_OVERLAP}")
+def chunk_input_hash(parsed_file: Path) -> str:
+    """
+    Hash everything that determines a document's chunks.
 
-    # Find all parsed files
-    parsed_files = list(PROCESSED_DIR.glob("*_parsed.json"))
+    Args:
+        parsed_file: Path to parsed JSON file
 
-    if not parsed_files:
-        print("❌ Error: No parsed files found. Run 02_parse_pdf.py first.")
-        return 1
+    Returns:
+        Hex digest over the parsed JSON, its pages file and the chunk settings
+    """
+    parts = [
+        file_sha256(parsed_file),
+        CHUNK_TOKENS,
+        CHUNK_OVERLAP_TOKENS,
+        get_token_counter(EMBEDDING_MODEL).name,
+        NEAR_DUP_THRESHOLD,
+        SECTION_FORMAT
+    ]
+
+    pages_file = parsed_file.with_name(parsed_file.name.replace("_parsed.json", "_pages.jsonl"))
+    if pages_file.exists():
+        parts.append(file_sha256(pages_file))
+
+    return combine_hashes(parts)
+
+def reusable_chunks(parsed_file: Path, manifest: IngestManifest) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
+    """
+    Find the previous chunks of a document if it is unchanged.
 
-    print(f"\nFound {len(parsed_files)} parsed documents")
+    The chunks are the document's own, from before cross-document dedup,
+    so dedup can be redone over the whole corpus: a chunk dropped as a
+    duplicate of another document comes back when that document changes.
+
+    Args:
+        parsed_file: Path to parsed JSON file
+        manifest: Ingest manifest
+
+    Returns:
+        Tuple of (input hash, previous chunks or None if the document must be chunked)
+    """
+    input_hash = chunk_input_hash(parsed_file)
+    entry = manifest.get("chunk", parsed_file.name)
+    chunks_file = document_chunks_path(parsed_file)
+
+    fresh = manifest.is_fresh("chunk", parsed_file.name, input_hash)
+
+    # Older runs did not write the document's sections and chunks
+    if entry and fresh and sections_path(parsed_file).exists() and chunks_file.exists():
+        with open(chunks_file, 'r', encoding='utf-8') as f:
+            reused = [json.loads(line) for line in f if line.strip()]
+        if [chunk.get("hash") for chunk in reused] == entry.get("chunk_hashes"):
+            return input_hash, reused
+
+    return input_hash, None
+
+def record_chunks(manifest: IngestManifest, parsed_file: Path, input_hash: str, chunks: List[Dict[str, Any]]):
+    """
+    Record a document's chunks so it is reused while unchanged.
+
+    Args:
+        manifest: Ingest manifest
+        parsed_file: Path to parsed JSON file
+        input_hash: Result of chunk_input_hash
+        chunks: Chunks of the document, before cross-document dedup
+    """
+    manifest.record(
+        "chunk",
+        parsed_file.name,
+        input_hash,
+        document_name=chunks[0]["document_name"] if chunks else None,
+        chunk_hashes=[chunk["hash"] for chunk in chunks]
+    )
+
+def combine_documents(
+    manifest: IngestManifest,
+    docs: List[Tuple[Path, str, List[Dict[str, Any]]]]
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Deduplicate the documents' chunks across the corpus and record each document.
+
+    Dedup runs over every document on every run, reused or not, so the
+    result never depends on which documents changed.
 
-    chunker = SemanticChunker(chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP)
+    Args:
+        manifest: Ingest manifest
+        docs: (parsed file, input hash, chunks before dedup) of every document, in order
+
+    Returns:
+        Tuple of (final chunks in order, number of duplicates removed)
+    """
+    seen_hashes: Set[str] = set()
     all_chunks = []
+    duplicate_count = 0
 
-    # Process each document
-    for parsed_file in parsed_files:
-        chunks = process_document(parsed_file, chunker)
-        all_chunks.extend(chunks)
+    for parsed_file, input_hash, chunks in docs:
+        kept = deduplicate_chunks(chunks, seen_hashes)
+        duplicate_count += len(chunks) - len(kept)
+        all_chunks.extend(kept)
+        record_chunks(manifest, parsed_file, input_hash, chunks)
 
-    print(f"\n" + "=" * 70)
-    print(f"Total chunks created: {len(all_chunks)}")
-    print(f"Duplicates removed: {len(chunker.seen_hashes) - len(all_chunks)}")
+    return all_chunks, duplicate_count
+
+def save_chunks(all_chunks: List[Dict[str, Any]]):
+    """
+    Mark near-duplicates, validate chunks and write chunks.jsonl,
+    sections.jsonl, definitions_index.json, chunks_metadata.json and
+    duplicate_clusters.json.
+
+    Args:
+        all_chunks: Final chunks of every document, in order (annotated in place)
+    """
+    # Cluster near-duplicates across documents
+    print(f"\n🧬 Detecting near-duplicates (Jaccard >= {NEAR_DUP_THRESHOLD:g})...")
+    clusters = mark_near_duplicates(all_chunks, NEAR_DUP_THRESHOLD)
+    near_duplicate_count = sum(len(cluster["duplicates"]) for cluster in clusters)
+    save_clusters(clusters, len(all_chunks), NEAR_DUP_THRESHOLD)
+    print(f"   Found {near_duplicate_count} near-duplicates in {len(clusters)} clusters "
+          f"(only representatives are embedded)")
 
     # Validate chunks
     print("\n🔍 Validating chunks...")
@@ -437,20 +982,37 @@ def main():
         for chunk in all_chunks:
             f.write(json.dumps(chunk, ensure_ascii=False) + '\n')
 
+    section_count = merge_sections(all_chunks)
+
+    # Index the definitions of the chunked documents for direct lookup
+    definitions = DefinitionIndex.build(
+        PROCESSED_DIR,
+        document_names={chunk.get("document_name", "") for chunk in all_chunks}
+    )
+    definitions.save()
+
     # Save metadata
     metadata = {
         "timestamp": datetime.now().isoformat(),
         "timezone": "Africa/Lagos",
         "chunk_count": len(all_chunks),
-        "chunk_size": CHUNK_SIZE,
-        "chunk_overlap": CHUNK_OVERLAP,
+        "section_count": section_count,
+        "definition_terms": len(definitions.terms),
+        "chunk_tokens": CHUNK_TOKENS,
+        "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS,
+        "tokenizer": get_token_counter(EMBEDDING_MODEL).name,
+        "token_counts_exact": get_token_counter(EMBEDDING_MODEL).exact,
         "validation_report": validation_report,
         "statistics": {
             "with_definitions": sum(1 for c in all_chunks if c.get("contains_definition")),
             "with_rates": sum(1 for c in all_chunks if c.get("contains_rate")),
             "with_dates": sum(1 for c in all_chunks if c.get("contains_date")),
             "with_amounts": sum(1 for c in all_chunks if c.get("contains_amount")),
-            "with_uncertainties": sum(1 for c in all_chunks if c.get("uncertainty_notes"))
+            "with_uncertainties": sum(1 for c in all_chunks if c.get("uncertainty_notes")),
+            "total_tokens": sum(c.get("token_count", 0) for c in all_chunks),
+            "max_tokens": max((c.get("token_count", 0) for c in all_chunks), default=0),
+            "near_duplicates": near_duplicate_count,
+            "duplicate_clusters": len(clusters)
         }
     }
 
@@ -458,13 +1020,81 @@ def main():
     with open(metadata_file, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2, ensure_ascii=False)
 
-    print(f"   ✅ Saved {len(all_chunks)} chunks")
+    print(f"   ✅ Saved {len(all_chunks)} chunks in {section_count} sections")
     print(f"   📊 Statistics:")
     print(f"      - With definitions: {metadata['statistics']['with_definitions']}")
     print(f"      - With rates: {metadata['statistics']['with_rates']}")
     print(f"      - With dates: {metadata['statistics']['with_dates']}")
     print(f"      - With amounts: {metadata['statistics']['with_amounts']}")
     print(f"      - With uncertainties: {metadata['statistics']['with_uncertainties']}")
+    estimated = "" if metadata["token_counts_exact"] else " (ESTIMATED, tiktoken unavailable)"
+    print(f"      - Tokens: {metadata['statistics']['total_tokens']:,} "
+          f"(largest chunk {metadata['statistics']['max_tokens']}){estimated}")
+    print(f"   📖 Indexed {len(definitions.terms)} defined terms and {len(definitions.aliases)} aliases")
+
+def main():
+    """Main execution function."""
+    arg_parser = argparse.ArgumentParser(description="Create semantic chunks from parsed documents")
+    arg_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-chunk every document even if it is unchanged since the last run"
+    )
+    args = arg_parser.parse_args()
+
+    print("=" * 70)
+    print("Nigerian Tax Reform Acts - Semantic Chunker")
+    print("=" * 70)
+    print(f"Chunk size: {CHUNK_TOKENS} tokens")
+    print(f"Overlap: {CHUNK_OVERLAP_TOKENS} tokens")
+    counter = get_token_counter(EMBEDDING_MODEL)
+    print(f"Tokenizer: {counter.name}{'' if counter.exact else ' ⚠️  estimated counts, install tiktoken'}")
+
+    # Find all parsed files (sorted so chunk order is stable between runs)
+    parsed_files = sorted(PROCESSED_DIR.glob("*_parsed.json"))
+
+    if not parsed_files:
+        print("❌ Error: No parsed files found. Run 02_parse_pdf.py first.")
+        return 1
+
+    print(f"\nFound {len(parsed_files)} parsed documents")
+
+    manifest = IngestManifest()
+    removed = set(manifest.data["chunk"]) - {parsed_file.name for parsed_file in parsed_files}
+
+    docs = []
+    changed_count = 0
+
+    # Process each document (in order, so cross-document dedup is stable)
+    for parsed_file in parsed_files:
+        if args.force:
+            input_hash, chunks = chunk_input_hash(parsed_file), None
+        else:
+            input_hash, chunks = reusable_chunks(parsed_file, manifest)
+
+        if chunks is not None:
+            print(f"\n⏭️  Unchanged: {parsed_file.name} ({len(chunks)} chunks)")
+        else:
+            chunks = chunk_document(parsed_file, verbose=True)
+            changed_count += 1
+
+        docs.append((parsed_file, input_hash, chunks))
+
+    all_chunks, duplicate_count = combine_documents(manifest, docs)
+
+    manifest.forget("chunk", [parsed_file.name for parsed_file in parsed_files])
+
+    if changed_count == 0 and not removed and OUTPUT_FILE.exists():
+        print("\n✅ No documents changed, chunks are up to date.")
+        return 0
+
+    print(f"\n" + "=" * 70)
+    print(f"Total chunks created: {len(all_chunks)}")
+    print(f"Duplicates removed: {duplicate_count}")
+
+    save_chunks(all_chunks)
+
+    manifest.save()
 
     print("\n✅ Chunking completed successfully!")
     return 0
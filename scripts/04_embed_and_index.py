@@ -1,20 +1,22 @@
 #!/usr/bin/env python3
 """
 Embedding and indexing pipeline for Nigerian Tax Reform Acts.
-Creates vector embeddings using OpenAI and indexes with FAISS and ChromaDB.
+Creates vector embeddings using OpenAI (or the local provider) and indexes with FAISS and ChromaDB.
 """
 
 import os
 import sys
 import json
+import shutil
+import argparse
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 import numpy as np
 from tqdm import tqdm
 
-# Add parent directory to path
+# Add parent and src directories to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -22,7 +24,6 @@ load_dotenv(Path(__file__).parent.parent / ".env.backend")
 
 # Import libraries
 try:
-    from openai import OpenAI
     import faiss
     import chromadb
 except ImportError as e:
@@ -30,75 +31,252 @@ except ImportError as e:
     print("Run: pip install -r requirements.txt")
     sys.exit(1)
 
+from ingest_manifest import IngestManifest, file_sha256, combine_hashes
+from embedding_cache import EmbeddingCache, text_key, format_bytes
+from embedding_scheduler import EmbeddingScheduler, EmbeddingError
+from near_duplicates import is_representative, format_alternate_sources
+from token_counter import get_token_counter
+from providers import get_provider
+from index_versions import (
+    MANIFEST_NAME, CURRENT_FILE, new_version_dir, write_manifest, publish, current_version,
+    load_manifest, collect_garbage
+)
+
 # Directories
 PROCESSED_DIR = Path(__file__).parent.parent / "data" / "processed"
 EMBEDDINGS_DIR = Path(__file__).parent.parent / "data" / "embeddings"
 EMBEDDINGS_DIR.mkdir(parents=True, exist_ok=True)
 
 # Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))  # 0 = model default
+EMBEDDING_CACHE_MAX_AGE_DAYS = float(os.getenv("EMBEDDING_CACHE_MAX_AGE_DAYS", "90"))
+
+# Embedding request scheduling (set RPM/TPM to your account's rate limits)
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_RPM = int(os.getenv("EMBED_RPM", "3000"))
+EMBED_TPM = int(os.getenv("EMBED_TPM", "1000000"))
+EMBED_BATCH_TOKENS = int(os.getenv("EMBED_BATCH_TOKENS", "32000"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "6"))
 BATCH_SIZE = 100
-
-if not OPENAI_API_KEY:
-    print("❌ Error: OPENAI_API_KEY not set in .env.backend")
+COLLECTION_NAME = "nigerian_tax_acts"
+
+# Index artifacts written by save_embeddings into each version directory
+FAISS_FILE = "faiss_index.bin"
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNK_METADATA_FILE = "chunk_metadata.json"
+CHUNKS_FILE = "chunks.jsonl"
+SECTIONS_FILE = "sections.jsonl"
+CHROMA_DIR = "chromadb"
+
+# Compliance knowledge base, indexed as a second collection next to the Acts
+KB_FILE = Path(__file__).parent.parent / "src" / "data" / "compliance-knowledge-base.jsonl"
+KB_COLLECTION_NAME = "compliance_kb"
+KB_FAISS_FILE = "kb_faiss_index.bin"
+KB_EMBEDDINGS_FILE = "kb_embeddings.npy"
+KB_ENTRIES_FILE = "kb_entries.jsonl"
+
+ARTIFACT_FILES = (
+    FAISS_FILE, EMBEDDINGS_FILE, CHUNK_METADATA_FILE, CHUNKS_FILE, SECTIONS_FILE,
+    KB_FAISS_FILE, KB_EMBEDDINGS_FILE, KB_ENTRIES_FILE
+)
+
+# Flat layout written before versioned builds (still read as a fallback)
+LEGACY_INDEX_METADATA_PATH = EMBEDDINGS_DIR / "index_metadata.json"
+
+# Embedding provider (MODEL_PROVIDER: openai or local)
+try:
+    provider = get_provider()
+except ValueError as e:
+    print(f"❌ Error: {e} (set it in .env.backend, or MODEL_PROVIDER=local to run offline)")
     sys.exit(1)
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+def chroma_metadata(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build the ChromaDB metadata record for a chunk.
+
+    Args:
+        chunk: Chunk dictionary
+
+    Returns:
+        Flat metadata dictionary
+    """
+    return {
+        "document_name": chunk.get("document_name", ""),
+        "section_number": chunk.get("section_number", ""),
+        "section_title": chunk.get("section_title", ""),
+        "section_type": chunk.get("section_type", ""),
+        "page_start": chunk.get("page_start", 0),
+        "page_end": chunk.get("page_end", 0),
+        "token_count": chunk.get("token_count", 0),
+        "tokenizer": chunk.get("tokenizer", ""),
+        "section_id": chunk.get("section_id", ""),
+        "section_start": chunk.get("section_start", 0),
+        "section_end": chunk.get("section_end", 0),
+        "contains_definition": chunk.get("contains_definition", False),
+        "contains_rate": chunk.get("contains_rate", False),
+        "contains_date": chunk.get("contains_date", False),
+        "contains_amount": chunk.get("contains_amount", False),
+        "alternate_sources": format_alternate_sources(chunk)
+    }
+
+def bullet_list(heading: str, items: List[str]) -> str:
+    """Format items as a headed bullet list ("" if there are none)."""
+    if not items:
+        return ""
+    return f"{heading}:\n" + "\n".join(f"- {item}" for item in items)
+
+def kb_parts(entry: Dict[str, Any]) -> List[str]:
+    """Question, key points and checklist of a knowledge base entry, formatted."""
+    return [
+        entry["question"],
+        bullet_list("Key points", entry.get("key_points", [])),
+        bullet_list("Compliance checklist", entry.get("compliance_checklist", []))
+    ]
+
+def kb_text(entry: Dict[str, Any]) -> str:
+    """
+    Text embedded for a knowledge base entry: its question, key points and checklist.
+
+    Args:
+        entry: Entry from the compliance knowledge base
+
+    Returns:
+        Text to embed
+    """
+    return "\n\n".join(part for part in kb_parts(entry) if part)
+
+def kb_document(entry: Dict[str, Any], token_counter) -> Dict[str, Any]:
+    """
+    Build the indexed document of a knowledge base entry.
+
+    The embedded text is kept short so it matches how-to questions; the
+    passage put in the context also carries the full answer.
+
+    Args:
+        entry: Entry from the compliance knowledge base
+        token_counter: Token counter for the embedding model
+
+    Returns:
+        Document dictionary
+    """
+    text = kb_text(entry)
+    question, key_points, checklist = kb_parts(entry)
+    context = "\n\n".join(
+        part for part in (question, entry.get("answer_markdown", "").strip(), key_points, checklist) if part
+    )
+
+    return {
+        "kb_id": entry["id"],
+        "hash": text_key(text),
+        "text": text,
+        "context": context,
+        "question": entry["question"],
+        "topic": entry.get("topic", ""),
+        "audience": entry.get("audience", []),
+        "tags": entry.get("tags", []),
+        "effective_date": entry.get("effective_date", ""),
+        "citations": entry.get("citations", []),
+        "token_count": token_counter.count(context),
+        "tokenizer": token_counter.name
+    }
+
+def kb_chroma_metadata(document: Dict[str, Any]) -> Dict[str, Any]:
+    """ChromaDB metadata of a knowledge base document (scalar values only)."""
+    return {
+        "kb_id": document["kb_id"],
+        "topic": document["topic"],
+        "tags": ", ".join(document["tags"]),
+        "effective_date": document["effective_date"]
+    }
 
 class EmbeddingIndexer:
     """Creates and manages vector embeddings and indices."""
 
-    def __init__(self, model: str = EMBEDDING_MODEL):
+    def __init__(
+        self,
+        model: str = EMBEDDING_MODEL,
+        dimensions: int = EMBEDDING_DIMENSIONS,
+        cache: EmbeddingCache = None
+    ):
         """
         Initialize indexer.
 
         Args:
-            model: OpenAI embedding model to use
+            model: Embedding model to use
+            dimensions: Requested embedding dimensions (0 for the model default)
+            cache: Persistent embedding cache (None to always call the API)
         """
         self.model = model
+        # Local vectors are cached apart from the real model's
+        self.cache_model = model if provider.name == "openai" else f"{provider.name}/{model}"
+        self.requested_dimensions = dimensions
+        self.cache = cache
+        self.scheduler = EmbeddingScheduler(
+            self.embed_batch,
+            get_token_counter(model),
+            requests_per_minute=EMBED_RPM,
+            tokens_per_minute=EMBED_TPM,
+            concurrency=EMBED_CONCURRENCY,
+            batch_tokens=EMBED_BATCH_TOKENS,
+            max_retries=EMBED_MAX_RETRIES
+        )
         self.embeddings = []
         self.chunks = []
         self.dimension = None
 
-    def create_embeddings(self, chunks: List[Dict[str, Any]]) -> List[np.ndarray]:
+    def create_embeddings(self, chunks: List[Dict[str, Any]], verbose: bool = True) -> List[np.ndarray]:
         """
-        Create embeddings for chunks using OpenAI API.
+        Create embeddings for chunks, serving repeated text from the cache.
 
         Args:
             chunks: List of chunk dictionaries
+            verbose: Print cache and request progress
 
         Returns:
             List of embedding vectors
-        """
-        embeddings = []
-        texts = [chunk["text"] for chunk in chunks]
 
-        print(f"   Creating embeddings for {len(texts)} chunks...")
-
-        # Process in batches
-        for i in tqdm(range(0, len(texts), BATCH_SIZE), desc="   Embedding"):
-            batch = texts[i:i + BATCH_SIZE]
-
-            try:
-                response = client.embeddings.create(
-                    model=self.model,
-                    input=batch
-                )
-
-                batch_embeddings = [np.array(item.embedding) for item in response.data]
-                embeddings.extend(batch_embeddings)
+        Raises:
+            EmbeddingError: If a request still fails after all retries
+        """
+        keys = [text_key(chunk["text"]) for chunk in chunks]
+        cached = self.cache.get_many(keys, self.cache_model, self.requested_dimensions) if self.cache else {}
+
+        # Embed each distinct uncached text once
+        missing = {}
+        for key, chunk in zip(keys, chunks):
+            if key not in cached and key not in missing:
+                missing[key] = chunk
+
+        if cached and verbose:
+            print(f"   Embedding cache: {len(cached)} hits, {len(missing)} misses")
+
+        missing_keys = list(missing)
+
+        def write_through(positions: List[int], vectors: List[np.ndarray]):
+            # Persist each finished request so a later failure loses nothing
+            self.cache.put_many(
+                ((missing_keys[i], vector) for i, vector in zip(positions, vectors)),
+                self.cache_model,
+                self.requested_dimensions
+            )
 
-            except Exception as e:
-                print(f"\n   ❌ Error creating embeddings for batch {i}: {e}")
-                # Create zero vectors as fallback
-                if embeddings:
-                    dim = len(embeddings[0])
-                else:
-                    dim = 1536  # Default for text-embedding-3-small
+        # Chunks record their token count; recount if any is missing or came from another tokenizer
+        tokenizer = self.scheduler.counter.name
+        counts = [
+            chunk.get("token_count") if chunk.get("tokenizer") == tokenizer else None
+            for chunk in missing.values()
+        ]
+
+        fresh = self.scheduler.embed(
+            [chunk["text"] for chunk in missing.values()],
+            on_batch=write_through if self.cache else None,
+            verbose=verbose,
+            token_counts=counts if all(count is not None for count in counts) else None
+        )
+        fresh_by_key = dict(zip(missing_keys, fresh))
 
-                for _ in batch:
-                    embeddings.append(np.zeros(dim))
+        embeddings = [cached[key] if key in cached else fresh_by_key[key] for key in keys]
 
         # Set dimension
         if embeddings:
@@ -106,6 +284,18 @@ class EmbeddingIndexer:
 
         return embeddings
 
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed one request's worth of texts with the embedding provider.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        return provider.embed(texts, self.model, self.requested_dimensions or None)
+
     def build_faiss_index(self, embeddings: List[np.ndarray]) -> faiss.IndexFlatL2:
         """
         Build FAISS index for fast similarity search.
@@ -135,14 +325,22 @@ class EmbeddingIndexer:
     def build_chromadb_collection(
         self,
         chunks: List[Dict[str, Any]],
-        embeddings: List[np.ndarray]
+        embeddings: List[np.ndarray],
+        index_dir: Path,
+        rebuild: bool = False
     ) -> chromadb.Collection:
         """
-        Build ChromaDB collection.
+        Build or incrementally update the ChromaDB collection.
+
+        Documents are keyed by chunk hash, so an existing collection only
+        needs stale chunks deleted, new chunks added and changed metadata
+        (e.g. alternate sources) updated.
 
         Args:
             chunks: List of chunk dictionaries
             embeddings: List of embedding vectors
+            index_dir: Directory holding the ChromaDB database
+            rebuild: Drop and recreate the collection
 
         Returns:
             ChromaDB collection
@@ -151,91 +349,201 @@ class EmbeddingIndexer:
 
         # Initialize ChromaDB client
         chroma_client = chromadb.PersistentClient(
-            path=str(EMBEDDINGS_DIR / "chromadb")
+            path=str(index_dir / CHROMA_DIR)
         )
 
-        # Delete existing collection if it exists
-        try:
-            chroma_client.delete_collection(name="nigerian_tax_acts")
-        except:
-            pass
+        collection = None
+        if not rebuild:
+            try:
+                collection = chroma_client.get_collection(name=COLLECTION_NAME)
+            except Exception:
+                collection = None
 
-        # Create collection
-        collection = chroma_client.create_collection(
-            name="nigerian_tax_acts",
-            metadata={"description": "Nigerian Tax Reform Acts 2025-2026"}
-        )
+        # Collections from before hash-keyed ids cannot be updated in place
+        if collection is not None and (collection.metadata or {}).get("id_scheme") != "chunk_hash":
+            collection = None
 
-        # Prepare data for ChromaDB
-        ids = [f"chunk_{i}" for i in range(len(chunks))]
-        documents = [chunk["text"] for chunk in chunks]
-        metadatas = []
+        if collection is None:
+            # Delete existing collection if it exists
+            try:
+                chroma_client.delete_collection(name=COLLECTION_NAME)
+            except Exception:
+                pass
+
+            # Create collection
+            collection = chroma_client.create_collection(
+                name=COLLECTION_NAME,
+                metadata={
+                    "description": "Nigerian Tax Reform Acts 2025-2026",
+                    "id_scheme": "chunk_hash",
+                    # Squared L2, as in the FAISS index; the retriever converts it to cosine
+                    "hnsw:space": "l2"
+                }
+            )
+            existing_metadata = {}
+        else:
+            existing = collection.get(include=["metadatas"])
+            existing_metadata = dict(zip(existing["ids"], existing["metadatas"]))
+        existing_ids = set(existing_metadata)
+
+        # Prepare data for ChromaDB (ids must be unique even if a hash repeats)
+        ids = []
+        id_counts: Dict[str, int] = {}
+        for i, chunk in enumerate(chunks):
+            base_id = chunk.get("hash") or f"chunk_{i}"
+            count = id_counts.get(base_id, 0)
+            id_counts[base_id] = count + 1
+            ids.append(base_id if count == 0 else f"{base_id}_{count}")
+        wanted_ids = set(ids)
+
+        stale_ids = sorted(existing_ids - wanted_ids)
+        if stale_ids:
+            for i in range(0, len(stale_ids), BATCH_SIZE):
+                collection.delete(ids=stale_ids[i:i + BATCH_SIZE])
+            print(f"   Removed {len(stale_ids)} stale documents")
+
+        new_positions = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing_ids]
+        changed_positions = [
+            i for i, chunk_id in enumerate(ids)
+            if chunk_id in existing_ids and existing_metadata[chunk_id] != chroma_metadata(chunks[i])
+        ]
+
+        for start in range(0, len(changed_positions), BATCH_SIZE):
+            batch = changed_positions[start:start + BATCH_SIZE]
+            collection.update(
+                ids=[ids[i] for i in batch],
+                metadatas=[chroma_metadata(chunks[i]) for i in batch]
+            )
 
-        for chunk in chunks:
-            metadata = {
-                "document_name": chunk.get("document_name", ""),
-                "section_number": chunk.get("section_number", ""),
-                "section_title": chunk.get("section_title", ""),
-                "section_type": chunk.get("section_type", ""),
-                "page_start": chunk.get("page_start", 0),
-                "page_end": chunk.get("page_end", 0),
-                "contains_definition": chunk.get("contains_definition", False),
-                "contains_rate": chunk.get("contains_rate", False),
-                "contains_date": chunk.get("contains_date", False),
-                "contains_amount": chunk.get("contains_amount", False)
-            }
-            metadatas.append(metadata)
+        for start in tqdm(range(0, len(new_positions), BATCH_SIZE), desc="   Indexing"):
+            batch = new_positions[start:start + BATCH_SIZE]
+
+            collection.add(
+                ids=[ids[i] for i in batch],
+                documents=[chunks[i]["text"] for i in batch],
+                metadatas=[chroma_metadata(chunks[i]) for i in batch],
+                embeddings=[embeddings[i].tolist() for i in batch]
+            )
 
-        # Convert embeddings to list format
-        embeddings_list = [emb.tolist() for emb in embeddings]
+        print(f"   ✅ ChromaDB collection has {collection.count()} documents "
+              f"({len(new_positions)} added, {len(changed_positions)} updated, "
+              f"{len(existing_ids & wanted_ids) - len(changed_positions)} unchanged)")
 
-        # Add to collection in batches
-        for i in tqdm(range(0, len(chunks), BATCH_SIZE), desc="   Indexing"):
-            end_idx = min(i + BATCH_SIZE, len(chunks))
+        return collection
 
+    def build_kb_collection(
+        self,
+        documents: List[Dict[str, Any]],
+        embeddings: List[np.ndarray],
+        index_dir: Path
+    ):
+        """
+        Build the compliance knowledge base collection next to the Acts.
+
+        The knowledge base holds a few dozen entries, so the collection is
+        recreated on every build rather than updated in place.
+
+        Args:
+            documents: Knowledge base documents (see kb_document)
+            embeddings: Embeddings aligned with documents
+            index_dir: Directory holding the ChromaDB database
+
+        Returns:
+            ChromaDB collection
+        """
+        chroma_client = chromadb.PersistentClient(path=str(index_dir / CHROMA_DIR))
+        try:
+            chroma_client.delete_collection(name=KB_COLLECTION_NAME)
+        except Exception:
+            pass
+
+        collection = chroma_client.create_collection(
+            name=KB_COLLECTION_NAME,
+            metadata={
+                "description": "Compliance knowledge base (CAC, FIRS, PenCom, NSITF, NDPA)",
+                "hnsw:space": "l2"
+            }
+        )
+        if documents:
             collection.add(
-                ids=ids[i:end_idx],
-                documents=documents[i:end_idx],
-                metadatas=metadatas[i:end_idx],
-                embeddings=embeddings_list[i:end_idx]
+                ids=[document["kb_id"] for document in documents],
+                documents=[document["text"] for document in documents],
+                metadatas=[kb_chroma_metadata(document) for document in documents],
+                embeddings=[embedding.tolist() for embedding in embeddings]
             )
 
-        print(f"   ✅ ChromaDB collection created with {len(chunks)} documents")
-
+        print(f"   ✅ ChromaDB collection {KB_COLLECTION_NAME} has {collection.count()} documents")
         return collection
 
+    def save_kb(self, documents: List[Dict[str, Any]], embeddings: List[np.ndarray], index_dir: Path):
+        """
+        Save the knowledge base's FAISS index, embeddings and documents to a version directory.
+
+        Args:
+            documents: Knowledge base documents (see kb_document)
+            embeddings: Embeddings aligned with documents
+            index_dir: Version directory
+        """
+        embeddings_array = np.array(embeddings, dtype='float32').reshape(len(embeddings), self.dimension)
+        kb_index = faiss.IndexFlatL2(self.dimension)
+        kb_index.add(embeddings_array)
+
+        faiss.write_index(kb_index, str(index_dir / KB_FAISS_FILE))
+        np.save(index_dir / KB_EMBEDDINGS_FILE, embeddings_array)
+        with open(index_dir / KB_ENTRIES_FILE, 'w', encoding='utf-8') as f:
+            for document in documents:
+                f.write(json.dumps(document, ensure_ascii=False) + "\n")
+        print(f"   ✅ Knowledge base index saved ({kb_index.ntotal} entries)")
+
     def save_embeddings(
         self,
         embeddings: List[np.ndarray],
         chunks: List[Dict[str, Any]],
-        faiss_index: faiss.IndexFlatL2
+        faiss_index: faiss.IndexFlatL2,
+        index_dir: Path
     ):
         """
-        Save embeddings and metadata to disk.
+        Save embeddings, indexed chunks and metadata to a version directory.
 
         Args:
             embeddings: List of embedding vectors
             chunks: List of chunk dictionaries
             faiss_index: FAISS index
+            index_dir: Version directory
         """
         print("   Saving embeddings and index...")
 
         # Save FAISS index
-        faiss_path = EMBEDDINGS_DIR / "faiss_index.bin"
+        faiss_path = index_dir / FAISS_FILE
         faiss.write_index(faiss_index, str(faiss_path))
         print(f"   ✅ FAISS index saved to: {faiss_path}")
 
         # Save embeddings as numpy array
         embeddings_array = np.array(embeddings).astype('float32')
-        embeddings_path = EMBEDDINGS_DIR / "embeddings.npy"
+        embeddings_path = index_dir / EMBEDDINGS_FILE
         np.save(embeddings_path, embeddings_array)
         print(f"   ✅ Embeddings saved to: {embeddings_path}")
 
+        # Save the indexed chunks in index order, so positions can never drift from the vectors
+        chunks_path = index_dir / CHUNKS_FILE
+        with open(chunks_path, 'w', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        print(f"   ✅ Indexed chunks saved to: {chunks_path}")
+
+        # Sections the chunks' section spans refer to
+        sections_path = index_dir / SECTIONS_FILE
+        if (PROCESSED_DIR / SECTIONS_FILE).exists():
+            shutil.copyfile(PROCESSED_DIR / SECTIONS_FILE, sections_path)
+        else:
+            sections_path.touch()
+
         # Save chunk metadata (without text to save space)
         chunk_metadata = []
         for i, chunk in enumerate(chunks):
             metadata = {
                 "chunk_id": i,
+                "hash": chunk.get("hash", ""),
                 "document_name": chunk.get("document_name", ""),
                 "section_type": chunk.get("section_type", ""),
                 "section_number": chunk.get("section_number", ""),
@@ -244,35 +552,64 @@ class EmbeddingIndexer:
                 "page_end": chunk.get("page_end", 0),
                 "char_count": chunk.get("char_count", 0),
                 "word_count": chunk.get("word_count", 0),
+                "token_count": chunk.get("token_count", 0),
+                "section_id": chunk.get("section_id", ""),
+                "section_start": chunk.get("section_start", 0),
+                "section_end": chunk.get("section_end", 0),
                 "contains_definition": chunk.get("contains_definition", False),
                 "contains_rate": chunk.get("contains_rate", False),
                 "contains_date": chunk.get("contains_date", False),
                 "contains_amount": chunk.get("contains_amount", False),
-                "uncertainty_notes": chunk.get("uncertainty_notes", [])
+                "uncertainty_notes": chunk.get("uncertainty_notes", []),
+                "alternate_sources": chunk.get("alternate_sources", [])
             }
             chunk_metadata.append(metadata)
 
-        metadata_path = EMBEDDINGS_DIR / "chunk_metadata.json"
+        metadata_path = index_dir / CHUNK_METADATA_FILE
         with open(metadata_path, 'w', encoding='utf-8') as f:
             json.dump(chunk_metadata, f, indent=2, ensure_ascii=False)
         print(f"   ✅ Metadata saved to: {metadata_path}")
 
-        # Save index metadata
-        index_metadata = {
-            "timestamp": datetime.now().isoformat(),
-            "timezone": "Africa/Lagos",
-            "model": self.model,
-            "dimension": self.dimension,
-            "total_chunks": len(chunks),
-            "faiss_index_path": str(faiss_path),
-            "embeddings_path": str(embeddings_path),
-            "chromadb_path": str(EMBEDDINGS_DIR / "chromadb")
-        }
-
-        index_metadata_path = EMBEDDINGS_DIR / "index_metadata.json"
-        with open(index_metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(index_metadata, f, indent=2, ensure_ascii=False)
-        print(f"   ✅ Index metadata saved to: {index_metadata_path}")
+    def seal_version(
+        self,
+        chunks: List[Dict[str, Any]],
+        kb_documents: List[Dict[str, Any]],
+        index_dir: Path
+    ) -> Dict[str, Any]:
+        """
+        Write the integrity manifest of a finished build.
+
+        Args:
+            chunks: Indexed chunks, in order
+            kb_documents: Indexed knowledge base documents, in order
+            index_dir: Version directory
+
+        Returns:
+            Manifest dictionary
+        """
+        chunks_file = PROCESSED_DIR / "chunks.jsonl"
+        manifest = write_manifest(
+            index_dir,
+            ARTIFACT_FILES,
+            [chunk.get("hash", "") for chunk in chunks],
+            model=self.model,
+            dimension=self.dimension,
+            params={
+                "requested_dimensions": self.requested_dimensions,
+                "provider": provider.name,
+                "faiss_index": "IndexFlatL2",
+                # Tokenizer of the recorded token counts (an estimate when tiktoken was unavailable)
+                "tokenizer": get_token_counter(self.model).name,
+                "token_counts_exact": get_token_counter(self.model).exact,
+                "collection": COLLECTION_NAME,
+                "source_chunks_sha256": file_sha256(chunks_file) if chunks_file.exists() else "",
+                "kb_collection": KB_COLLECTION_NAME,
+                "kb_entries": len(kb_documents),
+                "kb_sha256": file_sha256(KB_FILE) if KB_FILE.exists() else ""
+            }
+        )
+        print(f"   ✅ Manifest saved to: {index_dir / MANIFEST_NAME}")
+        return manifest
 
 def load_chunks() -> List[Dict[str, Any]]:
     """
@@ -295,46 +632,403 @@ def load_chunks() -> List[Dict[str, Any]]:
 
     return chunks
 
+def load_kb_entries(kb_file: Path = KB_FILE) -> List[Dict[str, Any]]:
+    """
+    Load the compliance knowledge base.
+
+    Args:
+        kb_file: Knowledge base JSONL file
+
+    Returns:
+        Entries with an id and a question (empty if the file is missing)
+    """
+    if not kb_file.exists():
+        print(f"   ⚠️  {kb_file} not found, the knowledge base collection will be empty")
+        return []
+
+    entries = []
+    with open(kb_file, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if not entry.get("id") or not entry.get("question"):
+                print(f"   ⚠️  Skipping knowledge base line {line_number}: no id or question")
+                continue
+            entries.append(entry)
+
+    return entries
+
+def previous_index() -> Tuple[Path, Dict[str, Any]]:
+    """
+    Locate the published index and its build information.
+
+    Returns:
+        Tuple of (index directory, manifest or legacy index metadata); the
+        dictionary is empty if there is no previous index
+    """
+    version_dir = current_version()
+    if version_dir is not None and (version_dir / MANIFEST_NAME).exists():
+        return version_dir, load_manifest(version_dir)
+
+    # Builds from before versioning wrote flat files with index_metadata.json
+    if LEGACY_INDEX_METADATA_PATH.exists():
+        with open(LEGACY_INDEX_METADATA_PATH, 'r', encoding='utf-8') as f:
+            return EMBEDDINGS_DIR, json.load(f)
+
+    return EMBEDDINGS_DIR, {}
+
+def load_previous_embeddings(model: str, dimensions: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Load the vectors of the previous build, keyed by chunk hash.
+
+    Args:
+        model: Embedding model the vectors must have been created with
+        dimensions: Requested dimensions (0 accepts the model default)
+
+    Returns:
+        Mapping of chunk hash to embedding (empty if nothing reusable)
+    """
+    index_dir, index_metadata = previous_index()
+    embeddings_path = index_dir / EMBEDDINGS_FILE
+    chunk_metadata_path = index_dir / CHUNK_METADATA_FILE
+
+    if not (index_metadata and embeddings_path.exists() and chunk_metadata_path.exists()):
+        return {}
+    if index_metadata.get("model") != model:
+        return {}
+    if index_metadata.get("params", {}).get("provider", "openai") != provider.name:
+        return {}
+    if dimensions and index_metadata.get("dimension") != dimensions:
+        return {}
+
+    with open(chunk_metadata_path, 'r', encoding='utf-8') as f:
+        chunk_metadata = json.load(f)
+
+    embeddings = np.load(embeddings_path)
+    if len(embeddings) != len(chunk_metadata):
+        return {}
+
+    return {
+        metadata["hash"]: embeddings[i]
+        for i, metadata in enumerate(chunk_metadata)
+        if metadata.get("hash")
+    }
+
+def index_artifacts() -> List[Path]:
+    """
+    List the outputs that must exist for the published index to be reused.
+
+    Returns:
+        Paths of the current version's manifest and artifacts (the pointer
+        file alone if nothing has been published yet)
+    """
+    version_dir = current_version()
+    if version_dir is None:
+        return [CURRENT_FILE]
+    return [version_dir / MANIFEST_NAME, version_dir / CHROMA_DIR] + [version_dir / name for name in ARTIFACT_FILES]
+
+def index_input_hash(chunks_file: Path = PROCESSED_DIR / "chunks.jsonl") -> str:
+    """
+    Hash everything that determines the index.
+
+    Args:
+        chunks_file: Chunks JSONL file
+
+    Returns:
+        Hex digest over the chunks file, knowledge base and embedding settings
+        ("" if the chunks file is missing)
+    """
+    if not chunks_file.exists():
+        return ""
+    settings = [
+        file_sha256(chunks_file),
+        EMBEDDING_MODEL,
+        EMBEDDING_DIMENSIONS,
+        file_sha256(KB_FILE) if KB_FILE.exists() else ""
+    ]
+    if provider.name != "openai":
+        settings.append(provider.name)
+    return combine_hashes(settings)
+
+def embed_chunks(
+    indexer: EmbeddingIndexer,
+    chunks: List[Dict[str, Any]],
+    previous: Dict[str, np.ndarray],
+    verbose: bool = True
+) -> Tuple[List[np.ndarray], int]:
+    """
+    Embed chunks, reusing vectors from the previous build where possible.
+
+    Args:
+        indexer: EmbeddingIndexer instance
+        chunks: Chunks to embed
+        previous: Result of load_previous_embeddings
+        verbose: Print progress
+
+    Returns:
+        Tuple of (embeddings aligned with chunks, number of chunks not in the previous build)
+
+    Raises:
+        EmbeddingError: If a request still fails after all retries
+    """
+    new_chunks = [chunk for chunk in chunks if chunk.get("hash") not in previous]
+    new_embeddings = iter(indexer.create_embeddings(new_chunks, verbose=verbose) if new_chunks else [])
+
+    embeddings = [
+        previous[chunk["hash"]] if chunk.get("hash") in previous else next(new_embeddings)
+        for chunk in chunks
+    ]
+    return embeddings, len(new_chunks)
+
+def embed_kb(indexer: EmbeddingIndexer, verbose: bool = True) -> Tuple[List[Dict[str, Any]], List[np.ndarray]]:
+    """
+    Embed the compliance knowledge base (served from the embedding cache when unchanged).
+
+    Args:
+        indexer: EmbeddingIndexer instance
+        verbose: Print progress
+
+    Returns:
+        Tuple of (knowledge base documents, embeddings aligned with them)
+
+    Raises:
+        EmbeddingError: If a request still fails after all retries
+    """
+    token_counter = get_token_counter(indexer.model)
+    documents = [kb_document(entry, token_counter) for entry in load_kb_entries()]
+    if not documents:
+        return [], []
+    # Only the text is passed: token_count describes the context passage, not what is embedded
+    embeddings = indexer.create_embeddings([{"text": document["text"]} for document in documents], verbose=verbose)
+    return documents, embeddings
+
+def write_indices(
+    indexer: EmbeddingIndexer,
+    chunks: List[Dict[str, Any]],
+    embeddings: List[np.ndarray],
+    kb_documents: List[Dict[str, Any]],
+    kb_embeddings: List[np.ndarray],
+    rebuild: bool = False
+) -> faiss.IndexFlatL2:
+    """
+    Build all index artifacts in a new version directory and publish it.
+
+    Readers keep using the previous version until the pointer is flipped,
+    and a failed build leaves it untouched.
+
+    Args:
+        indexer: EmbeddingIndexer instance
+        chunks: Final chunks, in order
+        embeddings: Embeddings aligned with chunks
+        kb_documents: Knowledge base documents (see embed_kb)
+        kb_embeddings: Embeddings aligned with kb_documents
+        rebuild: Recreate the ChromaDB collection from scratch
+
+    Returns:
+        FAISS index
+    """
+    indexer.dimension = len(embeddings[0]) if embeddings else None
+    previous_dir, previous_build = previous_index()
+    # Vectors from another provider cannot be updated in place
+    if previous_build.get("params", {}).get("provider", "openai") != provider.name:
+        rebuild = True
+    version_dir = new_version_dir()
+    print(f"\n📁 Building index version {version_dir.name}")
+
+    try:
+        # Build FAISS index (a flat index rebuilds from the stored vectors in milliseconds)
+        print("\n📊 Building FAISS index...")
+        faiss_index = indexer.build_faiss_index(embeddings)
+
+        # Update a copy of the previous ChromaDB collection, leaving the published one untouched
+        print("\n💾 Building ChromaDB collection...")
+        if not rebuild and (previous_dir / CHROMA_DIR).exists():
+            shutil.copytree(previous_dir / CHROMA_DIR, version_dir / CHROMA_DIR)
+        indexer.build_chromadb_collection(chunks, embeddings, version_dir, rebuild=rebuild)
+        indexer.build_kb_collection(kb_documents, kb_embeddings, version_dir)
+
+        # Save everything
+        print("\n💾 Saving embeddings and indices...")
+        indexer.save_embeddings(embeddings, chunks, faiss_index, version_dir)
+        indexer.save_kb(kb_documents, kb_embeddings, version_dir)
+        indexer.seal_version(chunks, kb_documents, version_dir)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+    publish(version_dir)
+    print(f"   ✅ Published index version {version_dir.name}")
+
+    removed = collect_garbage()
+    if removed:
+        print(f"   🧹 Removed {len(removed)} old index versions")
+
+    return faiss_index
+
+def record_index(manifest: IngestManifest, index_hash: str, chunk_count: int, embedded_count: int):
+    """
+    Record a completed index build.
+
+    Args:
+        manifest: Ingest manifest
+        index_hash: Result of index_input_hash
+        chunk_count: Number of indexed chunks
+        embedded_count: Number of chunks not reused from the previous build
+    """
+    version_dir = current_version()
+    manifest.record(
+        "index",
+        "chunks.jsonl",
+        index_hash,
+        model=EMBEDDING_MODEL,
+        chunk_count=chunk_count,
+        embedded_count=embedded_count,
+        version=version_dir.name if version_dir else ""
+    )
+
+def print_cache_summary(cache: EmbeddingCache):
+    """Print session hit statistics and size of the embedding cache."""
+    stats = cache.stats()
+    report = cache.size_report()
+    print(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%} hit rate), {report['entries']} entries, "
+          f"{format_bytes(report['disk_bytes'])}")
+
+def manage_cache(compact: bool) -> int:
+    """
+    Report on (and optionally compact) the persistent embedding cache.
+
+    Args:
+        compact: Remove stale entries and vacuum before reporting
+
+    Returns:
+        Exit code
+    """
+    cache = EmbeddingCache()
+
+    print("=" * 70)
+    print("Embedding Cache")
+    print("=" * 70)
+
+    if compact:
+        keep_keys = set()
+        if (PROCESSED_DIR / "chunks.jsonl").exists():
+            keep_keys = {text_key(chunk["text"]) for chunk in load_chunks()}
+        keep_keys.update(text_key(kb_text(entry)) for entry in load_kb_entries())
+
+        before = cache.size_report()["disk_bytes"]
+        removed = cache.compact(max_age_days=EMBEDDING_CACHE_MAX_AGE_DAYS, keep_keys=keep_keys)
+        after = cache.size_report()["disk_bytes"]
+        print(f"🧹 Removed {removed} stale entries ({format_bytes(before)} -> {format_bytes(after)})")
+
+    report = cache.size_report()
+    print(f"Path: {report['path']}")
+    print(f"Entries: {report['entries']}")
+    print(f"Vectors: {format_bytes(report['vector_bytes'])}")
+    print(f"On disk: {format_bytes(report['disk_bytes'])}")
+    for entry in report["models"]:
+        dims = entry["dims"] or "default"
+        print(f"   {entry['model']} (dims: {dims}): {entry['entries']} entries")
+
+    cache.close()
+    return 0
+
 def main():
     """Main execution function."""
+    arg_parser = argparse.ArgumentParser(description="Embed chunks and build vector indices")
+    arg_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild all indices from scratch (cached embeddings are still reused)"
+    )
+    arg_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the persistent embedding cache"
+    )
+    arg_parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print embedding cache size and exit"
+    )
+    arg_parser.add_argument(
+        "--compact-cache",
+        action="store_true",
+        help=f"Drop cache entries unused for EMBEDDING_CACHE_MAX_AGE_DAYS "
+             f"({EMBEDDING_CACHE_MAX_AGE_DAYS:g}) that the current chunks do not need, then vacuum"
+    )
+    args = arg_parser.parse_args()
+
+    if args.cache_stats or args.compact_cache:
+        return manage_cache(args.compact_cache)
+
     print("=" * 70)
     print("Nigerian Tax Reform Acts - Embedding & Indexing")
     print("=" * 70)
     print(f"Model: {EMBEDDING_MODEL}")
 
+    # Skip everything if the chunks are unchanged since the last build
+    manifest = IngestManifest()
+    index_hash = index_input_hash()
+    if not args.force and index_hash and manifest.is_fresh("index", "chunks.jsonl", index_hash, index_artifacts()):
+        print("\n✅ Chunks unchanged since the last build, index is up to date.")
+        return 0
+
     # Load chunks
     print("\n📥 Loading chunks...")
     chunks = load_chunks()
     print(f"   Loaded {len(chunks)} chunks")
 
+    # Near-duplicates are represented by their cluster's first chunk
+    representatives = [chunk for chunk in chunks if is_representative(chunk)]
+    if len(representatives) < len(chunks):
+        print(f"   Skipping {len(chunks) - len(representatives)} near-duplicates")
+    chunks = representatives
+
     # Initialize indexer
-    indexer = EmbeddingIndexer(model=EMBEDDING_MODEL)
+    cache = None if args.no_cache else EmbeddingCache()
+    indexer = EmbeddingIndexer(model=EMBEDDING_MODEL, cache=cache)
+
+    # Reuse vectors of chunks that were already embedded
+    previous = {} if args.force else load_previous_embeddings(EMBEDDING_MODEL, EMBEDDING_DIMENSIONS)
+    reused_count = sum(1 for chunk in chunks if chunk.get("hash") in previous)
+    print(f"   Reusing {reused_count} embeddings, {len(chunks) - reused_count} chunks to embed")
 
     # Create embeddings
     print("\n🔮 Creating embeddings...")
-    embeddings = indexer.create_embeddings(chunks)
-    print(f"   ✅ Created {len(embeddings)} embeddings (dimension: {indexer.dimension})")
+    try:
+        embeddings, embedded_count = embed_chunks(indexer, chunks, previous)
 
-    # Build FAISS index
-    print("\n📊 Building FAISS index...")
-    faiss_index = indexer.build_faiss_index(embeddings)
+        print("\n📚 Embedding compliance knowledge base...")
+        kb_documents, kb_embeddings = embed_kb(indexer)
+    except EmbeddingError as e:
+        print(f"\n❌ Error creating embeddings: {e}")
+        if cache:
+            print("   Completed requests are cached; rerun to resume.")
+        return 1
+    print(f"   ✅ Created {embedded_count} embeddings "
+          f"(dimension: {len(embeddings[0]) if embeddings else None})")
+    print(f"   ✅ Knowledge base: {len(kb_documents)} entries")
 
-    # Build ChromaDB collection
-    print("\n💾 Building ChromaDB collection...")
-    collection = indexer.build_chromadb_collection(chunks, embeddings)
+    faiss_index = write_indices(indexer, chunks, embeddings, kb_documents, kb_embeddings, rebuild=args.force)
 
-    # Save everything
-    print("\n💾 Saving embeddings and indices...")
-    indexer.save_embeddings(embeddings, chunks, faiss_index)
+    record_index(manifest, index_hash, len(chunks), embedded_count)
+    manifest.save()
 
     # Summary
     print("\n" + "=" * 70)
     print("✅ Embedding and indexing completed successfully!")
     print("=" * 70)
     print(f"Total embeddings: {len(embeddings)}")
+    print(f"Newly embedded: {embedded_count}")
+    if cache:
+        print_cache_summary(cache)
+        cache.close()
     print(f"Embedding dimension: {indexer.dimension}")
     print(f"FAISS index size: {faiss_index.ntotal}")
-    print(f"ChromaDB collection: nigerian_tax_acts")
+    print(f"ChromaDB collections: {COLLECTION_NAME}, {KB_COLLECTION_NAME} ({len(kb_documents)} entries)")
+    print(f"Index version: {current_version().name}")
 
     return 0
 
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Analyzer for the API's structured request log.
+Reads data/logs/requests.jsonl (written by src/request_log.py) and reports
+latency percentiles per route and stage, the slowest query shapes, the
+cache opportunity (how many requests repeat an earlier query) and token
+spend per route.
+"""
+
+import sys
+import json
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from request_log import REQUEST_LOG_PATH
+
+def load_records(paths: List[Path], since: Optional[datetime] = None, route: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Read request records, oldest file first.
+
+    Args:
+        paths: Log files
+        since: Skip records before this time
+        route: Keep only this route
+
+    Returns:
+        List of records in file order
+    """
+    records = []
+    skipped = 0
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash mid-write
+                    skipped += 1
+                    continue
+                if since and datetime.fromisoformat(record["ts"]) < since:
+                    continue
+                if route and record.get("route") != route:
+                    continue
+                records.append(record)
+    if skipped:
+        print(f"⚠️  Skipped {skipped} unreadable lines")
+    return records
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """Return count, p50/p95/p99, max and mean of latencies."""
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1] if ordered else 0.0,
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0
+    }
+
+def group_by(records: List[Dict[str, Any]], key: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Group records by a field."""
+    groups = defaultdict(list)
+    for record in records:
+        groups[record.get(key) or "unknown"].append(record)
+    return dict(groups)
+
+def is_success(record: Dict[str, Any]) -> bool:
+    """Whether a request returned 2xx."""
+    return 200 <= record.get("status", 0) < 300
+
+def analyze(records: List[Dict[str, Any]], top: int, min_count: int,
+            prompt_price: float, completion_price: float) -> Dict[str, Any]:
+    """
+    Compute the report.
+
+    Args:
+        records: Request records
+        top: Entries in the slowest-shapes and repeated-queries lists
+        min_count: Requests a query shape needs to be ranked
+        prompt_price: Price per million prompt tokens (0 = no cost estimate)
+        completion_price: Price per million completion tokens
+
+    Returns:
+        Report dictionary
+    """
+    report: Dict[str, Any] = {"records": len(records), "routes": {}}
+
+    for route, route_records in sorted(group_by(records, "route").items()):
+        ok = [record for record in route_records if is_success(record)]
+        errors = sum(1 for record in route_records if record.get("status", 0) >= 500)
+        limited = sum(1 for record in route_records if record.get("status") == 429)
+
+        # Stage times over successful requests; a stage absent from a request counts as 0
+        stage_names = sorted({stage for record in ok for stage in record.get("stages", {})})
+        mean_total = sum(record["duration_ms"] for record in ok) / len(ok) if ok else 0.0
+        stages = {}
+        for stage in stage_names:
+            summary = latency_summary([record.get("stages", {}).get(stage, 0.0) for record in ok])
+            summary["share"] = summary["mean"] / mean_total if mean_total else 0.0
+            stages[stage] = summary
+
+        # Cache opportunity: requests repeating an earlier normalized query
+        hashes = [record["query_hash"] for record in ok if record.get("query_hash")]
+        seen = set()
+        repeats = 0
+        repeat_tokens = 0
+        for record in ok:
+            query_hash = record.get("query_hash")
+            if not query_hash:
+                continue
+            if query_hash in seen:
+                repeats += 1
+                repeat_tokens += record.get("tokens", {}).get("total", 0)
+            seen.add(query_hash)
+        cache_hits = sum(record.get("cache_hits", 0) for record in ok)
+        embedded = sum(record.get("embedded", 0) for record in ok)
+
+        # Token spend
+        prompt = sum(record.get("tokens", {}).get("prompt", 0) for record in route_records)
+        completion = sum(record.get("tokens", {}).get("completion", 0) for record in route_records)
+        by_type = {}
+        for query_type, typed in sorted(group_by(route_records, "query_type").items()):
+            typed_total = sum(record.get("tokens", {}).get("total", 0) for record in typed)
+            by_type[query_type] = {"requests": len(typed), "tokens": typed_total,
+                                   "tokens_per_request": typed_total / len(typed)}
+
+        report["routes"][route] = {
+            "requests": len(route_records),
+            "error_rate": errors / len(route_records),
+            "rate_limited_rate": limited / len(route_records),
+            "latency_ms": latency_summary([record["duration_ms"] for record in ok]),
+            "stages_ms": stages,
+            "cache": {
+                "queries": len(hashes),
+                "distinct_queries": len(set(hashes)),
+                "repeat_share": repeats / len(hashes) if hashes else 0.0,
+                "repeat_tokens": repeat_tokens,
+                "embedding_cache_hit_rate": cache_hits / (cache_hits + embedded) if cache_hits + embedded else 0.0,
+                "top_repeated": [
+                    {"query_hash": query_hash, "count": count}
+                    for query_hash, count in Counter(hashes).most_common(top) if count > 1
+                ]
+            },
+            "tokens": {
+                "prompt": prompt,
+                "completion": completion,
+                "total": prompt + completion,
+                "per_request": (prompt + completion) / len(route_records),
+                "cost": (prompt * prompt_price + completion * completion_price) / 1e6,
+                "by_query_type": by_type
+            }
+        }
+
+    # Slowest query shapes across routes, by p95
+    shapes = []
+    for shape, shaped in group_by([record for record in records if is_success(record)], "query_shape").items():
+        if len(shaped) < min_count:
+            continue
+        summary = latency_summary([record["duration_ms"] for record in shaped])
+        stage_totals = Counter()
+        for record in shaped:
+            stage_totals.update(record.get("stages", {}))
+        summary["shape"] = shape
+        summary["dominant_stage"] = max(stage_totals, key=stage_totals.get) if stage_totals else ""
+        shapes.append(summary)
+    report["slowest_shapes"] = sorted(shapes, key=lambda summary: -summary["p95"])[:top]
+
+    return report
+
+def print_report(report: Dict[str, Any], priced: bool):
+    """Print the report as tables."""
+    print(f"Requests: {report['records']:,}")
+
+    print("\n" + "=" * 70)
+    print("LATENCY BY ROUTE (successful requests, ms)")
+    print("=" * 70)
+    print(f"{'Route':<10}{'Reqs':>8}{'Err %':>7}{'429 %':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for route, stats in report["routes"].items():
+        latency = stats["latency_ms"]
+        print(f"{route:<10}{stats['requests']:>8,}{stats['error_rate'] * 100:>7.1f}"
+              f"{stats['rate_limited_rate'] * 100:>7.1f}{latency['p50']:>9.0f}{latency['p95']:>9.0f}"
+              f"{latency['p99']:>9.0f}{latency['max']:>9.0f}")
+
+    print("\n" + "=" * 70)
+    print("STAGES (ms, excluding nested stages; share = mean stage time / mean request time)")
+    print("=" * 70)
+    print(f"{'Route':<10}{'Stage':<18}{'p50':>9}{'p95':>9}{'p99':>9}{'Share':>8}")
+    for route, stats in report["routes"].items():
+        for stage, summary in stats["stages_ms"].items():
+            print(f"{route:<10}{stage:<18}{summary['p50']:>9.1f}{summary['p95']:>9.1f}"
+                  f"{summary['p99']:>9.1f}{summary['share'] * 100:>7.0f}%")
+
+    print("\n" + "=" * 70)
+    print("SLOWEST QUERY SHAPES (route:type:length, by p95 ms)")
+    print("=" * 70)
+    print(f"{'Shape':<34}{'Reqs':>7}{'p50':>9}{'p95':>9}  Dominant stage")
+    for summary in report["slowest_shapes"]:
+        print(f"{summary['shape']:<34}{summary['count']:>7,}{summary['p50']:>9.0f}{summary['p95']:>9.0f}"
+              f"  {summary['dominant_stage']}")
+
+    print("\n" + "=" * 70)
+    print("CACHE OPPORTUNITY")
+    print("=" * 70)
+    for route, stats in report["routes"].items():
+        cache = stats["cache"]
+        print(f"{route}: {cache['repeat_share'] * 100:.1f}% of {cache['queries']:,} queries repeat an earlier one "
+              f"({cache['distinct_queries']:,} distinct); query embedding cache hit rate "
+              f"{cache['embedding_cache_hit_rate'] * 100:.1f}%")
+        if cache["repeat_tokens"]:
+            print(f"   An answer cache would have saved {cache['repeat_tokens']:,} tokens")
+        for entry in cache["top_repeated"][:5]:
+            print(f"   {entry['query_hash']}  x{entry['count']}")
+
+    print("\n" + "=" * 70)
+    print("TOKEN SPEND")
+    print("=" * 70)
+    cost_header = f"{'Cost $':>10}" if priced else ""
+    print(f"{'Route':<10}{'Query type':<18}{'Reqs':>8}{'Tokens':>12}{'Per req':>9}{cost_header}")
+    for route, stats in report["routes"].items():
+        tokens = stats["tokens"]
+        for query_type, typed in tokens["by_query_type"].items():
+            print(f"{route:<10}{query_type:<18}{typed['requests']:>8,}{typed['tokens']:>12,}"
+                  f"{typed['tokens_per_request']:>9.0f}")
+        cost = f"{tokens['cost']:>10.4f}" if priced else ""
+        print(f"{route:<10}{'(all)':<18}{stats['requests']:>8,}{tokens['total']:>12,}{tokens['per_request']:>9.0f}{cost}")
+
+def main():
+    """Main execution function."""
+    arg_parser = argparse.ArgumentParser(description="Analyze the API request log")
+    arg_parser.add_argument("logs", nargs="*", type=Path,
+                            help=f"Request log files (default: {REQUEST_LOG_PATH} and its rotated file)")
+    arg_parser.add_argument("--since", help="Only records at or after this ISO time, e.g. 2026-10-19T08:00")
+    arg_parser.add_argument("--route", help="Only this route, e.g. /chat")
+    arg_parser.add_argument("--top", type=int, default=10, help="Entries in ranked lists (default: 10)")
+    arg_parser.add_argument("--min-count", type=int, default=3,
+                            help="Requests a query shape needs to be ranked (default: 3)")
+    arg_parser.add_argument("--prompt-price", type=float, default=0.0,
+                            help="USD per million prompt tokens, for a cost estimate")
+    arg_parser.add_argument("--completion-price", type=float, default=0.0,
+                            help="USD per million completion tokens, for a cost estimate")
+    arg_parser.add_argument("--json", type=Path, help="Also write the report to this JSON file")
+    args = arg_parser.parse_args()
+
+    paths = args.logs
+    if not paths:
+        rotated = REQUEST_LOG_PATH.with_name(REQUEST_LOG_PATH.name + ".1")
+        paths = [path for path in (rotated, REQUEST_LOG_PATH) if path.exists()]
+    missing = [path for path in paths if not path.exists()]
+    if not paths or missing:
+        print(f"❌ Error: request log not found: {', '.join(str(p) for p in missing) or REQUEST_LOG_PATH}")
+        return 1
+
+    print("=" * 70)
+    print("Request Log Analysis")
+    print("=" * 70)
+    print(f"Logs: {', '.join(str(path) for path in paths)}")
+
+    since = datetime.fromisoformat(args.since) if args.since else None
+    records = load_records(paths, since, args.route)
+    if not records:
+        print("❌ No request records match")
+        return 1
+
+    priced = bool(args.prompt_price or args.completion_price)
+    report = analyze(records, args.top, args.min_count, args.prompt_price, args.completion_price)
+    report["period"] = {"from": records[0]["ts"], "to": records[-1]["ts"]}
+    print(f"Period: {report['period']['from']} to {report['period']['to']}")
+    print_report(report, priced)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n📁 Report saved to: {args.json}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
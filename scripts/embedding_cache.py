@@ -0,0 +1,234 @@
+"""
+Persistent embedding cache for Nigerian Tax Reform Acts pipeline.
+Content-addressed SQLite store so re-indexing only pays for new text.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, Tuple
+
+import numpy as np
+
+EMBEDDINGS_DIR = Path(__file__).parent.parent / "data" / "embeddings"
+CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", str(EMBEDDINGS_DIR / "embedding_cache.sqlite3")))
+
+WHITESPACE = re.compile(r'\s+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    text_hash TEXT NOT NULL,
+    model TEXT NOT NULL,
+    dims INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    PRIMARY KEY (text_hash, model, dims)
+)
+"""
+
+def text_key(text: str) -> str:
+    """
+    Compute the cache key of a text.
+
+    Only Unicode form and whitespace are normalized; case is kept because
+    it changes the embedding (unlike the chunker's dedup hash).
+
+    Args:
+        text: Text to embed
+
+    Returns:
+        SHA-256 hex digest
+    """
+    normalized = WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """SQLite-backed embedding store keyed by (text hash, model, dimensions)."""
+
+    def __init__(self, path: Path = CACHE_PATH):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def get_many(self, keys: Iterable[str], model: str, dims: int) -> Dict[str, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            keys: Text keys from text_key()
+            model: Embedding model
+            dims: Requested dimensions (0 for the model default)
+
+        Returns:
+            Mapping of key to embedding for the keys that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dims = ? AND text_hash IN ({placeholders})",
+                    [model, dims, *batch]
+                ).fetchall()
+                for text_hash, vector in rows:
+                    found[text_hash] = np.frombuffer(vector, dtype=np.float32).copy()
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used_at = ? WHERE text_hash = ? AND model = ? AND dims = ?",
+                    [(now, key, model, dims) for key in found]
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]], model: str, dims: int):
+        """
+        Store embeddings (write-through after an API call).
+
+        Args:
+            items: (key, embedding) pairs
+            model: Embedding model
+            dims: Requested dimensions (0 for the model default)
+        """
+        now = time.time()
+        rows = [
+            (key, model, dims, np.asarray(vector, dtype=np.float32).tobytes(), now, now)
+            for key, vector in items
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(text_hash, model, dims, vector, created_at, last_used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self.writes += len(rows)
+
+    def compact(self, max_age_days: Optional[float] = None, keep_keys: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop stale entries and reclaim disk space.
+
+        An entry is dropped if it was not used within max_age_days, unless its
+        key is in keep_keys.
+
+        Args:
+            max_age_days: Maximum days since last use (None keeps all ages)
+            keep_keys: Keys that are always kept (e.g. the current corpus)
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+
+        with self._lock:
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                keep = set(keep_keys or ())
+                stale = [
+                    row for row in self._conn.execute(
+                        "SELECT text_hash, model, dims FROM embeddings WHERE last_used_at < ?", (cutoff,)
+                    ).fetchall()
+                    if row[0] not in keep
+                ]
+                self._conn.executemany(
+                    "DELETE FROM embeddings WHERE text_hash = ? AND model = ? AND dims = ?", stale
+                )
+                self._conn.commit()
+                removed = len(stale)
+
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        return removed
+
+    def size_report(self) -> Dict[str, Any]:
+        """
+        Report cache size.
+
+        Returns:
+            Dictionary with entry counts per model/dimensions and bytes on disk
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, dims, COUNT(*), SUM(LENGTH(vector)) FROM embeddings GROUP BY model, dims"
+            ).fetchall()
+
+        disk_bytes = sum(
+            path.stat().st_size
+            for path in (self.path, Path(str(self.path) + "-wal"))
+            if path.exists()
+        )
+
+        return {
+            "path": str(self.path),
+            "entries": sum(row[2] for row in rows),
+            "vector_bytes": sum(row[3] or 0 for row in rows),
+            "disk_bytes": disk_bytes,
+            "models": [
+                {"model": model, "dims": dims, "entries": count, "vector_bytes": size or 0}
+                for model, dims, count, size in rows
+            ]
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit statistics for this session.
+
+        Returns:
+            Dictionary with hits, misses, writes and hit rate
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+def format_bytes(size: float) -> str:
+    """Format a byte count for display."""
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}"
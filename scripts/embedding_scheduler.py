@@ -0,0 +1,324 @@
+"""
+Rate-limited concurrent embedding scheduler for Nigerian Tax Reform Acts pipeline.
+Packs texts into token-bounded requests and runs them within RPM/TPM budgets.
+"""
+
+import sys
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Callable, Optional, Sequence
+
+import numpy as np
+from tqdm import tqdm
+
+# Add src directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from token_counter import TokenCounter
+from providers import ProviderError
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+logger = logging.getLogger(__name__)
+
+# OpenAI embeddings endpoint limits
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_INPUT = 8191
+MAX_TOKENS_PER_REQUEST = 300000
+
+# HTTP statuses worth retrying besides 5xx: request timeout and rate limit
+RETRYABLE_STATUS = (408, 429)
+
+class EmbeddingError(RuntimeError):
+    """Raised when a batch fails with a permanent error or still fails after all retries."""
+
+class RateLimiter:
+    """Token-bucket limiter for requests per minute and tokens per minute."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        """
+        Initialize limiter with full buckets.
+
+        Args:
+            requests_per_minute: Request budget
+            tokens_per_minute: Token budget
+        """
+        self.rpm = requests_per_minute
+        self.tpm = tokens_per_minute
+        self.request_allowance = float(requests_per_minute)
+        self.token_allowance = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        """Refill both buckets for the elapsed time."""
+        now = time.monotonic()
+        elapsed = now - self.updated
+        self.updated = now
+        self.request_allowance = min(self.rpm, self.request_allowance + elapsed * self.rpm / 60)
+        self.token_allowance = min(self.tpm, self.token_allowance + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int):
+        """
+        Block until one request of the given size fits the budget.
+
+        Args:
+            tokens: Tokens the request will consume
+        """
+        # A request larger than the whole budget can only wait for a full bucket
+        tokens = min(tokens, self.tpm)
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self.request_allowance >= 1 and self.token_allowance >= tokens:
+                    self.request_allowance -= 1
+                    self.token_allowance -= tokens
+                    return
+
+                wait = max(
+                    (1 - self.request_allowance) * 60 / self.rpm,
+                    (tokens - self.token_allowance) * 60 / self.tpm,
+                    0.01
+                )
+            time.sleep(wait)
+
+def pack_batches(
+    token_counts: Sequence[int],
+    max_tokens: int,
+    max_inputs: int = MAX_INPUTS_PER_REQUEST
+) -> List[List[int]]:
+    """
+    Greedily pack inputs into requests bounded by tokens and input count.
+
+    Args:
+        token_counts: Token count of each input, in order
+        max_tokens: Token limit per request
+        max_inputs: Input limit per request
+
+    Returns:
+        List of batches, each a list of input positions
+    """
+    batches = []
+    batch: List[int] = []
+    batch_tokens = 0
+
+    for position, tokens in enumerate(token_counts):
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_inputs):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(position)
+        batch_tokens += tokens
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Return the server's Retry-After hint from an API error, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def status_code(error: Exception) -> Optional[int]:
+    """Return the HTTP status of an API error, if any."""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed request may succeed if sent again.
+
+    Rate limits, server errors, timeouts and dropped connections are
+    transient. Anything else (bad input, too many tokens, a bad key, a bug)
+    fails the same way on every attempt.
+
+    Args:
+        error: Exception raised by the request
+
+    Returns:
+        True if the request should be retried
+    """
+    # A short response is a server fault; injected local failures stand in for transient ones
+    if isinstance(error, (EmbeddingError, ProviderError, TimeoutError, ConnectionError)):
+        return True
+    # APIConnectionError covers APITimeoutError
+    if openai is not None and isinstance(error, openai.APIConnectionError):
+        return True
+    status = status_code(error)
+    return status is not None and (status in RETRYABLE_STATUS or status >= 500)
+
+class EmbeddingScheduler:
+    """Runs embedding requests concurrently within rate limits, with retries."""
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        counter: TokenCounter,
+        requests_per_minute: int = 3000,
+        tokens_per_minute: int = 1000000,
+        concurrency: int = 4,
+        batch_tokens: int = 32000,
+        max_retries: int = 6,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            embed_batch: Function embedding a list of texts (one API request)
+            counter: Token counter for the embedding model
+            requests_per_minute: Request budget
+            tokens_per_minute: Token budget
+            concurrency: Maximum requests in flight
+            batch_tokens: Token target per request
+            max_retries: Retries of a transient failure per batch before giving up
+            backoff_base: First retry delay in seconds (doubles each attempt)
+            backoff_max: Maximum retry delay in seconds
+        """
+        self.embed_batch = embed_batch
+        self.counter = counter
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.concurrency = max(1, concurrency)
+        self.batch_tokens = min(batch_tokens, MAX_TOKENS_PER_REQUEST, tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._stop = threading.Event()
+
+    def _run_batch(self, texts: List[str], tokens: int) -> List[np.ndarray]:
+        """
+        Embed one batch, retrying transient failures with exponential backoff.
+
+        Args:
+            texts: Texts in the batch
+            tokens: Token count of the batch
+
+        Returns:
+            Embedding vectors in input order
+
+        Raises:
+            EmbeddingError: On a permanent failure, or once retries run out
+        """
+        for attempt in range(self.max_retries + 1):
+            if self._stop.is_set():
+                raise EmbeddingError("cancelled after another batch failed")
+
+            self.limiter.acquire(tokens)
+            try:
+                vectors = self.embed_batch(texts)
+                if len(vectors) != len(texts):
+                    raise EmbeddingError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+                return [np.array(vector) for vector in vectors]
+            except Exception as e:
+                if not is_retryable(e):
+                    raise EmbeddingError(f"batch of {len(texts)} texts failed: {e}") from e
+                if attempt == self.max_retries:
+                    raise EmbeddingError(
+                        f"batch of {len(texts)} texts failed after {attempt + 1} attempts: {e}"
+                    ) from e
+
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+                    delay *= random.uniform(0.5, 1.0)
+                logger.warning("Embedding batch failed (%s), retrying in %.1fs", e, delay)
+                self._stop.wait(delay)
+
+    def embed(
+        self,
+        texts: List[str],
+        on_batch: Optional[Callable[[List[int], List[np.ndarray]], None]] = None,
+        verbose: bool = True,
+        token_counts: Optional[Sequence[int]] = None
+    ) -> List[np.ndarray]:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+            on_batch: Called with (positions, vectors) as each batch completes,
+                e.g. to write through to a cache so finished work survives a failure
+            verbose: Print request plan, progress bar and throughput
+            token_counts: Known token counts of the texts (e.g. recorded by the
+                chunker), so only over-long texts are re-tokenized
+
+        Returns:
+            Embedding vectors in input order
+
+        Raises:
+            EmbeddingError: If any batch fails after all retries
+        """
+        if not texts:
+            return []
+
+        if token_counts is None:
+            texts = [self.counter.truncate(text, MAX_TOKENS_PER_INPUT) for text in texts]
+            token_counts = [self.counter.count(text) for text in texts]
+        else:
+            texts, token_counts = list(texts), list(token_counts)
+            for i, tokens in enumerate(token_counts):
+                if tokens > MAX_TOKENS_PER_INPUT:
+                    texts[i] = self.counter.truncate(texts[i], MAX_TOKENS_PER_INPUT)
+                    token_counts[i] = self.counter.count(texts[i])
+        batches = pack_batches(token_counts, self.batch_tokens)
+
+        self._stop.clear()
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        total_tokens = sum(token_counts)
+        start = time.time()
+
+        if verbose:
+            print(f"   Embedding {len(texts)} texts ({total_tokens:,} tokens"
+                  f"{'' if self.counter.exact else ' est.'}) in {len(batches)} requests, "
+                  f"{self.concurrency} concurrent")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor, \
+                tqdm(total=total_tokens, desc="   Embedding", unit="tok", unit_scale=True,
+                     disable=not verbose) as progress:
+            futures = {
+                executor.submit(
+                    self._run_batch,
+                    [texts[i] for i in batch],
+                    sum(token_counts[i] for i in batch)
+                ): batch
+                for batch in batches
+            }
+
+            try:
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    vectors = future.result()
+                    for position, vector in zip(batch, vectors):
+                        results[position] = vector
+                    if on_batch:
+                        on_batch(batch, vectors)
+                    progress.update(sum(token_counts[i] for i in batch))
+            except EmbeddingError:
+                self._stop.set()
+                for future in futures:
+                    future.cancel()
+                raise
+
+        elapsed = time.time() - start
+        if verbose:
+            print(f"   Throughput: {total_tokens / elapsed if elapsed else 0:,.0f} tokens/sec "
+                  f"({len(texts) / elapsed if elapsed else 0:.1f} texts/sec)")
+
+        return results
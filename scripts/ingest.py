@@ -0,0 +1,655 @@
+#!/usr/bin/env python3
+"""
+Streaming ingest pipeline for Nigerian Tax Reform Acts.
+Runs fetch -> parse -> chunk -> embed -> index as connected stages with
+bounded queues, so documents flow through while later ones are still parsing.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import importlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor, Future, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, Callable
+
+# Add scripts directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+fetch_sources = importlib.import_module("01_fetch_sources")
+parse_pdf = importlib.import_module("02_parse_pdf")
+make_chunks = importlib.import_module("03_make_chunks")
+embed_and_index = importlib.import_module("04_embed_and_index")
+
+from ingest_manifest import IngestManifest
+from embedding_cache import EmbeddingCache
+from near_duplicates import NEAR_DUP_THRESHOLD, MinHashLSH, is_representative, mark_near_duplicates
+
+# End-of-stream marker passed down each queue
+DONE = object()
+
+# Seconds between queue-depth samples
+SAMPLE_INTERVAL = 0.1
+
+def timed_call(func: Callable, *args) -> tuple:
+    """
+    Run a stage function and measure it (executes inside the worker).
+
+    Args:
+        func: Stage function
+        *args: Arguments for func
+
+    Returns:
+        Tuple of (result, seconds spent)
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+class Work:
+    """A unit of stage work to run in the stage's executor."""
+
+    def __init__(self, func: Callable, *args):
+        self.func = func
+        self.args = args
+
+class StageStats:
+    """Throughput and queue-depth counters for one pipeline stage."""
+
+    def __init__(self, name: str, kind: str, workers: int):
+        """
+        Initialize counters.
+
+        Args:
+            name: Stage name
+            kind: "io" or "cpu"
+            workers: Executor size
+        """
+        self.name = name
+        self.kind = kind
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.skipped = 0
+        self.busy = 0.0
+        self.blocked = 0.0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.depth_samples: List[int] = []
+        self.errors: List[str] = []
+
+    @property
+    def wall(self) -> float:
+        """Seconds from stage start to finish (or now)."""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of worker time spent working."""
+        return self.busy / (self.wall * self.workers) if self.wall else 0.0
+
+    @property
+    def capacity(self) -> float:
+        """Items/sec the stage could sustain if never starved."""
+        return self.items_in * self.workers / self.busy if self.busy else float("inf")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return counters as a JSON-serializable dictionary."""
+        samples = self.depth_samples or [0]
+        return {
+            "stage": self.name,
+            "kind": self.kind,
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "wall_seconds": round(self.wall, 3),
+            "busy_seconds": round(self.busy, 3),
+            "blocked_seconds": round(self.blocked, 3),
+            "items_per_sec": round(self.items_in / self.wall, 3) if self.wall else 0.0,
+            "utilization": round(self.utilization, 3),
+            "avg_queue_depth": round(sum(samples) / len(samples), 2),
+            "max_queue_depth": max(samples)
+        }
+
+class Stage(threading.Thread):
+    """
+    One pipeline stage: reads its inbox, runs work in an executor, writes its outbox.
+
+    Subclasses implement plan() and complete(). plan() either handles an item
+    inline (returning its outputs) or returns a Work to run in the executor;
+    complete() turns the executor result into outputs. At most `workers` items
+    are in flight, and puts to a full outbox block, so a slow stage pushes
+    back on everything upstream of it.
+    """
+
+    kind = "io"
+
+    def __init__(
+        self,
+        name: str,
+        workers: int,
+        inbox: queue.Queue,
+        outbox: Optional[queue.Queue],
+        abort: Optional[threading.Event] = None
+    ):
+        """
+        Initialize stage.
+
+        Args:
+            name: Stage name
+            workers: Executor size (maximum items in flight)
+            inbox: Input queue
+            outbox: Output queue (None for the final stage)
+            abort: Shared event set when any stage fails; later items are drained unprocessed
+        """
+        super().__init__(name=f"ingest-{name}", daemon=True)
+        self.workers = max(1, workers)
+        self.inbox = inbox
+        self.outbox = outbox
+        self.abort = abort or threading.Event()
+        self.stats = StageStats(name, self.kind, self.workers)
+        self.executor: Optional[Executor] = None
+
+    def make_executor(self) -> Executor:
+        """Create the stage's executor."""
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+
+    def plan(self, item: Any):
+        """Handle an item inline (return a list of outputs) or return a Work."""
+        raise NotImplementedError
+
+    def complete(self, item: Any, result: Any) -> List[Any]:
+        """Turn an executor result into outputs."""
+        return [result]
+
+    def finish(self):
+        """Called once after the last item has been processed."""
+
+    def label(self, item: Any) -> str:
+        """Short description of an item for error messages."""
+        return str(item)[:80]
+
+    def fail(self, item: Any, error: Exception):
+        """Record a failed item and stop the pipeline from starting new work."""
+        self.stats.errors.append(f"{self.label(item)}: {error}")
+        self.abort.set()
+
+    def emit(self, outputs: List[Any]):
+        """Send outputs downstream, blocking while the outbox is full."""
+        for output in outputs:
+            if self.outbox is not None:
+                start = time.perf_counter()
+                self.outbox.put(output)
+                self.stats.blocked += time.perf_counter() - start
+            self.stats.items_out += 1
+
+    def accept(self, item: Any, pending: Dict[Future, Any]):
+        """Plan an item and either emit it or submit its work."""
+        if self.abort.is_set():
+            return
+
+        self.stats.items_in += 1
+        start = time.perf_counter()
+        try:
+            planned = self.plan(item)
+        except Exception as e:
+            self.stats.busy += time.perf_counter() - start
+            self.fail(item, e)
+            return
+        self.stats.busy += time.perf_counter() - start
+
+        if isinstance(planned, Work):
+            pending[self.executor.submit(timed_call, planned.func, *planned.args)] = item
+        else:
+            self.stats.skipped += 1
+            self.emit(planned)
+
+    def collect(self, future: Future, item: Any):
+        """Emit the outputs of a finished future."""
+        try:
+            result, elapsed = future.result()
+            self.stats.busy += elapsed
+            outputs = self.complete(item, result)
+        except Exception as e:
+            self.fail(item, e)
+            return
+        self.emit(outputs)
+
+    def run(self):
+        """Stage loop."""
+        self.stats.started = time.perf_counter()
+        pending: Dict[Future, Any] = {}
+        upstream_done = False
+
+        try:
+            while not upstream_done or pending:
+                has_capacity = len(pending) < self.workers
+
+                # Take new work while the executor has room
+                if not upstream_done and has_capacity:
+                    try:
+                        item = self.inbox.get(timeout=SAMPLE_INTERVAL if pending else None)
+                    except queue.Empty:
+                        item = None
+                    if item is DONE:
+                        upstream_done = True
+                    elif item is not None:
+                        self.accept(item, pending)
+
+                if pending:
+                    block = upstream_done or len(pending) >= self.workers
+                    finished, _ = wait(list(pending), timeout=None if block else 0, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self.collect(future, pending.pop(future))
+
+            start = time.perf_counter()
+            try:
+                self.finish()
+            except Exception as e:
+                self.stats.errors.append(f"finish: {e}")
+            self.stats.busy += time.perf_counter() - start
+        finally:
+            self.stats.finished = time.perf_counter()
+            if self.outbox is not None:
+                self.outbox.put(DONE)
+
+class FetchStage(Stage):
+    """Downloads new or changed source PDFs (I/O, threads)."""
+
+    kind = "io"
+
+    def __init__(self, *args, per_host: int, force: bool, refresh: bool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = fetch_sources.HostLimiter(per_host)
+        self.force = force
+        self.refresh = refresh
+        # Fetched metadata by filename, saved back with the new validators
+        self.fetched: Dict[str, Dict[str, Any]] = {}
+
+    def plan(self, source: Dict[str, Any]):
+        return Work(fetch_sources.fetch_source, source, fetch_sources.DATA_DIR, None,
+                    self.limiter, self.force, self.refresh)
+
+    def complete(self, source: Dict[str, Any], metadata: Dict[str, Any]) -> List[Any]:
+        self.fetched[source["filename"]] = metadata
+        if not metadata["downloaded"]:
+            raise RuntimeError(metadata.get("fetch_error") or "source PDF is not available")
+        return [metadata]
+
+    def label(self, source: Dict[str, Any]) -> str:
+        return source["name"]
+
+class ParseStage(Stage):
+    """Parses PDFs into sections and pages (CPU, processes)."""
+
+    kind = "cpu"
+
+    def __init__(self, *args, manifest: IngestManifest, force: bool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest = manifest
+        self.force = force
+        self.input_hashes: Dict[str, str] = {}
+
+    def make_executor(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def plan(self, source: Dict[str, Any]):
+        input_hash = parse_pdf.parse_input_hash(Path(source["local_path"]))
+        skipped = None if self.force else parse_pdf.unchanged_outcome(source, self.manifest, input_hash)
+        if skipped:
+            return [skipped]
+
+        self.input_hashes[source["name"]] = input_hash
+        return Work(parse_pdf.parse_source, source, False)
+
+    def complete(self, source: Dict[str, Any], outcome: Dict[str, Any]) -> List[Any]:
+        if outcome["error"]:
+            raise RuntimeError(outcome["error"])
+        parse_pdf.record_parse(self.manifest, source, self.input_hashes[source["name"]], outcome)
+        parse_pdf.report_outcome(outcome)
+        return [outcome]
+
+    def label(self, source: Dict[str, Any]) -> str:
+        return source["name"]
+
+class ChunkStage(Stage):
+    """Chunks parsed documents (CPU, processes)."""
+
+    kind = "cpu"
+
+    def __init__(self, *args, manifest: IngestManifest, force: bool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest = manifest
+        self.force = force
+        self.input_hashes: Dict[Path, str] = {}
+
+    def make_executor(self) -> Executor:
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def plan(self, outcome: Dict[str, Any]):
+        parsed_file = Path(outcome["output_path"])
+        if self.force:
+            input_hash, reused = make_chunks.chunk_input_hash(parsed_file), None
+        else:
+            input_hash, reused = make_chunks.reusable_chunks(parsed_file, self.manifest)
+        if reused is not None:
+            return [{"parsed_file": parsed_file, "input_hash": input_hash, "chunks": reused, "reused": True}]
+
+        self.input_hashes[parsed_file] = input_hash
+        return Work(make_chunks.chunk_document, parsed_file)
+
+    def complete(self, outcome: Dict[str, Any], chunks: List[Dict[str, Any]]) -> List[Any]:
+        parsed_file = Path(outcome["output_path"])
+        print(f"   ✂️  {parsed_file.name}: {len(chunks)} chunks")
+        return [{
+            "parsed_file": parsed_file,
+            "input_hash": self.input_hashes[parsed_file],
+            "chunks": chunks,
+            "reused": False
+        }]
+
+    def label(self, outcome: Dict[str, Any]) -> str:
+        return outcome["name"]
+
+class EmbedStage(Stage):
+    """Embeds document chunks (I/O, threads sharing one rate limiter)."""
+
+    kind = "io"
+
+    def __init__(self, *args, indexer, previous_embeddings: Dict[str, Any], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.indexer = indexer
+        self.previous_embeddings = previous_embeddings
+        # Chunks seen so far; later near-duplicates are not embedded
+        self.lsh = MinHashLSH(NEAR_DUP_THRESHOLD) if NEAR_DUP_THRESHOLD > 0 else None
+        self.to_embed: Dict[Path, List[Dict[str, Any]]] = {}
+
+    def plan(self, doc: Dict[str, Any]):
+        chunks = doc["chunks"]
+        if self.lsh is not None:
+            chunks = [chunk for chunk in chunks if self.lsh.add(chunk["text"])[1] is None]
+        self.to_embed[doc["parsed_file"]] = chunks
+
+        if all(chunk.get("hash") in self.previous_embeddings for chunk in chunks):
+            return self.complete(doc, embed_and_index.embed_chunks(
+                self.indexer, chunks, self.previous_embeddings, False
+            ))
+        return Work(embed_and_index.embed_chunks, self.indexer, chunks, self.previous_embeddings, False)
+
+    def complete(self, doc: Dict[str, Any], result: tuple) -> List[Any]:
+        embeddings, embedded_count = result
+        if embedded_count:
+            print(f"   🔮 {doc['parsed_file'].name}: embedded {embedded_count} chunks")
+        chunks = self.to_embed.pop(doc["parsed_file"])
+        embedded_hashes = {
+            chunk["hash"] for chunk in chunks if chunk.get("hash") not in self.previous_embeddings
+        }
+        vectors = {chunk["hash"]: vector for chunk, vector in zip(chunks, embeddings)}
+        return [{**doc, "vectors": vectors, "embedded_hashes": embedded_hashes}]
+
+    def label(self, doc: Dict[str, Any]) -> str:
+        return doc["parsed_file"].name
+
+class IndexStage(Stage):
+    """Collects embedded documents, then writes chunks and indices in document order."""
+
+    kind = "io"
+
+    def __init__(self, *args, manifest: IngestManifest, indexer, previous_embeddings: Dict[str, Any],
+                 force: bool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest = manifest
+        self.indexer = indexer
+        self.previous_embeddings = previous_embeddings
+        self.force = force
+        self.docs: List[Dict[str, Any]] = []
+        self.summary: Dict[str, Any] = {}
+
+    def plan(self, doc: Dict[str, Any]):
+        self.docs.append(doc)
+        return []
+
+    def finish(self):
+        if self.abort.is_set():
+            print("\n❌ Upstream stages failed, chunks and indices were not updated")
+            return
+
+        # Sort like 03_make_chunks.py so dedup and chunk order match the scripts
+        self.docs.sort(key=lambda doc: doc["parsed_file"].name)
+        previous_docs = set(self.manifest.data["chunk"])
+
+        # Dedup is redone over every document, reused or not, exactly as in 03_make_chunks.py
+        vectors = {}
+        for doc in self.docs:
+            vectors.update(doc["vectors"])
+        all_chunks, _ = make_chunks.combine_documents(
+            self.manifest, [(doc["parsed_file"], doc["input_hash"], doc["chunks"]) for doc in self.docs]
+        )
+
+        doc_names = [doc["parsed_file"].name for doc in self.docs]
+        self.manifest.forget("chunk", doc_names)
+        changed = any(not doc["reused"] for doc in self.docs) or previous_docs != set(doc_names)
+
+        if changed or not make_chunks.OUTPUT_FILE.exists():
+            make_chunks.save_chunks(all_chunks)
+        else:
+            print("\n✅ No documents changed, chunks are up to date.")
+            # Reused chunks come without duplicate marks; the saved ones have them
+            mark_near_duplicates(all_chunks, NEAR_DUP_THRESHOLD)
+
+        index_hash = embed_and_index.index_input_hash()
+        artifacts = embed_and_index.index_artifacts()
+        embedded_hashes = set().union(*(doc["embedded_hashes"] for doc in self.docs))
+        representatives = [chunk for chunk in all_chunks if is_representative(chunk)]
+        embedded_count = sum(1 for chunk in representatives if chunk["hash"] in embedded_hashes)
+
+        if not self.force and self.manifest.is_fresh("index", "chunks.jsonl", index_hash, artifacts):
+            print("✅ Chunks unchanged since the last build, index is up to date.")
+        else:
+            # Documents arrive out of order, so a representative may have been skipped as a near-duplicate
+            missing = [chunk for chunk in representatives if chunk["hash"] not in vectors]
+            if missing:
+                late_embeddings, _ = embed_and_index.embed_chunks(
+                    self.indexer, missing, self.previous_embeddings, False
+                )
+                vectors.update((chunk["hash"], vector) for chunk, vector in zip(missing, late_embeddings))
+                embedded_hashes.update(
+                    chunk["hash"] for chunk in missing if chunk["hash"] not in self.previous_embeddings
+                )
+
+            embeddings = [vectors[chunk["hash"]] for chunk in representatives]
+            embedded_count = sum(1 for chunk in representatives if chunk["hash"] in embedded_hashes)
+            kb_documents, kb_embeddings = embed_and_index.embed_kb(self.indexer, verbose=False)
+            embed_and_index.write_indices(
+                self.indexer, representatives, embeddings, kb_documents, kb_embeddings, rebuild=self.force
+            )
+            embed_and_index.record_index(self.manifest, index_hash, len(representatives), embedded_count)
+
+        self.summary = {
+            "documents": len(self.docs),
+            "chunks": len(all_chunks),
+            "embedded": embedded_count
+        }
+
+    def label(self, doc: Dict[str, Any]) -> str:
+        return doc["parsed_file"].name
+
+def monitor(stages: List[Stage], stop: threading.Event, report_interval: float):
+    """
+    Sample queue depths and print a status line periodically.
+
+    Args:
+        stages: Pipeline stages
+        stop: Set when the pipeline has finished
+        report_interval: Seconds between status lines (0 disables them)
+    """
+    start = time.perf_counter()
+    last_report = start
+
+    while not stop.wait(SAMPLE_INTERVAL):
+        for stage in stages:
+            if stage.stats.finished is None:
+                stage.stats.depth_samples.append(stage.inbox.qsize())
+
+        now = time.perf_counter()
+        if report_interval and now - last_report >= report_interval:
+            last_report = now
+            status = " | ".join(
+                f"{stage.stats.name} q={stage.inbox.qsize()} {stage.stats.items_out}/{stage.stats.items_in}"
+                for stage in stages
+            )
+            print(f"   ⏱  {now - start:6.1f}s | {status}", flush=True)
+
+def print_report(stages: List[Stage], elapsed: float):
+    """Print per-stage throughput and queue depth, and name the bottleneck."""
+    print("\n" + "=" * 70)
+    print(f"Pipeline finished in {elapsed:.2f}s")
+    print("=" * 70)
+    print(f"{'Stage':<8}{'Kind':<5}{'Wkrs':>5}{'Items':>7}{'Skip':>6}{'Busy s':>9}"
+          f"{'Items/s':>9}{'Util':>7}{'AvgQ':>6}{'MaxQ':>6}{'Blocked s':>11}")
+
+    for stage in stages:
+        stats = stage.stats.as_dict()
+        print(f"{stats['stage']:<8}{stats['kind']:<5}{stats['workers']:>5}{stats['items_in']:>7}"
+              f"{stats['skipped']:>6}{stats['busy_seconds']:>9.2f}{stats['items_per_sec']:>9.2f}"
+              f"{stats['utilization']:>6.0%}{stats['avg_queue_depth']:>6.1f}{stats['max_queue_depth']:>6}"
+              f"{stats['blocked_seconds']:>11.2f}")
+
+    working = [stage for stage in stages if stage.stats.items_in and stage.stats.busy > 0]
+    if working:
+        bottleneck = min(working, key=lambda stage: stage.stats.capacity)
+        stats = bottleneck.stats.as_dict()
+        print(f"\n🔎 Bottleneck: {bottleneck.stats.name} "
+              f"({bottleneck.stats.capacity:.2f} items/sec capacity, {stats['utilization']:.0%} busy, "
+              f"avg input queue {stats['avg_queue_depth']:.1f})")
+
+def main():
+    """Main execution function."""
+    cpu_count = os.cpu_count() or 1
+
+    arg_parser = argparse.ArgumentParser(description="Run the full ingest pipeline as streaming stages")
+    arg_parser.add_argument("--fetch-workers", type=int, default=fetch_sources.FETCH_WORKERS,
+                            help=f"Concurrent downloads (default: {fetch_sources.FETCH_WORKERS})")
+    arg_parser.add_argument("--per-host", type=int, default=fetch_sources.FETCH_PER_HOST,
+                            help=f"Concurrent downloads per host (default: {fetch_sources.FETCH_PER_HOST})")
+    arg_parser.add_argument("--no-refresh", action="store_true",
+                            help="Skip sources that already exist instead of checking upstream")
+    arg_parser.add_argument("--parse-workers", type=int, default=cpu_count,
+                            help=f"Parser processes (default: {cpu_count})")
+    arg_parser.add_argument("--chunk-workers", type=int, default=cpu_count,
+                            help=f"Chunker processes (default: {cpu_count})")
+    arg_parser.add_argument("--embed-workers", type=int, default=2,
+                            help="Documents embedded concurrently, sharing the RPM/TPM budget (default: 2)")
+    arg_parser.add_argument("--queue-size", type=int, default=4,
+                            help="Capacity of each inter-stage queue (default: 4)")
+    arg_parser.add_argument("--force", action="store_true",
+                            help="Re-download, re-parse and re-chunk everything and rebuild the indices")
+    arg_parser.add_argument("--no-cache", action="store_true",
+                            help="Do not read or write the persistent embedding cache")
+    arg_parser.add_argument("--report-interval", type=float, default=5.0,
+                            help="Seconds between status lines, 0 to disable (default: 5)")
+    arg_parser.add_argument("--stats-file", type=str, help="Write per-stage statistics to this JSON file")
+    args = arg_parser.parse_args()
+
+    print("=" * 70)
+    print("Nigerian Tax Reform Acts - Streaming Ingest")
+    print("=" * 70)
+    print(f"Workers: fetch {args.fetch_workers}, parse {args.parse_workers}, "
+          f"chunk {args.chunk_workers}, embed {args.embed_workers}; queue size {args.queue_size}")
+
+    manifest = IngestManifest()
+    sources = fetch_sources.load_sources(fetch_sources.DATA_DIR)
+    previous_embeddings = {} if args.force else embed_and_index.load_previous_embeddings(
+        embed_and_index.EMBEDDING_MODEL, embed_and_index.EMBEDDING_DIMENSIONS
+    )
+
+    cache = None if args.no_cache else EmbeddingCache()
+    indexer = embed_and_index.EmbeddingIndexer(model=embed_and_index.EMBEDDING_MODEL, cache=cache)
+
+    queues = [queue.Queue(maxsize=max(1, args.queue_size)) for _ in range(5)]
+    abort = threading.Event()
+    stages: List[Stage] = [
+        FetchStage("fetch", args.fetch_workers, queues[0], queues[1], abort, per_host=args.per_host,
+                   force=args.force, refresh=not args.no_refresh),
+        ParseStage("parse", args.parse_workers, queues[1], queues[2], abort, manifest=manifest, force=args.force),
+        ChunkStage("chunk", args.chunk_workers, queues[2], queues[3], abort, manifest=manifest,
+                   force=args.force),
+        EmbedStage("embed", args.embed_workers, queues[3], queues[4], abort, indexer=indexer,
+                   previous_embeddings=previous_embeddings),
+        IndexStage("index", 1, queues[4], None, abort, manifest=manifest, indexer=indexer,
+                   previous_embeddings=previous_embeddings, force=args.force),
+    ]
+
+    # Start executors (and fork worker processes) before any stage thread runs
+    for stage in stages:
+        stage.executor = stage.make_executor()
+        if isinstance(stage.executor, ProcessPoolExecutor):
+            stage.executor.submit(int).result()
+
+    start = time.perf_counter()
+    stop = threading.Event()
+    monitor_thread = threading.Thread(target=monitor, args=(stages, stop, args.report_interval), daemon=True)
+    monitor_thread.start()
+
+    for stage in stages:
+        stage.start()
+
+    # Feed the first stage (blocks while the fetch queue is full)
+    for source in sources:
+        queues[0].put(source)
+    queues[0].put(DONE)
+
+    for stage in stages:
+        stage.join()
+    stop.set()
+    monitor_thread.join()
+
+    for stage in stages:
+        stage.executor.shutdown()
+
+    elapsed = time.perf_counter() - start
+    fetched = stages[0].fetched
+    fetch_sources.save_metadata(
+        [fetched.get(source["filename"], source) for source in sources], fetch_sources.DATA_DIR
+    )
+    manifest.save()
+
+    print_report(stages, elapsed)
+
+    errors = [(stage.stats.name, error) for stage in stages for error in stage.stats.errors]
+    for name, error in errors:
+        print(f"   ❌ {name}: {error}")
+
+    index_stage = stages[-1]
+    if index_stage.summary:
+        print(f"\nDocuments: {index_stage.summary['documents']}  "
+              f"Chunks: {index_stage.summary['chunks']}  "
+              f"Newly embedded: {index_stage.summary['embedded']}")
+    if cache:
+        embed_and_index.print_cache_summary(cache)
+        cache.close()
+
+    if args.stats_file:
+        with open(args.stats_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "elapsed_seconds": round(elapsed, 3),
+                "stages": [stage.stats.as_dict() for stage in stages]
+            }, f, indent=2)
+        print(f"📋 Stage statistics saved to: {args.stats_file}")
+
+    if errors:
+        return 1
+
+    print("\n✅ Ingest completed successfully!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
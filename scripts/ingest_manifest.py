@@ -0,0 +1,118 @@
+"""
+Ingest manifest for Nigerian Tax Reform Acts pipeline.
+Records content hashes of each stage's inputs and outputs so reruns only redo changed work.
+"""
+
+import os
+import sys
+import json
+import hashlib
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from index_versions import file_sha256
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+MANIFEST_PATH = DATA_DIR / "ingest_manifest.json"
+MANIFEST_VERSION = 1
+
+# Pipeline stages tracked in the manifest
+STAGES = ("parse", "chunk", "index")
+
+def combine_hashes(parts: Iterable[str]) -> str:
+    """
+    Combine several hashes or config strings into one digest.
+
+    Args:
+        parts: Hex digests or configuration values
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class IngestManifest:
+    """Content-hash manifest shared by the parse, chunk and index scripts."""
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        """
+        Load the manifest (or start an empty one).
+
+        Args:
+            path: Manifest JSON path
+        """
+        self.path = path
+        self.data: Dict[str, Any] = {"version": MANIFEST_VERSION}
+
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                if loaded.get("version") == MANIFEST_VERSION:
+                    self.data = loaded
+            except (OSError, ValueError):
+                # A corrupt manifest only costs a full rebuild
+                pass
+
+        for stage in STAGES:
+            self.data.setdefault(stage, {})
+
+    def get(self, stage: str, key: str) -> Optional[Dict[str, Any]]:
+        """Return the recorded entry for a stage key, if any."""
+        return self.data[stage].get(key)
+
+    def is_fresh(self, stage: str, key: str, input_hash: str, outputs: Iterable[Path] = ()) -> bool:
+        """
+        Check whether a stage's recorded work is still valid.
+
+        Args:
+            stage: Stage name
+            key: Item key (e.g. PDF filename)
+            input_hash: Hash of the current inputs
+            outputs: Output files that must still exist
+
+        Returns:
+            True if the inputs are unchanged and all outputs exist
+        """
+        entry = self.get(stage, key)
+        return bool(entry) and entry.get("input_sha256") == input_hash and all(
+            Path(output).exists() for output in outputs
+        )
+
+    def record(self, stage: str, key: str, input_hash: str, **details):
+        """
+        Record completed work for a stage key.
+
+        Args:
+            stage: Stage name
+            key: Item key
+            input_hash: Hash of the inputs that were processed
+            **details: Extra fields (output hashes, counts, ...)
+        """
+        self.data[stage][key] = {
+            "input_sha256": input_hash,
+            "updated": datetime.now().isoformat(),
+            **details
+        }
+
+    def forget(self, stage: str, keep: Iterable[str]):
+        """Drop entries for keys that no longer exist."""
+        keep = set(keep)
+        for key in list(self.data[stage]):
+            if key not in keep:
+                del self.data[stage][key]
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,281 @@
+"""
+Near-duplicate chunk detection for Nigerian Tax Reform Acts pipeline.
+Clusters chunks whose word shingles overlap beyond a Jaccard threshold using
+MinHash signatures and locality-sensitive hashing.
+"""
+
+import os
+import re
+import json
+import zlib
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+PROCESSED_DIR = Path(__file__).parent.parent / "data" / "processed"
+CLUSTERS_PATH = PROCESSED_DIR / "duplicate_clusters.json"
+
+# Estimated Jaccard similarity at which chunks count as duplicates (0 disables)
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.85"))
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+
+# Largest prime below 2**31, so (a * x + b) stays within uint64 for 32-bit x
+MERSENNE_PRIME = (1 << 31) - 1
+MAX_HASH = MERSENNE_PRIME - 1
+
+WORD = re.compile(r'\w+')
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """
+    Hash the word n-grams of a text.
+
+    Args:
+        text: Chunk text
+        size: Words per shingle
+
+    Returns:
+        Unique 32-bit shingle hashes (stable across processes)
+    """
+    words = WORD.findall(text.lower())
+    if len(words) <= size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return np.unique(np.fromiter(
+        (zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64, count=len(grams)
+    ))
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """
+    Choose bands and rows per band for a similarity threshold.
+
+    Picks the split whose S-curve midpoint (1/b)^(1/r) is closest to the
+    threshold without exceeding it, so candidates err towards recall and are
+    then verified against the signatures.
+
+    Args:
+        threshold: Jaccard threshold
+        num_perm: Signature length
+
+    Returns:
+        Tuple of (bands, rows)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+class MinHashLSH:
+    """MinHash signatures with a banded LSH index for near-duplicate search."""
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, num_perm: int = NUM_PERM, seed: int = 1):
+        """
+        Initialize hash permutations and empty buckets.
+
+        Args:
+            threshold: Jaccard threshold for duplicates
+            num_perm: Signature length
+            seed: Seed for the permutations (fixed so signatures are reproducible)
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+        self.buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+        self.signatures: List[np.ndarray] = []
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Array of num_perm minimum hashes
+        """
+        hashed = shingles(text)
+        permuted = (np.outer(hashed, self.a) + self.b) % MERSENNE_PRIME
+        return permuted.min(axis=0) if len(hashed) else np.full(self.num_perm, MAX_HASH, dtype=np.uint64)
+
+    def similarity(self, first: int, second: int) -> float:
+        """Estimate the Jaccard similarity of two indexed items."""
+        return float(np.mean(self.signatures[first] == self.signatures[second]))
+
+    def add(self, text: str) -> Tuple[int, Optional[int], float]:
+        """
+        Index a text and find an earlier near-duplicate.
+
+        Each item is checked against the members of the buckets it falls in,
+        stopping at the first one above the threshold, so the cost stays
+        close to linear in the number of items.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Tuple of (item id, id of the first earlier match or None, estimated similarity)
+        """
+        item = len(self.signatures)
+        signature = self.signature(text)
+        self.signatures.append(signature)
+
+        match, match_similarity = None, 0.0
+        checked = set()
+
+        for band, buckets in enumerate(self.buckets):
+            key = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            bucket = buckets[key]
+
+            if match is None:
+                for other in bucket:
+                    if other in checked:
+                        continue
+                    checked.add(other)
+                    similarity = self.similarity(item, other)
+                    if similarity >= self.threshold:
+                        match, match_similarity = other, similarity
+                        break
+
+            bucket.append(item)
+
+        return item, match, match_similarity
+
+def source_reference(chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Describe where a chunk comes from.
+
+    Args:
+        chunk: Chunk dictionary
+
+    Returns:
+        Dictionary with document, section, pages and chunk hash
+    """
+    return {
+        "document_name": chunk.get("document_name", ""),
+        "section_number": chunk.get("section_number", ""),
+        "section_title": chunk.get("section_title", ""),
+        "page_start": chunk.get("page_start", 0),
+        "page_end": chunk.get("page_end", 0),
+        "hash": chunk.get("hash", "")
+    }
+
+def mark_near_duplicates(
+    chunks: List[Dict[str, Any]],
+    threshold: float = NEAR_DUP_THRESHOLD
+) -> List[Dict[str, Any]]:
+    """
+    Cluster near-duplicate chunks and annotate them in place.
+
+    The first chunk of each cluster (in corpus order) is its representative
+    and gets "alternate_sources" listing the other members. Every other
+    member gets "duplicate_of" with the representative's hash and is left out
+    of embedding and indexing. Annotations from a previous run are replaced.
+
+    Args:
+        chunks: Final chunks of every document, in order
+        threshold: Jaccard threshold (0 disables detection)
+
+    Returns:
+        List of cluster dictionaries (representative, members, similarity)
+    """
+    for chunk in chunks:
+        chunk.pop("duplicate_of", None)
+        chunk.pop("alternate_sources", None)
+
+    if threshold <= 0 or len(chunks) < 2:
+        return []
+
+    lsh = MinHashLSH(threshold)
+    representative_of: List[int] = []
+    members = defaultdict(list)
+
+    for position, chunk in enumerate(chunks):
+        _, match, similarity = lsh.add(chunk.get("text", ""))
+        if match is None:
+            representative_of.append(position)
+        else:
+            # Attach to the match's cluster rather than chaining clusters
+            representative = representative_of[match]
+            representative_of.append(representative)
+            members[representative].append((position, similarity))
+
+    clusters = []
+    for representative, duplicates in members.items():
+        representative_chunk = chunks[representative]
+        representative_chunk["alternate_sources"] = [
+            {**source_reference(chunks[position]), "similarity": round(similarity, 3)}
+            for position, similarity in duplicates
+        ]
+        for position, similarity in duplicates:
+            chunks[position]["duplicate_of"] = representative_chunk["hash"]
+
+        clusters.append({
+            "representative": source_reference(representative_chunk),
+            "duplicates": representative_chunk["alternate_sources"]
+        })
+
+    return clusters
+
+def save_clusters(clusters: List[Dict[str, Any]], chunk_count: int, threshold: float = NEAR_DUP_THRESHOLD):
+    """
+    Write duplicate_clusters.json.
+
+    Args:
+        clusters: Result of mark_near_duplicates
+        chunk_count: Total chunks that were compared
+        threshold: Jaccard threshold that was used
+    """
+    bands, rows = lsh_params(threshold) if threshold > 0 else (0, 0)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "timezone": "Africa/Lagos",
+        "threshold": threshold,
+        "num_perm": NUM_PERM,
+        "bands": bands,
+        "rows": rows,
+        "shingle_size": SHINGLE_SIZE,
+        "chunk_count": chunk_count,
+        "cluster_count": len(clusters),
+        "duplicate_count": sum(len(cluster["duplicates"]) for cluster in clusters),
+        "clusters": clusters
+    }
+
+    with open(CLUSTERS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+def is_representative(chunk: Dict[str, Any]) -> bool:
+    """Whether a chunk should be embedded and indexed."""
+    return not chunk.get("duplicate_of")
+
+def format_alternate_sources(chunk: Dict[str, Any]) -> str:
+    """
+    Summarize a chunk's alternate sources in one line (for flat metadata stores).
+
+    Args:
+        chunk: Chunk dictionary
+
+    Returns:
+        e.g. "Nigeria Tax Bill 2024 s.12 p.4; ..." (empty if there are none)
+    """
+    parts = []
+    for source in chunk.get("alternate_sources", []):
+        part = source["document_name"]
+        if source.get("section_number"):
+            part += f" s.{source['section_number']}"
+        if source.get("page_start"):
+            part += f" p.{source['page_start']}"
+        parts.append(part)
+    return "; ".join(parts)
@@ -0,0 +1,335 @@
+"""
+Columnar chunk storage for Nigerian Tax Reform Acts RAG system.
+Holds chunk texts in one buffer and metadata in typed columns, with
+lightweight per-result views instead of a dictionary per chunk.
+"""
+
+import sys
+import json
+import logging
+from collections.abc import Mapping
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELD = "text"
+
+# Few distinct values shared by many chunks: stored as codes into a table of interned strings
+CATEGORICAL_FIELDS = (
+    "document_name",
+    "document_type",
+    "section_type",
+    "section_number",
+    "section_title",
+    "section_id",
+    "tokenizer"
+)
+
+INT_FIELDS = (
+    "page_start",
+    "page_end",
+    "char_count",
+    "word_count",
+    "token_count",
+    "section_start",
+    "section_end"
+)
+
+BOOL_FIELDS = (
+    "contains_definition",
+    "contains_rate",
+    "contains_date",
+    "contains_amount"
+)
+
+# One value per chunk: stored in a fixed-width bytes array
+FIXED_FIELDS = ("hash",)
+
+# Lists repeated across chunks (the same few notes): stored as codes into a table of JSON values
+REPEATED_FIELDS = ("uncertainty_notes",)
+
+SCHEMA_FIELDS = CATEGORICAL_FIELDS + INT_FIELDS + BOOL_FIELDS + FIXED_FIELDS + REPEATED_FIELDS
+
+class CategoricalColumn:
+    """Integer codes into a table of distinct values."""
+
+    def __init__(self):
+        """Initialize an empty column."""
+        self.values: List[Any] = []
+        self._codes_by_value: Dict[Any, int] = {}
+        self._codes: List[int] = []
+        self.codes: Optional[np.ndarray] = None
+
+    def append(self, value: Any):
+        """Add a value, reusing its code if it was seen before."""
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            key = tuple(value)
+        elif isinstance(value, (list, dict)):
+            key = json.dumps(value, sort_keys=True)
+        else:
+            key = value
+        code = self._codes_by_value.get(key)
+        if code is None:
+            code = len(self.values)
+            self._codes_by_value[key] = code
+            self.values.append(sys.intern(value) if isinstance(value, str) else value)
+        self._codes.append(code)
+
+    def freeze(self):
+        """Convert the codes to the smallest unsigned integer array."""
+        dtype = np.uint8 if len(self.values) <= 0xFF else np.uint16 if len(self.values) <= 0xFFFF else np.uint32
+        self.codes = np.array(self._codes, dtype=dtype)
+        self._codes = []
+        self._codes_by_value = {}
+
+    def __getitem__(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the column."""
+        return self.codes.nbytes + sum(sys.getsizeof(value) for value in self.values)
+
+class ChunkView(Mapping):
+    """
+    Read-only mapping over one stored chunk.
+
+    Fields are read from the store when accessed, so a search result costs a
+    row number rather than a copy of the chunk.
+    """
+
+    __slots__ = ("store", "row", "fields")
+
+    def __init__(self, store: "ChunkStore", row: int, fields: Optional[Iterable[str]] = None):
+        """
+        Initialize view.
+
+        Args:
+            store: ChunkStore holding the chunk
+            row: Chunk position in the store
+            fields: Fields the view exposes (default: every metadata field, without the text)
+        """
+        self.store = store
+        self.row = row
+        self.fields = tuple(fields) if fields is not None else None
+
+    def _field_names(self) -> Iterable[str]:
+        if self.fields is not None:
+            return self.fields
+        return self.store.metadata_fields(self.row)
+
+    def __getitem__(self, field: str) -> Any:
+        if self.fields is not None and field not in self.fields:
+            raise KeyError(field)
+        if self.fields is None and field == TEXT_FIELD:
+            raise KeyError(field)
+        if not self.store.has(self.row, field):
+            raise KeyError(field)
+        return self.store.get(self.row, field)
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in self._field_names() if self.store.has(self.row, field))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the view as a plain dictionary."""
+        return {field: self[field] for field in self}
+
+    def __repr__(self) -> str:
+        return f"ChunkView(row={self.row}, {self.to_dict()!r})"
+
+class ChunkStore:
+    """Columnar storage for chunks: one UTF-8 text buffer plus typed metadata columns."""
+
+    def __init__(self):
+        """Initialize an empty store (use from_chunks or from_jsonl)."""
+        self.count = 0
+        self.text_buffer = b""
+        self.text_offsets = np.zeros(1, dtype=np.int64)
+        self.categorical: Dict[str, CategoricalColumn] = {}
+        self.integers: Dict[str, np.ndarray] = {}
+        self.flags: Dict[str, np.ndarray] = {}
+        self.fixed: Dict[str, np.ndarray] = {}
+        # Fields outside the schema, kept only for the chunks that have them
+        self.sparse: Dict[str, Dict[int, Any]] = {}
+        self.present: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Dict[str, Any]]) -> "ChunkStore":
+        """
+        Build a store from chunk dictionaries, consuming them one at a time.
+
+        Args:
+            chunks: Iterable of chunk dictionaries (as in chunks.jsonl)
+
+        Returns:
+            ChunkStore instance
+        """
+        store = cls()
+        texts = []
+        offsets = [0]
+        categorical = {field: CategoricalColumn() for field in CATEGORICAL_FIELDS + REPEATED_FIELDS}
+        integers = {field: [] for field in INT_FIELDS}
+        flags = {field: [] for field in BOOL_FIELDS}
+        fixed = {field: [] for field in FIXED_FIELDS}
+        missing = {field: [] for field in SCHEMA_FIELDS}
+        schema = set(SCHEMA_FIELDS) | {TEXT_FIELD}
+
+        for row, chunk in enumerate(chunks):
+            encoded = chunk.get(TEXT_FIELD, "").encode("utf-8")
+            texts.append(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+
+            for field, column in categorical.items():
+                column.append(chunk.get(field, [] if field in REPEATED_FIELDS else ""))
+            for field, values in integers.items():
+                values.append(chunk.get(field, 0))
+            for field, values in flags.items():
+                values.append(bool(chunk.get(field, False)))
+            for field, values in fixed.items():
+                values.append(chunk.get(field, "").encode("ascii"))
+
+            if len(chunk) != len(schema) or chunk.keys() != schema:
+                for field in missing.keys() - chunk.keys():
+                    missing[field].append(row)
+                for field in chunk.keys() - schema:
+                    store.sparse.setdefault(field, {})[row] = chunk[field]
+
+            store.count = row + 1
+
+        store.text_buffer = b"".join(texts)
+        store.text_offsets = np.array(offsets, dtype=np.int64)
+
+        for field, column in categorical.items():
+            column.freeze()
+        store.categorical = categorical
+        store.integers = {field: np.array(values, dtype=np.int32) for field, values in integers.items()}
+        store.flags = {field: np.array(values, dtype=np.bool_) for field, values in flags.items()}
+        store.fixed = {field: np.array(values, dtype=np.bytes_) for field, values in fixed.items()}
+
+        # Remember which schema fields a chunk lacked, so views only show what was stored
+        for field, rows in missing.items():
+            if rows:
+                present = np.ones(store.count, dtype=np.bool_)
+                present[rows] = False
+                store.present[field] = present
+
+        return store
+
+    @classmethod
+    def from_jsonl(cls, path: Path, keep: Optional[Callable[[Dict[str, Any]], bool]] = None) -> "ChunkStore":
+        """
+        Build a store from a chunks JSONL file, streaming it line by line.
+
+        Args:
+            path: chunks.jsonl path
+            keep: Predicate selecting the chunks to store (default: all)
+
+        Returns:
+            ChunkStore instance
+        """
+        def read() -> Iterator[Dict[str, Any]]:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        chunk = json.loads(line)
+                        if keep is None or keep(chunk):
+                            yield chunk
+
+        store = cls.from_chunks(read())
+        logger.info("Loaded %d chunks into %.1f MB of columns", len(store), store.nbytes / 1e6)
+        return store
+
+    def __len__(self) -> int:
+        return self.count
+
+    def text(self, row: int) -> str:
+        """
+        Return a chunk's text.
+
+        Args:
+            row: Chunk position
+
+        Returns:
+            Chunk text
+        """
+        start, end = self.text_offsets[row:row + 2].tolist()
+        return self.text_buffer[start:end].decode("utf-8")
+
+    def has(self, row: int, field: str) -> bool:
+        """Whether a chunk has a field."""
+        if field in self.sparse:
+            return row in self.sparse[field]
+        if field == TEXT_FIELD:
+            return True
+        if field in self.present:
+            return bool(self.present[field][row])
+        return field in self.categorical or field in self.integers or field in self.flags or field in self.fixed
+
+    def get(self, row: int, field: str, default: Any = None) -> Any:
+        """
+        Read one field of a chunk.
+
+        Args:
+            row: Chunk position
+            field: Field name
+            default: Value for a field the chunk does not have
+
+        Returns:
+            Field value as a plain Python value
+        """
+        if not 0 <= row < self.count:
+            return default
+        present = self.present.get(field)
+        if present is not None and not present[row]:
+            return default
+
+        column = self.categorical.get(field)
+        if column is not None:
+            value = column[row]
+            return list(value) if isinstance(value, list) else value
+        if field in self.integers:
+            return int(self.integers[field][row])
+        if field in self.flags:
+            return bool(self.flags[field][row])
+        if field in self.fixed:
+            return self.fixed[field][row].decode("ascii")
+        if field == TEXT_FIELD:
+            return self.text(row)
+        return self.sparse.get(field, {}).get(row, default)
+
+    def metadata_fields(self, row: int) -> List[str]:
+        """List the metadata fields (everything but the text) a chunk has."""
+        fields = list(SCHEMA_FIELDS)
+        fields.extend(field for field, values in self.sparse.items() if row in values)
+        return [field for field in fields if self.has(row, field)]
+
+    def view(self, row: int, fields: Optional[Iterable[str]] = None) -> ChunkView:
+        """
+        Return a lazy view of a chunk.
+
+        Args:
+            row: Chunk position
+            fields: Fields the view exposes (default: all metadata, without the text)
+
+        Returns:
+            ChunkView over the chunk
+        """
+        return ChunkView(self, row, fields)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the store."""
+        total = len(self.text_buffer) + self.text_offsets.nbytes
+        total += sum(column.nbytes for column in self.categorical.values())
+        total += sum(array.nbytes for array in self.integers.values())
+        total += sum(array.nbytes for array in self.flags.values())
+        total += sum(array.nbytes for array in self.fixed.values())
+        total += sum(array.nbytes for array in self.present.values())
+        total += sum(sys.getsizeof(values) for values in self.sparse.values())
+        return total
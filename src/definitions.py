@@ -0,0 +1,364 @@
+"""
+Definitions dictionary for Nigerian Tax Reform Acts RAG system.
+Indexes the statutory definitions found by the parser for constant-time
+lookup of "Define X" questions.
+"""
+
+import re
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+from query_expander import ALIASES_FILE, PROCESSED_DIR, load_alias_groups, mine_definition_aliases
+
+logger = logging.getLogger(__name__)
+
+DEFINITIONS_FILE = PROCESSED_DIR / "definitions_index.json"
+
+WORD = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+ARTICLES = {"a", "an", "the"}
+
+# Plurals the suffix rules below get wrong
+IRREGULAR_LEMMAS = {
+    "people": "person",
+    "persons": "person",
+    "children": "child",
+    "monies": "money",
+    "moneys": "money",
+    "criteria": "criterion",
+    "indices": "index",
+    "premises": "premises",
+    "proceeds": "proceeds"
+}
+
+# Singular words ending in "s" that must not lose it (business, bonus, basis)
+KEEP_S_ENDINGS = ("ss", "us", "is")
+
+# "Define X", "What is the meaning of X", "What does X mean", ... (X is looked up directly)
+DEFINITION_QUESTION = re.compile(
+    r'^\s*(?:please\s+)?(?:(?:can|could)\s+you\s+)?'
+    r'(?:define|definition\s+of|meaning\s+of|explain\s+the\s+term'
+    r'|what\s+(?:is|are)\s+the\s+(?:legal\s+)?(?:definition|meaning)\s+of'
+    r'|what\s+is\s+meant\s+by|what\s+(?:does|do))'
+    r'\s+(?:the\s+(?:term|word|phrase)\s+)?["“\']?(?P<term>.+?)["”\']?'
+    r'(?:\s+mean)?(?:\s+(?:in|under)\s+(?:the\s+)?(?:new\s+)?(?:nigerian?\s+)?(?:tax\s+)?(?:act|law|bill)s?\b.*)?'
+    r'\s*[?.!]*\s*$',
+    re.IGNORECASE
+)
+
+# "What is X?" counts as a definition question only when X is a defined term
+WHAT_IS_QUESTION = re.compile(
+    r'^\s*what\s+(?:is|are)\s+["“\']?(?P<term>[^?]+?)["”\']?\s*[?.!]*\s*$',
+    re.IGNORECASE
+)
+
+def lemmatize(word: str) -> str:
+    """
+    Reduce an English word to its singular form with suffix rules.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Lemma (unchanged for short and singular words)
+    """
+    if word in IRREGULAR_LEMMAS:
+        return IRREGULAR_LEMMAS[word]
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes", "zes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(KEEP_S_ENDINGS):
+        return word[:-1]
+    return word
+
+def normalize_term(term: str) -> str:
+    """
+    Normalize a term for lookup.
+
+    Lowercases, drops quotes, punctuation and leading articles, and
+    lemmatizes each word, so "Taxable Incomes" and "the taxable income"
+    share a key.
+
+    Args:
+        term: Term as written in an Act or a question
+
+    Returns:
+        Lookup key (empty if the term has no words)
+    """
+    words = [lemmatize(word) for word in WORD.findall(term.lower())]
+    while words and words[0] in ARTICLES:
+        words.pop(0)
+    return " ".join(words)
+
+def section_for_definition(definition: Dict[str, Any], sections: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Find the section a definition appears in.
+
+    Args:
+        definition: Definition dictionary from TaxActParser.extract_definitions
+        sections: Sections of the same parsed document
+
+    Returns:
+        Section dictionary (empty if none matches)
+    """
+    quoted = f'"{definition["term"]}"'
+    page = definition.get("page", 0)
+
+    for section in sections:
+        if quoted in section.get("content", ""):
+            return section
+    for section in sections:
+        if section.get("content") and section.get("page_start", 0) <= page <= section.get("page_end", 0):
+            return section
+    return {}
+
+class DefinitionIndex:
+    """Statutory definitions keyed by normalized term, with aliases."""
+
+    def __init__(self, terms: Dict[str, List[Dict[str, Any]]], aliases: Dict[str, str]):
+        """
+        Initialize index.
+
+        Args:
+            terms: Mapping of normalized term to its definitions (one per defining document)
+            aliases: Mapping of normalized alias to the normalized term it stands for
+        """
+        self.terms = terms
+        self.aliases = aliases
+
+    @classmethod
+    def build(
+        cls,
+        processed_dir: Path = PROCESSED_DIR,
+        aliases_file: Path = ALIASES_FILE,
+        document_names: Optional[Iterable[str]] = None
+    ) -> "DefinitionIndex":
+        """
+        Build the index from the definitions in parsed documents.
+
+        Aliases come from '"X" has the same meaning as Y' definitions, from
+        acronyms defined in the Acts, and from the curated alias groups whose
+        names include a defined term.
+
+        Args:
+            processed_dir: Directory containing *_parsed.json files
+            aliases_file: Curated alias JSON file
+            document_names: Only index these documents (default: all parsed documents)
+
+        Returns:
+            DefinitionIndex instance
+        """
+        wanted = set(document_names) if document_names is not None else None
+        terms: Dict[str, List[Dict[str, Any]]] = {}
+        same_as: Dict[str, str] = {}
+        all_definitions = []
+
+        for parsed_file in sorted(processed_dir.glob("*_parsed.json")):
+            try:
+                with open(parsed_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not read definitions from %s: %s", parsed_file.name, e)
+                continue
+
+            document_name = data.get("filename", "")
+            if wanted is not None and document_name not in wanted:
+                continue
+
+            for definition in data.get("definitions", []):
+                key = normalize_term(definition.get("term", ""))
+                if not key:
+                    continue
+                all_definitions.append(definition)
+
+                if definition.get("same_as"):
+                    same_as[key] = normalize_term(definition["same_as"])
+
+                # Parses from before full definition text was recorded only have the context
+                text = definition.get("definition") or definition.get("context", "")
+                entries = terms.setdefault(key, [])
+                if any(entry["document_name"] == document_name and entry["definition"] == text for entry in entries):
+                    continue
+
+                # Newer parses locate the section themselves; older ones carry section text
+                if "section_number" in definition:
+                    section = {"number": definition["section_number"], "title": definition.get("section_title", "")}
+                else:
+                    section = section_for_definition(definition, data.get("sections", []))
+                entries.append({
+                    "term": definition["term"],
+                    "definition": text,
+                    "document_name": document_name,
+                    "page": definition.get("page", 0),
+                    "section_number": str(section.get("number", "")),
+                    "section_title": section.get("title", "")
+                })
+
+        aliases: Dict[str, str] = {}
+
+        def add_alias(alias: str, target: str):
+            if alias and alias != target and target in terms and alias not in terms:
+                aliases.setdefault(alias, target)
+
+        # A same-meaning term keeps its own entry, and lookups add the target's
+        for key, target in same_as.items():
+            if target in terms and target != key:
+                aliases[key] = target
+
+        for group in mine_definition_aliases(all_definitions) + load_alias_groups(aliases_file):
+            keys = [normalize_term(name) for name in group]
+            defined = [key for key in keys if key in terms]
+            if defined:
+                for key in keys:
+                    add_alias(key, defined[0])
+
+        return cls(terms, aliases)
+
+    @classmethod
+    def load(cls, path: Path = DEFINITIONS_FILE) -> "DefinitionIndex":
+        """
+        Load the index written at ingest time.
+
+        Args:
+            path: definitions_index.json path
+
+        Returns:
+            DefinitionIndex instance (empty if the file is missing)
+        """
+        if not path.exists():
+            logger.warning("Definitions index not found at %s", path)
+            return cls({}, {})
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        index = cls(data.get("terms", {}), data.get("aliases", {}))
+        logger.info("Definitions index ready: %d terms, %d aliases", len(index.terms), len(index.aliases))
+        return index
+
+    def save(self, path: Path = DEFINITIONS_FILE):
+        """
+        Write the index as JSON.
+
+        Args:
+            path: Output path
+        """
+        data = {
+            "timestamp": datetime.now().isoformat(),
+            "timezone": "Africa/Lagos",
+            "term_count": len(self.terms),
+            "alias_count": len(self.aliases),
+            "terms": self.terms,
+            "aliases": self.aliases
+        }
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def lookup(self, term: str) -> List[Dict[str, Any]]:
+        """
+        Find the definitions of a term or one of its aliases.
+
+        Args:
+            term: Term in any case or number ("Taxable Incomes", "TIN")
+
+        Returns:
+            Definition entries (empty if the term is not defined)
+        """
+        key = normalize_term(term)
+        entries = self.terms.get(key, [])
+        if key in self.aliases:
+            entries = entries + self.terms.get(self.aliases[key], [])
+        return entries
+
+    def match_question(self, question: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Recognize a question asking for the definition of a defined term.
+
+        Args:
+            question: User's question
+
+        Returns:
+            Tuple of (term as asked, definition entries), or None
+        """
+        for pattern in (DEFINITION_QUESTION, WHAT_IS_QUESTION):
+            match = pattern.match(question)
+            if match:
+                entries = self.lookup(match.group("term"))
+                if entries:
+                    return match.group("term").strip(), entries
+        return None
+
+    def format_context(self, entries: List[Dict[str, Any]]) -> str:
+        """
+        Format definitions as priority context placed before retrieved chunks.
+
+        Args:
+            entries: Definition entries
+
+        Returns:
+            Context string
+        """
+        parts = []
+        for i, entry in enumerate(entries, 1):
+            parts.append(f"[Definition {i}] {self.citation(entry)}\n{entry['definition']}")
+        return "\n\n" + "\n\n---\n\n".join(parts)
+
+    def format_answer(self, term: str, entries: List[Dict[str, Any]]) -> str:
+        """
+        Answer a definition question directly from the index.
+
+        Args:
+            term: Term as asked
+            entries: Definition entries
+
+        Returns:
+            Markdown answer quoting each definition with its citation
+        """
+        lines = [f"**{entries[0]['term'][:1].upper() + entries[0]['term'][1:]}**"]
+        if normalize_term(term) != normalize_term(entries[0]["term"]):
+            lines[0] += f" (asked as \"{term}\")"
+
+        for entry in entries:
+            lines.append("")
+            lines.append(f"Under {self.citation(entry)}:")
+            lines.append(f"> {entry['definition']}")
+
+        return "\n".join(lines)
+
+    def citation(self, entry: Dict[str, Any]) -> str:
+        """Build the citation of a definition entry."""
+        parts = [entry["document_name"]]
+        if entry.get("section_number"):
+            parts.append(f"Section {entry['section_number']}")
+        if entry.get("section_title"):
+            parts.append(f"({entry['section_title']})")
+        if entry.get("page"):
+            parts.append(f"Page {entry['page']}")
+        return " - ".join(parts)
+
+    def sources(self, entries: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """
+        Build source citations in the format of TaxActRetriever.get_sources.
+
+        Args:
+            entries: Definition entries
+
+        Returns:
+            List of source dictionaries
+        """
+        return [
+            {
+                "document": entry["document_name"],
+                "section": entry.get("section_number", ""),
+                "title": entry.get("section_title", ""),
+                "pages": f"{entry['page']}-{entry['page']}" if entry.get("page") else "",
+                "type": "definition"
+            }
+            for entry in entries
+        ]
@@ -4,19 +4,27 @@ Generates responses using retrieved context and GPT models.
 """
 
 import os
+import time
+import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
-try:
-    from openai import OpenAI
-except ImportError:
-    raise ImportError("Missing openai library. Run: pip install openai")
-
 from dotenv import load_dotenv
 
+from definitions import DefinitionIndex
+from providers import get_provider
+from tracing import span
+
 # Load environment variables
 load_dotenv(Path(__file__).parent.parent / ".env.backend")
 
+logger = logging.getLogger(__name__)
+
+# Headings of the user prompt (the local provider reads the question and context back by them)
+QUESTION_LABEL = "Question:"
+CONTEXT_HEADER = "Context from Nigerian Tax Reform Acts 2025-2026:"
+INSTRUCTIONS_HEADER = "Provide a comprehensive answer that:"
+
 class AnswerGenerator:
     """Generates answers using RAG context and GPT models."""
 
@@ -25,15 +33,12 @@ class AnswerGenerator:
         Initialize generator.
 
         Args:
-            model: OpenAI chat model to use
+            model: Chat model to use
         """
         self.model = model or os.getenv("CHAT_MODEL", "gpt-4o-mini")
 
-        # Initialize OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not set in environment")
-        self.client = OpenAI(api_key=api_key)
+        # Chat provider (MODEL_PROVIDER: openai or local)
+        self.provider = get_provider()
 
     def build_system_prompt(self) -> str:
         """
@@ -79,12 +84,12 @@ Response format:
         Returns:
             User prompt string
         """
-        return f"""Question: {query}
+        return f"""{QUESTION_LABEL} {query}
 
-Context from Nigerian Tax Reform Acts 2025-2026:
+{CONTEXT_HEADER}
 {context}
 
-Provide a comprehensive answer that:
+{INSTRUCTIONS_HEADER}
 1. Starts with a clear, direct answer
 2. Uses structured formatting (headers, bullets, numbered lists)
 3. Explains technical terms in accessible language
@@ -117,39 +122,41 @@ If information is not available, state it clearly without being apologetic or de
         system_prompt = self.build_system_prompt()
         user_prompt = self.build_user_prompt(query, context)
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
-            )
-
-            answer = response.choices[0].message.content
-            finish_reason = response.choices[0].finish_reason
-
-            return {
-                "answer": answer,
-                "model": self.model,
-                "finish_reason": finish_reason,
-                "tokens_used": {
-                    "prompt": response.usage.prompt_tokens,
-                    "completion": response.usage.completion_tokens,
-                    "total": response.usage.total_tokens
+        with span("generator.completion", model=self.model, provider=self.provider.name,
+                  max_tokens=max_tokens) as completion_span:
+            try:
+                completion = self.provider.complete(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    model=self.model,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+                completion_span.set_attributes(
+                    finish_reason=completion["finish_reason"],
+                    prompt_tokens=completion["usage"]["prompt"],
+                    completion_tokens=completion["usage"]["completion"]
+                )
+
+                return {
+                    "answer": completion["content"],
+                    "model": self.model,
+                    "finish_reason": completion["finish_reason"],
+                    "tokens_used": completion["usage"]
                 }
-            }
 
-        except Exception as e:
-            return {
-                "answer": f"Error generating answer: {str(e)}",
-                "model": self.model,
-                "finish_reason": "error",
-                "tokens_used": None,
-                "error": str(e)
-            }
+            except Exception as e:
+                # The error becomes the answer, so mark the span failed here
+                completion_span.record_error(e)
+                return {
+                    "answer": f"Error generating answer: {str(e)}",
+                    "model": self.model,
+                    "finish_reason": "error",
+                    "tokens_used": None,
+                    "error": str(e)
+                }
 
     def generate_with_sources(
         self,
@@ -211,6 +218,9 @@ If information is not available, state it clearly without being apologetic or de
             if source.get("pages"):
                 parts.append(f"(Pages {source['pages']})")
 
+            if source.get("url"):
+                parts.append(f"<{source['url']}>")
+
             formatted.append(f"{i}. {' '.join(parts)}")
 
         return "\n".join(formatted)
@@ -221,7 +231,9 @@ class RAGPipeline:
     def __init__(
         self,
         retriever,
-        generator: Optional[AnswerGenerator] = None
+        generator: Optional[AnswerGenerator] = None,
+        definitions: Optional[DefinitionIndex] = None,
+        definition_answers: Optional[str] = None
     ):
         """
         Initialize RAG pipeline.
@@ -229,16 +241,48 @@ class RAGPipeline:
         Args:
             retriever: TaxActRetriever instance
             generator: AnswerGenerator instance (optional)
+            definitions: DefinitionIndex (default: loaded from definitions_index.json)
+            definition_answers: How definition questions are answered: "direct"
+                (from the index, no model call), "context" (definitions placed
+                first in the model's context) or "off"
         """
         self.retriever = retriever
         self.generator = generator or AnswerGenerator()
+        self.definitions = definitions if definitions is not None else DefinitionIndex.load()
+        self.definition_answers = (definition_answers or os.getenv("DEFINITION_ANSWERS", "direct")).lower()
+
+    def answer_definition(self, question: str, term: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Answer a definition question from the definitions index.
+
+        Args:
+            question: User's question
+            term: Term as asked
+            entries: Definition entries for the term
+
+        Returns:
+            Dictionary in the same shape as query()
+        """
+        sources = self.definitions.sources(entries)
+        return {
+            "answer": self.definitions.format_answer(term, entries),
+            "model": "definitions-index",
+            "finish_reason": "definition",
+            "tokens_used": None,
+            "sources": self.generator._format_sources(sources),
+            "source_list": sources,
+            "retrieved_chunks": 0,
+            "query": question,
+            "definition_term": term
+        }
 
     def query(
         self,
         question: str,
         filters: Optional[Dict[str, Any]] = None,
         top_k: Optional[int] = None,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        include_chunks: bool = False
     ) -> Dict[str, Any]:
         """
         Execute complete RAG query.
@@ -248,10 +292,24 @@ class RAGPipeline:
             filters: Optional metadata filters
             top_k: Number of chunks to retrieve (overrides default)
             temperature: Model temperature
+            include_chunks: Return the chunks placed in the context as "chunks"
 
         Returns:
             Dictionary with answer, context, sources, and metadata
         """
+        # Definition questions are looked up before any embedding or search
+        definition = None
+        if self.definition_answers != "off":
+            definition = self.definitions.match_question(question)
+
+        if definition and self.definition_answers == "direct":
+            start = time.perf_counter()
+            with span("rag.definition", term=definition[0]):
+                response = self.answer_definition(question, *definition)
+            logger.info("Answered %r from the definitions index in %.2f ms",
+                        definition[0], (time.perf_counter() - start) * 1000)
+            return response
+
         # Override top_k if specified
         original_top_k = None
         if top_k:
@@ -265,11 +323,25 @@ class RAGPipeline:
         if original_top_k:
             self.retriever.top_k = original_top_k
 
-        # Format context
-        context = self.retriever.format_context(results)
-
-        # Get sources
-        sources = self.retriever.get_sources(results)
+        # Exact definitions go first and count against the context budget
+        priority_context = self.definitions.format_context(definition[1]) if definition else ""
+        max_tokens = None
+        if priority_context and self.retriever.max_context_tokens:
+            used = self.retriever.token_counter.count(priority_context + "\n\n---")
+            max_tokens = max(self.retriever.max_context_tokens - used, 1)
+
+        with span("rag.build_context", candidates=len(results)) as context_span:
+            # Keep what fits the context budget, then format it
+            results = self.retriever.fit_context(results, max_tokens)
+            context = self.retriever.format_context(results)
+            if priority_context:
+                context = priority_context + ("\n\n---" + context if results else "")
+
+            # Get sources
+            sources = self.retriever.get_sources(results)
+            if definition:
+                sources = self.definitions.sources(definition[1]) + sources
+            context_span.set_attributes(chunks=len(results), context_chars=len(context))
 
         # Generate answer
         response = self.generator.generate_with_sources(
@@ -282,5 +354,7 @@ class RAGPipeline:
         # Add retrieval info
         response["retrieved_chunks"] = len(results)
         response["query"] = question
+        if include_chunks:
+            response["chunks"] = results
 
         return response
@@ -0,0 +1,284 @@
+"""
+Versioned index storage for Nigerian Tax Reform Acts RAG system.
+Each index build is written to its own directory, sealed with an integrity
+manifest and published by atomically replacing a pointer file, so readers
+never see a half-written or mismatched set of artifacts.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_DIR = Path(__file__).parent.parent / "data" / "embeddings"
+VERSIONS_DIR = EMBEDDINGS_DIR / "versions"
+CURRENT_FILE = EMBEDDINGS_DIR / "CURRENT"
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+# Published versions kept on disk (the current one is always kept)
+INDEX_KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", "3"))
+
+# Unsealed directories older than this are abandoned builds
+ABANDONED_BUILD_SECONDS = 24 * 3600
+
+class IndexIntegrityError(RuntimeError):
+    """Raised when index artifacts do not match their manifest."""
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 of a file without loading it into memory.
+
+    Args:
+        path: File to hash
+        block_size: Read size in bytes
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def chunk_hashes_digest(hashes: Iterable[str]) -> str:
+    """
+    Digest the ordered chunk hashes of an index.
+
+    Two indices agree on which chunk sits at each position exactly when
+    their digests match, which is what search result lookups rely on.
+
+    Args:
+        hashes: Chunk hashes in index order
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for chunk_hash in hashes:
+        digest.update(chunk_hash.encode("ascii"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+def new_version_dir(versions_dir: Path = VERSIONS_DIR) -> Path:
+    """
+    Create an empty directory for a new build.
+
+    Names sort by build time. The directory is not visible to readers until
+    it is sealed with a manifest and published.
+
+    Args:
+        versions_dir: Parent directory of all versions
+
+    Returns:
+        Path of the new directory
+    """
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    for attempt in range(100):
+        path = versions_dir / (stamp if attempt == 0 else f"{stamp}-{attempt}")
+        try:
+            path.mkdir()
+            return path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Could not create a version directory in {versions_dir}")
+
+def write_manifest(
+    version_dir: Path,
+    files: Iterable[str],
+    chunk_hashes: List[str],
+    model: str,
+    dimension: int,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Seal a build directory with its integrity manifest.
+
+    Args:
+        version_dir: Build directory
+        files: Artifact file names inside the directory to checksum
+        chunk_hashes: Chunk hashes in index order
+        model: Embedding model
+        dimension: Embedding dimension
+        params: Build parameters worth recording (chunking, dimensions, ...)
+
+    Returns:
+        Manifest dictionary
+    """
+    manifest = {
+        "format": MANIFEST_FORMAT,
+        "version": version_dir.name,
+        "timestamp": datetime.now().isoformat(),
+        "timezone": "Africa/Lagos",
+        "model": model,
+        "dimension": dimension,
+        "chunk_count": len(chunk_hashes),
+        "chunk_hashes_sha256": chunk_hashes_digest(chunk_hashes),
+        "params": params or {},
+        "files": {
+            name: {
+                "bytes": (version_dir / name).stat().st_size,
+                "sha256": file_sha256(version_dir / name)
+            }
+            for name in files
+        }
+    }
+
+    tmp_path = version_dir / (MANIFEST_NAME + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, version_dir / MANIFEST_NAME)
+    return manifest
+
+def publish(version_dir: Path, current_file: Path = CURRENT_FILE):
+    """
+    Make a sealed version the one readers load.
+
+    The pointer is replaced with a rename, so a reader sees either the old
+    or the new version name, never a partial write.
+
+    Args:
+        version_dir: Sealed version directory
+        current_file: Pointer file
+    """
+    if not (version_dir / MANIFEST_NAME).exists():
+        raise IndexIntegrityError(f"Refusing to publish {version_dir}: no manifest")
+
+    tmp_path = current_file.with_name(current_file.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version_dir.name + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, current_file)
+    logger.info("Published index version %s", version_dir.name)
+
+def current_version(current_file: Path = CURRENT_FILE, versions_dir: Path = VERSIONS_DIR) -> Optional[Path]:
+    """
+    Return the published version directory.
+
+    Args:
+        current_file: Pointer file
+        versions_dir: Parent directory of all versions
+
+    Returns:
+        Version directory, or None if nothing has been published
+    """
+    if not current_file.exists():
+        return None
+    name = current_file.read_text(encoding='utf-8').strip()
+    if not name:
+        return None
+    return versions_dir / name
+
+def load_manifest(version_dir: Path) -> Dict[str, Any]:
+    """
+    Read the manifest of a version.
+
+    Args:
+        version_dir: Version directory
+
+    Returns:
+        Manifest dictionary
+
+    Raises:
+        IndexIntegrityError: If the manifest is missing, unreadable or of another format
+    """
+    manifest_path = version_dir / MANIFEST_NAME
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        raise IndexIntegrityError(f"Cannot read index manifest {manifest_path}: {e}") from e
+
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise IndexIntegrityError(
+            f"Index manifest {manifest_path} has format {manifest.get('format')}, expected {MANIFEST_FORMAT}"
+        )
+    return manifest
+
+def verify_version(version_dir: Path, checksums: bool = False) -> Dict[str, Any]:
+    """
+    Check a version's artifacts against its manifest.
+
+    By default only presence and sizes are checked, which costs a few stat
+    calls; checksums re-read every artifact.
+
+    Args:
+        version_dir: Version directory
+        checksums: Also verify SHA-256 checksums
+
+    Returns:
+        Manifest dictionary
+
+    Raises:
+        IndexIntegrityError: If an artifact is missing or differs from the manifest
+    """
+    manifest = load_manifest(version_dir)
+
+    for name, expected in manifest["files"].items():
+        path = version_dir / name
+        if not path.exists():
+            raise IndexIntegrityError(f"Index artifact missing: {path}")
+        size = path.stat().st_size
+        if size != expected["bytes"]:
+            raise IndexIntegrityError(f"Index artifact {path} is {size} bytes, manifest says {expected['bytes']}")
+        if checksums and file_sha256(path) != expected["sha256"]:
+            raise IndexIntegrityError(f"Index artifact {path} does not match its manifest checksum")
+
+    return manifest
+
+def collect_garbage(
+    keep: int = INDEX_KEEP_VERSIONS,
+    current_file: Path = CURRENT_FILE,
+    versions_dir: Path = VERSIONS_DIR
+) -> List[Path]:
+    """
+    Delete old versions and abandoned builds.
+
+    The newest published versions are kept so processes still serving an
+    older one can finish; the current version is never deleted.
+
+    Args:
+        keep: Number of sealed versions to keep (at least 1)
+        current_file: Pointer file
+        versions_dir: Parent directory of all versions
+
+    Returns:
+        Deleted directories
+    """
+    if not versions_dir.exists():
+        return []
+
+    current = current_version(current_file, versions_dir)
+    sealed = []
+    removed = []
+
+    for path in sorted(versions_dir.iterdir()):
+        if not path.is_dir() or path == current:
+            continue
+        if (path / MANIFEST_NAME).exists():
+            sealed.append(path)
+        elif time.time() - path.stat().st_mtime > ABANDONED_BUILD_SECONDS:
+            removed.append(path)
+
+    # The current version counts towards the kept ones
+    keep = max(1, keep) - (1 if current is not None else 0)
+    removed.extend(sealed[:max(0, len(sealed) - keep)])
+
+    for path in removed:
+        shutil.rmtree(path, ignore_errors=True)
+        logger.info("Removed index version %s", path.name)
+
+    return removed
@@ -0,0 +1,330 @@
+"""
+Model providers for Nigerian Tax Reform Acts RAG system.
+Embeddings and chat completions go through a provider chosen with
+MODEL_PROVIDER: "openai" (default) calls the OpenAI API, "local" answers
+in-process with deterministic embeddings and extractive or canned answers,
+with configurable latency and error injection, so the whole stack can run,
+be benchmarked and be load-tested without network access.
+"""
+
+import os
+import re
+import time
+import random
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Native sizes of the OpenAI embedding models (used by the local provider too, so its vectors fit their indices)
+EMBEDDING_SIZES = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536
+}
+
+WORD = re.compile(r"[a-z0-9]+")
+SENTENCE_END = re.compile(r"(?<=[.;:])\s+")
+
+class ProviderError(RuntimeError):
+    """Raised by the local provider for an injected failure."""
+
+class ModelProvider(ABC):
+    """Interface for embedding and chat completion backends."""
+
+    name = "base"
+
+    @abstractmethod
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> List[List[float]]:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+            model: Embedding model
+            dimensions: Requested output dimensions (None = model default)
+
+        Returns:
+            Embedding vectors, in input order
+        """
+
+    @abstractmethod
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.1,
+        max_tokens: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Create a chat completion.
+
+        Args:
+            messages: Chat messages (role and content)
+            model: Chat model
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in the completion
+
+        Returns:
+            Dictionary with content, finish_reason and usage (prompt, completion, total tokens)
+        """
+
+class OpenAIProvider(ModelProvider):
+    """Provider backed by the OpenAI API."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        """
+        Initialize provider.
+
+        Args:
+            api_key: OpenAI API key (default: OPENAI_API_KEY)
+
+        Raises:
+            ValueError: If no API key is configured
+        """
+        try:
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError("Missing openai library. Run: pip install openai")
+
+        api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not set in environment")
+        self.client = OpenAI(api_key=api_key)
+
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> List[List[float]]:
+        extra = {"dimensions": dimensions} if dimensions else {}
+        response = self.client.embeddings.create(model=model, input=texts, **extra)
+        return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.1,
+        max_tokens: int = 1000
+    ) -> Dict[str, Any]:
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return {
+            "content": response.choices[0].message.content,
+            "finish_reason": response.choices[0].finish_reason,
+            "usage": {
+                "prompt": response.usage.prompt_tokens,
+                "completion": response.usage.completion_tokens,
+                "total": response.usage.total_tokens
+            }
+        }
+
+def hash_term(term: str) -> int:
+    """Stable 32-bit hash of a term (Python's hash() is salted per process)."""
+    value = 2166136261
+    for byte in term.encode("utf-8"):
+        value = ((value ^ byte) * 16777619) & 0xFFFFFFFF
+    return value
+
+def hashed_embedding(text: str, dimension: int) -> np.ndarray:
+    """
+    Embed text as hashed unigrams and bigrams with log term frequency, at unit length.
+
+    Texts sharing words get similar vectors, so retrieval over a hashed
+    index still behaves like retrieval, only with a bag-of-words model.
+
+    Args:
+        text: Text to embed
+        dimension: Vector dimension
+
+    Returns:
+        float32 vector
+    """
+    words = WORD.findall(text.lower())
+    vector = np.zeros(dimension, dtype=np.float32)
+    for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hash_term(term)
+        vector[digest % dimension] += 1.0 if digest & (1 << 31) else -1.0
+    vector = np.sign(vector) * np.log1p(np.abs(vector))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class LocalProvider(ModelProvider):
+    """
+    Deterministic in-process provider.
+
+    Embeddings are hashed bag-of-words vectors. Answers either quote the
+    context sentences sharing the most words with the question
+    (extractive) or return a fixed text (canned). Each call waits for the
+    configured latency and fails with the configured probability, drawn
+    from a seeded generator so runs are repeatable.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        chat_mode: Optional[str] = None,
+        canned_answer: Optional[str] = None,
+        embed_latency_ms: Optional[float] = None,
+        chat_latency_ms: Optional[float] = None,
+        ms_per_token: Optional[float] = None,
+        error_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize provider.
+
+        Args:
+            chat_mode: "extractive" or "canned" (default: LOCAL_CHAT_MODE or extractive)
+            canned_answer: Answer returned in canned mode (default: LOCAL_CANNED_ANSWER)
+            embed_latency_ms: Delay per embedding request (default: LOCAL_EMBED_LATENCY_MS or 0)
+            chat_latency_ms: Delay per completion before the first token (default: LOCAL_CHAT_LATENCY_MS or 0)
+            ms_per_token: Extra delay per completion token (default: LOCAL_MS_PER_TOKEN or 0)
+            error_rate: Probability that a call fails (default: LOCAL_ERROR_RATE or 0)
+            seed: Seed for error injection (default: LOCAL_SEED or 0)
+        """
+        self.chat_mode = (chat_mode or os.getenv("LOCAL_CHAT_MODE", "extractive")).lower()
+        if self.chat_mode not in ("extractive", "canned"):
+            raise ValueError(f"LOCAL_CHAT_MODE must be extractive or canned, got {self.chat_mode!r}")
+        self.canned_answer = canned_answer or os.getenv(
+            "LOCAL_CANNED_ANSWER",
+            "This is a canned answer from the local model provider."
+        )
+        self.embed_latency_ms = (embed_latency_ms if embed_latency_ms is not None
+                                 else float(os.getenv("LOCAL_EMBED_LATENCY_MS", "0")))
+        self.chat_latency_ms = (chat_latency_ms if chat_latency_ms is not None
+                                else float(os.getenv("LOCAL_CHAT_LATENCY_MS", "0")))
+        self.ms_per_token = ms_per_token if ms_per_token is not None else float(os.getenv("LOCAL_MS_PER_TOKEN", "0"))
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("LOCAL_ERROR_RATE", "0"))
+
+        self._random = random.Random(seed if seed is not None else int(os.getenv("LOCAL_SEED", "0")))
+        self._random_lock = threading.Lock()
+
+    def _maybe_fail(self, operation: str):
+        """Raise an injected error with probability error_rate."""
+        if self.error_rate <= 0:
+            return
+        with self._random_lock:
+            draw = self._random.random()
+        if draw < self.error_rate:
+            raise ProviderError(f"Injected {operation} failure (LOCAL_ERROR_RATE={self.error_rate})")
+
+    def embed(self, texts: List[str], model: str, dimensions: Optional[int] = None) -> List[List[float]]:
+        dimension = dimensions or EMBEDDING_SIZES.get(model, 1536)
+        if self.embed_latency_ms:
+            time.sleep(self.embed_latency_ms / 1000)
+        self._maybe_fail("embedding")
+        return [hashed_embedding(text, dimension).tolist() for text in texts]
+
+    def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.1,
+        max_tokens: int = 1000
+    ) -> Dict[str, Any]:
+        if self.chat_latency_ms:
+            time.sleep(self.chat_latency_ms / 1000)
+        self._maybe_fail("chat completion")
+
+        prompt = messages[-1]["content"] if messages else ""
+        content = self.extract_answer(prompt) if self.chat_mode == "extractive" else self.canned_answer
+
+        # Rough count at 4 characters per token, the same estimate as the token counter fallback
+        completion_tokens = max(1, len(content) // 4)
+        finish_reason = "stop"
+        if completion_tokens > max_tokens:
+            content = content[:max_tokens * 4]
+            completion_tokens = max_tokens
+            finish_reason = "length"
+        if self.ms_per_token:
+            time.sleep(completion_tokens * self.ms_per_token / 1000)
+
+        prompt_tokens = sum(len(message["content"]) for message in messages) // 4
+        return {
+            "content": content,
+            "finish_reason": finish_reason,
+            "usage": {
+                "prompt": prompt_tokens,
+                "completion": completion_tokens,
+                "total": prompt_tokens + completion_tokens
+            }
+        }
+
+    def extract_answer(self, prompt: str, max_sentences: int = 3) -> str:
+        """
+        Answer from the prompt's context with the sentences closest to the question.
+
+        Args:
+            prompt: User prompt, laid out by AnswerGenerator.build_user_prompt
+            max_sentences: Sentences to quote
+
+        Returns:
+            Answer text
+        """
+        # Imported here because generator imports this module
+        from generator import QUESTION_LABEL, CONTEXT_HEADER, INSTRUCTIONS_HEADER
+
+        question, _, context = prompt.partition(CONTEXT_HEADER)
+        question = question.replace(QUESTION_LABEL, "", 1).strip()
+        # Drop the instructions after the context
+        context = context.split(INSTRUCTIONS_HEADER, 1)[0]
+
+        sentences = []
+        for line in context.splitlines():
+            line = line.strip()
+            if not line or line == "---" or line.startswith("[Source"):
+                continue
+            sentences.extend(sentence.strip() for sentence in SENTENCE_END.split(line) if sentence.strip())
+
+        if not sentences:
+            return "The provided context does not contain information on this question."
+
+        question_words = set(WORD.findall(question.lower()))
+        scored = [
+            (len(question_words & set(WORD.findall(sentence.lower()))), -i, sentence)
+            for i, sentence in enumerate(sentences)
+        ]
+        best = sorted(scored, reverse=True)[:max_sentences]
+        # Quote in document order
+        quoted = [sentence for _, _, sentence in sorted(best, key=lambda item: -item[1])]
+        return "**Answer**\n\n" + "\n".join(f"- {sentence}" for sentence in quoted)
+
+_providers: Dict[str, ModelProvider] = {}
+_providers_lock = threading.Lock()
+
+def get_provider(name: Optional[str] = None) -> ModelProvider:
+    """
+    Return the shared provider instance.
+
+    Args:
+        name: "openai" or "local" (default: MODEL_PROVIDER)
+
+    Returns:
+        ModelProvider instance
+
+    Raises:
+        ValueError: If the provider is unknown or not configured
+    """
+    # Read at call time: callers load .env.backend after importing this module
+    name = (name or os.getenv("MODEL_PROVIDER", "openai")).lower()
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            if name == "openai":
+                provider = OpenAIProvider()
+            elif name == "local":
+                provider = LocalProvider()
+                logger.warning("Using the local model provider: embeddings and answers are simulated")
+            else:
+                raise ValueError(f"Unknown MODEL_PROVIDER {name!r} (expected openai or local)")
+            _providers[name] = provider
+        return provider
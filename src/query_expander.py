@@ -0,0 +1,253 @@
+"""
+Query expansion for Nigerian Tax Reform Acts RAG system.
+Expands acronyms, legacy institution names and synonyms before retrieval.
+"""
+
+import re
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+ALIASES_FILE = DATA_DIR / "query_aliases.json"
+PROCESSED_DIR = DATA_DIR / "processed"
+
+# Words that may appear inside a proper name without starting with a capital
+NAME_CONNECTORS = {"of", "and", "for", "the", "in", "on"}
+
+# "term" means the Proper Name ...
+DEFINITION_PATTERN = re.compile(
+    r'["“”]([^"“”]+)["“”]\s+(?:means|refers to)\s+(?:the\s+|a\s+|an\s+)?([^;.\n]+)',
+    re.IGNORECASE
+)
+
+def _leading_proper_name(phrase: str) -> str:
+    """
+    Return the leading run of capitalised words in a phrase.
+
+    Args:
+        phrase: Text following "means" in a definition
+
+    Returns:
+        Proper name (empty string if the phrase does not start with one)
+    """
+    words = []
+    for word in phrase.split():
+        word = word.strip(",()")
+        if word[:1].isupper():
+            words.append(word)
+        elif word.lower() in NAME_CONNECTORS and words:
+            words.append(word)
+        else:
+            break
+
+    # Drop trailing connectors ("Nigeria Revenue Service of")
+    while words and words[-1].lower() in NAME_CONNECTORS:
+        words.pop()
+
+    return " ".join(words)
+
+def _initials(name: str) -> str:
+    """Return the initials of the capitalised words in a name."""
+    return "".join(word[0] for word in name.split() if word[:1].isupper()).upper()
+
+def mine_definition_aliases(definitions: Iterable[Dict[str, str]]) -> List[List[str]]:
+    """
+    Mine alias groups from parser definitions.
+
+    A definition produces an alias group when it maps an acronym or a
+    multi-word term to a proper name, e.g. '"NRS" means the Nigeria Revenue
+    Service established under ...'.
+
+    Args:
+        definitions: Definition dictionaries from TaxActParser.extract_definitions
+
+    Returns:
+        List of alias groups
+    """
+    groups = []
+
+    for definition in definitions:
+        for match in DEFINITION_PATTERN.finditer(definition.get("context", "")):
+            term = match.group(1).strip()
+            name = _leading_proper_name(match.group(2))
+
+            if len(name.split()) < 2 or term.lower() == name.lower():
+                continue
+
+            is_acronym = term.isupper() and term.isalpha() and _initials(name) == term
+            if is_acronym or len(term.split()) > 1:
+                groups.append([name, term])
+
+    return groups
+
+def load_parsed_definitions(processed_dir: Path = PROCESSED_DIR) -> List[Dict[str, str]]:
+    """
+    Load definitions from all parsed documents.
+
+    Args:
+        processed_dir: Directory containing *_parsed.json files
+
+    Returns:
+        List of definition dictionaries
+    """
+    definitions = []
+
+    for parsed_file in sorted(processed_dir.glob("*_parsed.json")):
+        try:
+            with open(parsed_file, 'r', encoding='utf-8') as f:
+                definitions.extend(json.load(f).get("definitions", []))
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read definitions from %s: %s", parsed_file.name, e)
+
+    return definitions
+
+def load_alias_groups(aliases_file: Path = ALIASES_FILE) -> List[List[str]]:
+    """
+    Load the curated alias groups.
+
+    Args:
+        aliases_file: Curated alias JSON file
+
+    Returns:
+        List of alias groups (canonical name first)
+    """
+    if not aliases_file.exists():
+        logger.warning("Alias file not found at %s", aliases_file)
+        return []
+
+    with open(aliases_file, 'r', encoding='utf-8') as f:
+        return [[group["canonical"]] + group.get("aliases", []) for group in json.load(f).get("groups", [])]
+
+class QueryExpander:
+    """Expands acronyms and alternative names in queries with a compiled matcher."""
+
+    def __init__(
+        self,
+        alias_groups: List[List[str]],
+        cache_size: int = 1024
+    ):
+        """
+        Initialize expander and compile the matcher.
+
+        Args:
+            alias_groups: Groups of interchangeable names (first entry is canonical)
+            cache_size: Number of memoized query expansions
+        """
+        self.groups: List[List[str]] = []
+        self.alias_to_group: Dict[str, int] = {}
+
+        for group in alias_groups:
+            self._add_group(group)
+
+        # Longest aliases first so "companies income tax" wins over shorter overlapping names
+        aliases = sorted(self.alias_to_group, key=len, reverse=True)
+        self.pattern: Optional[re.Pattern] = None
+        if aliases:
+            self.pattern = re.compile(
+                r'(?<![\w-])(?:' + "|".join(re.escape(alias) for alias in aliases) + r')(?![\w-])',
+                re.IGNORECASE
+            )
+
+        self.expand = lru_cache(maxsize=cache_size)(self._expand)
+
+    def _add_group(self, group: List[str]):
+        """Add an alias group, merging it with any group that shares a name."""
+        names = [name.strip() for name in group if name and name.strip()]
+        existing = {self.alias_to_group[name.lower()] for name in names if name.lower() in self.alias_to_group}
+
+        if existing:
+            group_id = min(existing)
+            for other_id in sorted(existing - {group_id}):
+                for name in self.groups[other_id]:
+                    self._append(group_id, name)
+                self.groups[other_id] = []
+        else:
+            group_id = len(self.groups)
+            self.groups.append([])
+
+        for name in names:
+            self._append(group_id, name)
+
+    def _append(self, group_id: int, name: str):
+        """Add a single name to a group."""
+        if name.lower() not in {existing.lower() for existing in self.groups[group_id]}:
+            self.groups[group_id].append(name)
+        self.alias_to_group[name.lower()] = group_id
+
+    @classmethod
+    def from_files(
+        cls,
+        aliases_file: Path = ALIASES_FILE,
+        processed_dir: Path = PROCESSED_DIR,
+        cache_size: int = 1024
+    ) -> "QueryExpander":
+        """
+        Build an expander from the curated alias file and parsed definitions.
+
+        Args:
+            aliases_file: Curated alias JSON file
+            processed_dir: Directory containing *_parsed.json files
+            cache_size: Number of memoized query expansions
+
+        Returns:
+            QueryExpander instance
+        """
+        groups = load_alias_groups(aliases_file)
+        mined = mine_definition_aliases(load_parsed_definitions(processed_dir))
+        groups.extend(mined)
+
+        expander = cls(groups, cache_size=cache_size)
+        logger.info(
+            "Query expander ready: %d alias groups (%d mined from definitions), %d names",
+            sum(1 for group in expander.groups if group),
+            len(mined),
+            len(expander.alias_to_group)
+        )
+        return expander
+
+    def find_groups(self, query: str) -> Dict[int, List[str]]:
+        """
+        Find the alias groups mentioned in a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Mapping of group index to the names it was mentioned by,
+            in order of first mention
+        """
+        found: Dict[int, List[str]] = {}
+        if not self.pattern:
+            return found
+
+        for match in self.pattern.finditer(query):
+            mention = match.group(0).lower()
+            found.setdefault(self.alias_to_group[mention], []).append(mention)
+        return found
+
+    def _expand(self, query: str) -> str:
+        """
+        Expand a query with the alternative names of every alias it mentions.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Query with missing alternatives appended in parentheses
+        """
+        additions = []
+
+        for group_id, mentions in self.find_groups(query).items():
+            for name in self.groups[group_id]:
+                if name.lower() not in mentions and name not in additions:
+                    additions.append(name)
+
+        if not additions:
+            return query
+
+        return f"{query} ({'; '.join(additions)})"
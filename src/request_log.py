@@ -0,0 +1,212 @@
+"""
+Structured request log for Nigerian Tax Reform Acts RAG system.
+Writes one compact JSON record per API request: a hash of the normalized
+query (never the query itself), query type and shape, per-stage durations,
+embedding cache hits, token counts, chunks retrieved and status. Records
+are queued and written by a background thread in batches, so logging never
+blocks the event loop. scripts/analyze_request_log.py reports on the file.
+"""
+
+import os
+import re
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LOG_ENABLED = os.getenv("REQUEST_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+REQUEST_LOG_PATH = Path(os.getenv(
+    "REQUEST_LOG_PATH",
+    str(Path(__file__).parent.parent / "data" / "logs" / "requests.jsonl")
+))
+
+# The log is rotated to <name>.1 when it grows past this size
+REQUEST_LOG_MAX_BYTES = int(os.getenv("REQUEST_LOG_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Records wait at most this long before being written
+REQUEST_LOG_FLUSH_SECONDS = float(os.getenv("REQUEST_LOG_FLUSH_SECONDS", "1.0"))
+
+# Records beyond this many unwritten ones are dropped (and counted) rather than blocking requests
+QUEUE_SIZE = 10000
+
+PUNCTUATION = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace, so trivially different queries match."""
+    return WHITESPACE.sub(" ", PUNCTUATION.sub(" ", query.lower())).strip()
+
+def query_hash(query: str) -> str:
+    """Short hash of the normalized query."""
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:16]
+
+def length_bucket(words: int) -> str:
+    """Coarse query length: 1-3, 4-7, 8-15 or 16+ words."""
+    for limit, label in ((3, "1-3"), (7, "4-7"), (15, "8-15")):
+        if words <= limit:
+            return label
+    return "16+"
+
+def stage_name(span_name: str) -> str:
+    """Stage label from a span name ("retriever.embed" -> "embed")."""
+    return span_name.rsplit(".", 1)[-1]
+
+def build_record(
+    route: str,
+    status: int,
+    root: Any,
+    query: Optional[str] = None,
+    query_type: Optional[str] = None,
+    chunks: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build a request record from the request's trace.
+
+    Args:
+        route: Route path, e.g. "/chat"
+        status: HTTP status code
+        root: Finished root span of the request (tracing.Span)
+        query: Query text (hashed, not stored)
+        query_type: Query classification, e.g. "tax_related"
+        chunks: Chunks retrieved
+
+    Returns:
+        Record dictionary
+    """
+    # Stages are timed exclusive of their child spans, so they add up to the request's duration;
+    # the root's own time (routing, serialization, waiting for the event loop) is "other"
+    child_ms: Dict[str, float] = {}
+    for span in root.trace.spans:
+        if span.parent_span_id:
+            child_ms[span.parent_span_id] = child_ms.get(span.parent_span_id, 0.0) + span.duration_ms
+
+    stages: Dict[str, float] = {}
+    cache_hits = 0
+    embedded = 0
+    tokens = {"prompt": 0, "completion": 0}
+
+    for span in root.trace.spans:
+        stage = "other" if span is root else stage_name(span.name)
+        own_ms = max(0.0, span.duration_ms - child_ms.get(span.span_id, 0.0))
+        stages[stage] = round(stages.get(stage, 0.0) + own_ms, 3)
+        if span.name == "retriever.embed":
+            cache_hits += span.attributes.get("cache_hits", 0)
+            embedded += span.attributes.get("embedded", 0)
+        elif span.name == "generator.completion":
+            tokens["prompt"] += span.attributes.get("prompt_tokens", 0)
+            tokens["completion"] += span.attributes.get("completion_tokens", 0)
+
+    record = {
+        "ts": datetime.fromtimestamp(root.start_ns / 1e9).isoformat(timespec="milliseconds"),
+        "request_id": root.trace.request_id,
+        "route": route,
+        "status": status,
+        "duration_ms": round(root.duration_ms, 3),
+        "query_type": query_type,
+        "chunks": chunks,
+        "cache_hits": cache_hits,
+        "embedded": embedded,
+        "stages": stages,
+        "tokens": {**tokens, "total": tokens["prompt"] + tokens["completion"]}
+    }
+    if query is not None:
+        words = len(normalize_query(query).split())
+        record["query_hash"] = query_hash(query)
+        record["query_shape"] = f"{route}:{query_type or 'unknown'}:{length_bucket(words)}w"
+    return record
+
+class RequestLog:
+    """JSONL request log written in batches by a background thread."""
+
+    def __init__(
+        self,
+        path: Path = REQUEST_LOG_PATH,
+        max_bytes: int = REQUEST_LOG_MAX_BYTES,
+        flush_seconds: float = REQUEST_LOG_FLUSH_SECONDS
+    ):
+        """
+        Initialize log and start its writer thread.
+
+        Args:
+            path: Output file
+            max_bytes: Rotate the file to <name>.1 past this size
+            flush_seconds: Longest time a record waits before being written
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.flush_seconds = flush_seconds
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="request-log", daemon=True)
+        self._thread.start()
+
+    def log(self, record: Dict[str, Any]):
+        """Queue a record without blocking; drops it if the writer has fallen far behind."""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        """Writer thread: wait for a record, gather more for up to flush_seconds, append them in one write."""
+        while True:
+            batch: List[Optional[Dict[str, Any]]] = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while batch[-1] is not None and len(batch) < 1000:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            records = [record for record in batch if record is not None]
+            if records:
+                self._write(records)
+            if batch[-1] is None:
+                return
+
+    def _write(self, records: List[Dict[str, Any]]):
+        """Append records, rotating the file when it is full."""
+        lines = "".join(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.max_bytes and self.path.exists() and self.path.stat().st_size > self.max_bytes:
+                os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except OSError as e:
+            logger.warning("Could not write %d request records to %s: %s", len(records), self.path, e)
+
+    def close(self, timeout: float = 5.0):
+        """Write everything still queued and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self.dropped:
+            logger.warning("Request log dropped %d records under load", self.dropped)
+
+_request_log: Optional[RequestLog] = None
+_request_log_lock = threading.Lock()
+
+def get_request_log() -> Optional[RequestLog]:
+    """Return the shared request log (None if REQUEST_LOG_ENABLED is off)."""
+    global _request_log
+    if not REQUEST_LOG_ENABLED:
+        return None
+    with _request_log_lock:
+        if _request_log is None:
+            _request_log = RequestLog()
+        return _request_log
@@ -5,12 +5,19 @@ Handles vector similarity search and context retrieval.
 
 import os
 import json
+import time
+import heapq
+import itertools
+import logging
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
 
 try:
-    from openai import OpenAI
     import faiss
     import chromadb
 except ImportError as e:
@@ -18,12 +25,195 @@ except ImportError as e:
 
 from dotenv import load_dotenv
 
+from query_expander import QueryExpander
+from chunk_store import ChunkStore
+from index_versions import IndexIntegrityError, current_version, verify_version, chunk_hashes_digest
+from token_counter import get_token_counter
+from providers import get_provider
+from tracing import span
+
 # Load environment variables
 load_dotenv(Path(__file__).parent.parent / ".env.backend")
 
 EMBEDDINGS_DIR = Path(__file__).parent.parent / "data" / "embeddings"
 PROCESSED_DIR = Path(__file__).parent.parent / "data" / "processed"
 
+logger = logging.getLogger(__name__)
+
+# Compliance knowledge base collection written by 04_embed_and_index.py
+KB_COLLECTION_NAME = "compliance_kb"
+KB_DOCUMENT_NAME = "Compliance Knowledge Base"
+
+def maximal_marginal_relevance(
+    query_embedding: np.ndarray,
+    embeddings: np.ndarray,
+    k: int,
+    lambda_mult: float = 0.5
+) -> List[int]:
+    """
+    Select a diverse subset of candidates with maximal marginal relevance.
+
+    Each step picks the candidate maximising
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max(sim(c, selected))``
+    using cosine similarity.
+
+    Args:
+        query_embedding: Query vector
+        embeddings: Candidate vectors (one row per candidate)
+        k: Number of candidates to select
+        lambda_mult: Trade-off between relevance (1.0) and diversity (0.0)
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if k <= 0 or len(embeddings) == 0:
+        return []
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    embeddings = embeddings / norms
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query = query / (np.linalg.norm(query) or 1.0)
+
+    relevance = embeddings @ query
+    selected = [int(np.argmax(relevance))]
+    max_similarity = embeddings @ embeddings[selected[0]]
+
+    while len(selected) < min(k, len(embeddings)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        idx = int(np.argmax(scores))
+        selected.append(idx)
+        max_similarity = np.maximum(max_similarity, embeddings @ embeddings[idx])
+
+    return selected
+
+# Cosine similarity from each supported distance, for unit-length vectors
+DISTANCE_SCORES = {
+    # Squared L2 (FAISS IndexFlatL2, ChromaDB "l2"): d = 2 - 2 cos
+    "l2": lambda distance: 1.0 - distance / 2.0,
+    # ChromaDB "cosine", and "ip" which returns 1 - dot: d = 1 - cos
+    "cosine": lambda distance: 1.0 - distance,
+    # FAISS inner product indices return the similarity itself
+    "inner_product": lambda distance: distance
+}
+
+CHROMA_SPACES = {"l2": "l2", "cosine": "cosine", "ip": "cosine"}
+
+# Stored vectors checked for unit length before scores of two collections are compared
+UNIT_CHECK_ROWS = 16
+UNIT_TOLERANCE = 1e-3
+
+def cosine_score(distance: float, metric: str = "l2") -> float:
+    """
+    Cosine similarity from a distance between unit vectors.
+
+    Args:
+        distance: Distance returned by the index
+        metric: Index metric (a DISTANCE_SCORES key)
+
+    Returns:
+        Score in [-1, 1], higher is more similar
+    """
+    return DISTANCE_SCORES[metric](distance)
+
+def faiss_metric(index: Any) -> str:
+    """
+    Distance metric of a FAISS index.
+
+    Raises:
+        IndexIntegrityError: If the metric has no cosine equivalent
+    """
+    if index.metric_type == faiss.METRIC_L2:
+        return "l2"
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        return "inner_product"
+    raise IndexIntegrityError(f"FAISS index metric {index.metric_type} is not supported")
+
+def chroma_metric(collection: Any) -> str:
+    """
+    Distance metric of a ChromaDB collection (its hnsw:space, "l2" by default).
+
+    Raises:
+        IndexIntegrityError: If the space has no cosine equivalent
+    """
+    space = (collection.metadata or {}).get("hnsw:space", "l2")
+    if space not in CHROMA_SPACES:
+        raise IndexIntegrityError(f"ChromaDB collection {collection.name} uses unsupported space {space!r}")
+    return CHROMA_SPACES[space]
+
+def check_unit_length(name: str, vectors: np.ndarray):
+    """
+    Refuse stored vectors that are not unit length.
+
+    Cosine scores from different collections are only comparable when
+    the indexed vectors are normalized. The query vector need not be: its
+    norm shifts every distance to it alike.
+
+    Raises:
+        IndexIntegrityError: If a vector's norm is off by more than UNIT_TOLERANCE
+    """
+    norms = np.linalg.norm(np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1), axis=1)
+    if len(norms) and np.abs(norms - 1.0).max() > UNIT_TOLERANCE:
+        raise IndexIntegrityError(
+            f"{name} vectors are not unit length (norms {norms.min():.3f}-{norms.max():.3f}), "
+            "so its scores cannot be merged with another collection's"
+        )
+
+def merge_by_score(
+    scored_lists: List[Tuple[List[Dict[str, Any]], str]],
+    limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Merge results from several collections by normalized score.
+
+    Each list keeps its own order (so MMR order survives), and at every
+    step the list whose next result scores higher goes first; ties favour
+    the earlier list.
+
+    Args:
+        scored_lists: (results, metric) of each collection, results best first
+        limit: Keep at most this many merged results (default: all)
+
+    Returns:
+        Merged results, each with a "score"
+    """
+    scored = [
+        [{**result, "score": cosine_score(result.get("distance", 0.0), metric)} for result in results]
+        for results, metric in scored_lists
+    ]
+    return list(itertools.islice(heapq.merge(*scored, key=lambda result: result["score"], reverse=True), limit))
+
+def chroma_where(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Translate metadata filters into a ChromaDB where clause.
+
+    A list value matches any of its items, a dict value is passed through as
+    an operator expression (e.g. {"$gte": 10}), and several fields are
+    combined with $and, as ChromaDB requires.
+
+    Args:
+        filters: Mapping of metadata field to required value (None values are ignored)
+
+    Returns:
+        Where clause, or None if there is nothing to filter on
+    """
+    clauses = []
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = {"$in": list(value)}
+        clauses.append({key: value})
+
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
 class TaxActRetriever:
     """Retriever for Nigerian Tax Reform Acts."""
 
@@ -31,79 +221,268 @@ class TaxActRetriever:
         self,
         embedding_model: str = None,
         top_k: int = None,
-        use_chromadb: bool = True
+        use_chromadb: bool = True,
+        use_mmr: bool = None,
+        mmr_lambda: float = None,
+        mmr_fetch_k: int = None,
+        use_query_expansion: bool = None,
+        max_context_tokens: int = None,
+        small_to_big: bool = None,
+        section_max_tokens: int = None,
+        kb_top_k: int = None
     ):
         """
         Initialize retriever.
 
         Args:
-            embedding_model: OpenAI embedding model
+            embedding_model: Embedding model
             top_k: Number of results to return
             use_chromadb: Whether to use ChromaDB (True) or FAISS (False)
+            use_mmr: Re-rank candidates with maximal marginal relevance
+            mmr_lambda: MMR relevance/diversity trade-off (1.0 = pure relevance)
+            mmr_fetch_k: Candidates to fetch before MMR (default: 4 x top_k)
+            use_query_expansion: Expand acronyms and legacy names before search
+            max_context_tokens: Token budget for the formatted context (0 = unlimited)
+            small_to_big: Expand each matched chunk to its parent section
+            section_max_tokens: Token cap for an expanded section window
+            kb_top_k: Compliance knowledge base entries that may take a place in the top_k (0 = Acts only)
         """
         self.embedding_model = embedding_model or os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
         self.top_k = top_k or int(os.getenv("TOP_K_RESULTS", "5"))
         self.use_chromadb = use_chromadb
 
-        # Initialize OpenAI client
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not set in environment")
-        self.client = OpenAI(api_key=api_key)
+        # MMR diversity re-ranking
+        if use_mmr is None:
+            use_mmr = os.getenv("USE_MMR", "false").lower() in ("1", "true", "yes")
+        self.use_mmr = use_mmr
+        self.mmr_lambda = mmr_lambda if mmr_lambda is not None else float(os.getenv("MMR_LAMBDA", "0.5"))
+        self.mmr_fetch_k = mmr_fetch_k or int(os.getenv("MMR_FETCH_K", "0")) or None
+
+        # Context budget, counted with the tokenizer the chunks were sized with
+        if max_context_tokens is None:
+            max_context_tokens = int(os.getenv("MAX_CONTEXT_TOKENS", "6000"))
+        self.max_context_tokens = max_context_tokens
+        self.token_counter = get_token_counter(self.embedding_model)
+
+        # Small-to-big: search chunks, return their section (or a window of it)
+        if small_to_big is None:
+            small_to_big = os.getenv("SMALL_TO_BIG", "false").lower() in ("1", "true", "yes")
+        self.small_to_big = small_to_big
+        if section_max_tokens is None:
+            section_max_tokens = int(os.getenv("SECTION_MAX_TOKENS", "1000"))
+        self.section_max_tokens = section_max_tokens
+        self.sections: Optional[Dict[str, Dict[str, Any]]] = None
+
+        # Compliance knowledge base, searched next to the Acts
+        self.kb_top_k = kb_top_k if kb_top_k is not None else int(os.getenv("KB_TOP_K", "2"))
 
-        # Load indices and metadata
+        # Query embedding cache (repeated queries and MMR reuse the same vector)
+        self.query_cache_size = int(os.getenv("QUERY_CACHE_SIZE", "256"))
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
+        # Query expansion (compiled once, expansions memoized)
+        if use_query_expansion is None:
+            use_query_expansion = os.getenv("QUERY_EXPANSION", "true").lower() in ("1", "true", "yes")
+        self.query_expander = QueryExpander.from_files() if use_query_expansion else None
+
+        # Embedding provider (MODEL_PROVIDER: openai or local)
+        self.provider = get_provider()
+        self.embedding_dimensions: Optional[int] = None
+
+        # Load the published index version, refusing artifacts that disagree with its manifest
+        self.verify_checksums = os.getenv("INDEX_VERIFY_CHECKSUMS", "false").lower() in ("1", "true", "yes")
+        self._resolve_index()
         self._load_index()
         self._load_chunks()
-        self._load_metadata()
+        self._check_alignment()
+        self._load_kb()
+
+    def _resolve_index(self):
+        """Find the published index version and check its artifacts against the manifest."""
+        version_dir = current_version()
+        if version_dir is None:
+            # Flat layout written before versioned builds: there is no manifest to check
+            logger.warning("No published index version, loading unversioned artifacts from %s", EMBEDDINGS_DIR)
+            self.index_dir = EMBEDDINGS_DIR
+            self.manifest = None
+            return
+
+        self.index_dir = version_dir
+        self.manifest = verify_version(version_dir, checksums=self.verify_checksums)
+        if self.manifest["model"] != self.embedding_model:
+            raise IndexIntegrityError(
+                f"Index version {version_dir.name} was built with {self.manifest['model']}, "
+                f"but queries are embedded with {self.embedding_model}"
+            )
+        # Queries must be embedded at the size the chunks were
+        self.embedding_dimensions = self.manifest["params"].get("requested_dimensions") or None
+        built_with = self.manifest["params"].get("provider", "openai")
+        if built_with != self.provider.name:
+            logger.warning(
+                "Index version %s was embedded by the %s provider but queries use %s; results will be meaningless",
+                version_dir.name, built_with, self.provider.name
+            )
+        counted_with = self.manifest["params"].get("tokenizer")
+        if counted_with and counted_with != self.token_counter.name:
+            logger.warning(
+                "Index version %s recorded token counts with %s but this retriever counts with %s; "
+                "chunk sizes are recounted when packing context",
+                version_dir.name, counted_with, self.token_counter.name
+            )
 
     def _load_index(self):
         """Load FAISS or ChromaDB index."""
         if self.use_chromadb:
             # Load ChromaDB
-            chroma_path = EMBEDDINGS_DIR / "chromadb"
+            chroma_path = self.index_dir / "chromadb"
             if not chroma_path.exists():
                 raise FileNotFoundError(f"ChromaDB not found at {chroma_path}")
 
             self.chroma_client = chromadb.PersistentClient(path=str(chroma_path))
+            # Queries are embedded by embed_query, so ChromaDB's default embedding function is never used
             self.collection = self.chroma_client.get_collection(name="nigerian_tax_acts")
+            self.metric = chroma_metric(self.collection)
             self.faiss_index = None
             self.embeddings = None
 
         else:
             # Load FAISS
-            faiss_path = EMBEDDINGS_DIR / "faiss_index.bin"
+            faiss_path = self.index_dir / "faiss_index.bin"
             if not faiss_path.exists():
                 raise FileNotFoundError(f"FAISS index not found at {faiss_path}")
 
             self.faiss_index = faiss.read_index(str(faiss_path))
+            self.metric = faiss_metric(self.faiss_index)
 
-            # Load embeddings
-            embeddings_path = EMBEDDINGS_DIR / "embeddings.npy"
-            self.embeddings = np.load(embeddings_path)
+            # Load embeddings (memory-mapped: only MMR reads rows, and workers share the pages)
+            embeddings_path = self.index_dir / "embeddings.npy"
+            self.embeddings = np.load(embeddings_path, mmap_mode="r")
 
             self.chroma_client = None
             self.collection = None
 
     def _load_chunks(self):
-        """Load chunk texts from JSONL."""
+        """Load chunk texts and metadata from JSONL into a columnar store."""
+        if self.manifest is not None:
+            # A version holds exactly the indexed chunks, in index order
+            chunks_file = self.index_dir / "chunks.jsonl"
+            self.chunks = ChunkStore.from_jsonl(chunks_file)
+            return
+
         chunks_file = PROCESSED_DIR / "chunks.jsonl"
         if not chunks_file.exists():
             raise FileNotFoundError(f"Chunks file not found at {chunks_file}")
 
-        self.chunks = []
-        with open(chunks_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip():
-                    self.chunks.append(json.loads(line))
-
-    def _load_metadata(self):
-        """Load chunk metadata."""
-        metadata_path = EMBEDDINGS_DIR / "chunk_metadata.json"
-        if metadata_path.exists():
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                self.chunk_metadata = json.load(f)
+        # Near-duplicates are not indexed; skipping them keeps positions aligned with FAISS
+        self.chunks = ChunkStore.from_jsonl(chunks_file, keep=lambda chunk: not chunk.get("duplicate_of"))
+
+    def _check_alignment(self):
+        """
+        Refuse an index whose vectors do not line up with the loaded chunks.
+
+        Search maps FAISS positions straight to chunk rows, so a count or
+        order mismatch would silently return the wrong text.
+
+        Raises:
+            IndexIntegrityError: If the index and chunks disagree
+        """
+        if self.use_chromadb:
+            if self.manifest is not None and self.collection.count() != self.manifest["chunk_count"]:
+                raise IndexIntegrityError(
+                    f"ChromaDB collection has {self.collection.count()} documents, "
+                    f"manifest says {self.manifest['chunk_count']}"
+                )
+            return
+
+        if self.faiss_index.ntotal != len(self.chunks) or len(self.embeddings) != len(self.chunks):
+            raise IndexIntegrityError(
+                f"FAISS index has {self.faiss_index.ntotal} vectors and embeddings.npy {len(self.embeddings)} rows, "
+                f"but {len(self.chunks)} chunks were loaded from {self.index_dir if self.manifest else PROCESSED_DIR}"
+            )
+        if self.manifest is None:
+            return
+
+        if self.faiss_index.d != self.manifest["dimension"]:
+            raise IndexIntegrityError(
+                f"FAISS index has dimension {self.faiss_index.d}, manifest says {self.manifest['dimension']}"
+            )
+        if len(self.chunks) != self.manifest["chunk_count"]:
+            raise IndexIntegrityError(
+                f"Loaded {len(self.chunks)} chunks, manifest says {self.manifest['chunk_count']}"
+            )
+        hashes = (self.chunks.get(row, "hash", "") for row in range(len(self.chunks)))
+        if chunk_hashes_digest(hashes) != self.manifest["chunk_hashes_sha256"]:
+            raise IndexIntegrityError(f"Chunks in {self.index_dir} are not the ones the index was built from")
+
+    def _load_kb(self):
+        """
+        Load the compliance knowledge base collection, if the index version has one.
+
+        Raises:
+            IndexIntegrityError: If the collection and its entries disagree
+        """
+        self.kb_documents: List[Dict[str, Any]] = []
+        self.kb_index = None
+        self.kb_collection = None
+        self._kb_rows: Dict[str, int] = {}
+        self._search_pool: Optional[ThreadPoolExecutor] = None
+        if not self.kb_top_k:
+            return
+        if self.manifest is None or "kb_entries.jsonl" not in self.manifest["files"]:
+            logger.info("Index has no compliance knowledge base, searching the Acts only")
+            return
+
+        with open(self.index_dir / "kb_entries.jsonl", 'r', encoding='utf-8') as f:
+            self.kb_documents = [json.loads(line) for line in f if line.strip()]
+        self._kb_rows = {document["kb_id"]: row for row, document in enumerate(self.kb_documents)}
+
+        if self.use_chromadb:
+            self.kb_collection = self.chroma_client.get_collection(name=KB_COLLECTION_NAME)
+            self.kb_metric = chroma_metric(self.kb_collection)
+            indexed = self.kb_collection.count()
         else:
-            self.chunk_metadata = []
+            self.kb_index = faiss.read_index(str(self.index_dir / "kb_faiss_index.bin"))
+            self.kb_metric = faiss_metric(self.kb_index)
+            indexed = self.kb_index.ntotal
+
+        expected = self.manifest["params"].get("kb_entries", len(self.kb_documents))
+        if not indexed == len(self.kb_documents) == expected:
+            raise IndexIntegrityError(
+                f"Knowledge base collection has {indexed} vectors and {len(self.kb_documents)} entries, "
+                f"manifest says {expected}"
+            )
+
+        # Results of both collections are merged by cosine score
+        check_unit_length("Acts index", self._stored_vectors(self.collection, self.faiss_index))
+        check_unit_length("Knowledge base", self._stored_vectors(self.kb_collection, self.kb_index))
+
+        # One worker: the knowledge base is searched while the calling thread searches the Acts
+        self._search_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-search")
+        logger.info("Compliance knowledge base: %d entries (top %d merged per query)",
+                    len(self.kb_documents), self.kb_top_k)
+
+    def _stored_vectors(self, collection: Any, index: Any) -> np.ndarray:
+        """The first few vectors of a ChromaDB collection or FAISS index."""
+        if collection is not None:
+            return np.asarray(collection.get(limit=UNIT_CHECK_ROWS, include=["embeddings"])["embeddings"])
+        return index.reconstruct_n(0, min(UNIT_CHECK_ROWS, index.ntotal))
+
+    def _load_sections(self) -> Dict[str, Dict[str, Any]]:
+        """Load section records from JSONL on first use, keyed by section_id."""
+        if self.sections is None:
+            sections = {}
+            sections_file = (self.index_dir if self.manifest is not None else PROCESSED_DIR) / "sections.jsonl"
+            if sections_file.exists():
+                with open(sections_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            section = json.loads(line)
+                            sections[section["section_id"]] = section
+            else:
+                logger.warning("Sections not found at %s, results will not be expanded", sections_file)
+            self.sections = sections
+        return self.sections
 
     def embed_query(self, query: str) -> np.ndarray:
         """
@@ -115,16 +494,53 @@ class TaxActRetriever:
         Returns:
             Embedding vector
         """
-        response = self.client.embeddings.create(
-            model=self.embedding_model,
-            input=query
-        )
-        return np.array(response.data[0].embedding)
+        return self.embed_queries([query])[0]
+
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """
+        Create embeddings for several queries with at most one API request.
+
+        Cached queries are served from the cache; the rest are embedded
+        together.
+
+        Args:
+            queries: Query texts
+
+        Returns:
+            Embedding vectors, in query order
+        """
+        with span("retriever.embed", queries=len(queries), model=self.embedding_model) as embed_span:
+            embeddings: Dict[str, np.ndarray] = {}
+            with self._query_cache_lock:
+                for query in queries:
+                    if query in self._query_cache:
+                        self._query_cache.move_to_end(query)
+                        embeddings[query] = self._query_cache[query]
+
+            missing = list(dict.fromkeys(query for query in queries if query not in embeddings))
+            embed_span.set_attributes(cache_hits=len(queries) - len(missing), embedded=len(missing))
+            if missing:
+                created = [
+                    np.array(embedding)
+                    for embedding in self.provider.embed(missing, self.embedding_model, self.embedding_dimensions)
+                ]
+
+                with self._query_cache_lock:
+                    for query, embedding in zip(missing, created):
+                        embeddings[query] = embedding
+                        self._query_cache[query] = embedding
+                    while len(self._query_cache) > self.query_cache_size:
+                        self._query_cache.popitem(last=False)
+
+            return [embeddings[query] for query in queries]
 
     def search_chromadb(
         self,
         query: str,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        n_results: Optional[int] = None,
+        include_embeddings: bool = False,
+        query_embedding: Optional[np.ndarray] = None
     ) -> List[Dict[str, Any]]:
         """
         Search using ChromaDB.
@@ -132,68 +548,239 @@ class TaxActRetriever:
         Args:
             query: Query text
             filters: Optional metadata filters
+            n_results: Number of results (default: top_k)
+            include_embeddings: Attach stored vectors as "embedding"
+            query_embedding: Vector of the query, if already embedded
 
         Returns:
             List of results
         """
-        # Build where clause from filters
-        where = None
-        if filters:
-            where = {}
-            for key, value in filters.items():
-                if value is not None:
-                    where[key] = value
+        query_embeddings = [query_embedding] if query_embedding is not None else None
+        return self.search_chromadb_batch([query], filters, n_results, include_embeddings, query_embeddings)[0]
+
+    def search_chromadb_batch(
+        self,
+        queries: List[str],
+        filters: Optional[Dict[str, Any]] = None,
+        n_results: Optional[int] = None,
+        include_embeddings: bool = False,
+        query_embeddings: Optional[List[np.ndarray]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search several queries in one ChromaDB call.
+
+        Queries are embedded with the same model and cache as the FAISS
+        path, since the collection holds OpenAI vectors rather than vectors
+        from ChromaDB's default embedding function.
+
+        Args:
+            queries: Query texts
+            filters: Optional metadata filters, applied inside ChromaDB
+            n_results: Number of results per query (default: top_k)
+            include_embeddings: Attach stored vectors as "embedding"
+            query_embeddings: Vectors of the queries, if already embedded
+
+        Returns:
+            List of results for each query
+        """
+        if not queries:
+            return []
+
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
 
         # Query ChromaDB
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=self.top_k,
-            where=where if where else None
-        )
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        with span("retriever.search", backend="chromadb", queries=len(queries), k=n_results or self.top_k,
+                  filtered=bool(filters)):
+            results = self.collection.query(
+                query_embeddings=[np.asarray(embedding).tolist() for embedding in query_embeddings],
+                n_results=n_results or self.top_k,
+                where=chroma_where(filters),
+                include=include
+            )
 
         # Format results
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            for i in range(len(results['documents'][0])):
+        batch_results = []
+        for q in range(len(queries)):
+            formatted_results = []
+            documents = results['documents'][q] if results['documents'] else []
+            for i in range(len(documents)):
                 result = {
-                    "text": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i] if results['metadatas'] else {},
-                    "distance": results['distances'][0][i] if results['distances'] else 0.0,
-                    "id": results['ids'][0][i]
+                    "text": documents[i],
+                    "metadata": results['metadatas'][q][i] if results['metadatas'] else {},
+                    "distance": results['distances'][q][i] if results['distances'] else 0.0,
+                    "id": results['ids'][q][i]
                 }
+                if include_embeddings:
+                    result["embedding"] = np.asarray(results['embeddings'][q][i])
                 formatted_results.append(result)
+            batch_results.append(formatted_results)
 
-        return formatted_results
+        return batch_results
 
-    def search_faiss(self, query: str) -> List[Dict[str, Any]]:
+    def search_faiss(
+        self,
+        query: str,
+        n_results: Optional[int] = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search using FAISS.
 
         Args:
             query: Query text
+            n_results: Number of results (default: top_k)
+            query_embedding: Vector of the query, if already embedded
 
         Returns:
             List of results
         """
-        # Embed query
-        query_embedding = self.embed_query(query).astype('float32').reshape(1, -1)
+        query_embeddings = [query_embedding] if query_embedding is not None else None
+        return self.search_faiss_batch([query], n_results, query_embeddings)[0]
+
+    def search_faiss_batch(
+        self,
+        queries: List[str],
+        n_results: Optional[int] = None,
+        query_embeddings: Optional[List[np.ndarray]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search several queries in one FAISS call.
+
+        Args:
+            queries: Query texts
+            n_results: Number of results per query (default: top_k)
+            query_embeddings: Vectors of the queries, if already embedded
+
+        Returns:
+            List of results for each query
+        """
+        if not queries:
+            return []
+
+        # Embed queries
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        vectors = np.array(query_embeddings, dtype='float32').reshape(len(queries), -1)
 
         # Search FAISS index
-        distances, indices = self.faiss_index.search(query_embedding, self.top_k)
+        with span("retriever.search", backend="faiss", queries=len(queries), k=n_results or self.top_k):
+            distances, indices = self.faiss_index.search(vectors, n_results or self.top_k)
 
         # Format results
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.chunks):
-                result = {
-                    "text": self.chunks[idx]["text"],
-                    "metadata": self.chunks[idx],
-                    "distance": float(distances[0][i]),
-                    "chunk_id": int(idx)
-                }
-                results.append(result)
+        batch_results = []
+        for q in range(len(queries)):
+            results = []
+            for i, idx in enumerate(indices[q]):
+                if 0 <= idx < len(self.chunks):
+                    result = {
+                        "text": self.chunks.text(idx),
+                        "metadata": self.chunks.view(idx),
+                        "distance": float(distances[q][i]),
+                        "chunk_id": int(idx)
+                    }
+                    results.append(result)
+            batch_results.append(results)
+
+        return batch_results
+
+    def kb_result(self, row: int, distance: float) -> Dict[str, Any]:
+        """
+        Format a knowledge base entry as a retrieval result.
+
+        Args:
+            row: Entry position in kb_documents
+            distance: Distance to the query (in the knowledge base index's metric)
+
+        Returns:
+            Result whose text is the entry's question, answer, key points and checklist
+        """
+        document = self.kb_documents[row]
+        return {
+            "text": document["context"],
+            "metadata": {
+                "collection": KB_COLLECTION_NAME,
+                "document_name": KB_DOCUMENT_NAME,
+                "section_title": document["question"],
+                "section_type": "compliance_guide",
+                "kb_id": document["kb_id"],
+                "topic": document.get("topic", ""),
+                "effective_date": document.get("effective_date", ""),
+                "citations": document.get("citations", []),
+                "token_count": document.get("token_count", 0),
+                "tokenizer": document.get("tokenizer", "")
+            },
+            "distance": distance,
+            "id": document["kb_id"]
+        }
+
+    def search_kb_batch(
+        self,
+        queries: List[str],
+        n_results: Optional[int] = None,
+        query_embeddings: Optional[List[np.ndarray]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search the compliance knowledge base for several queries.
+
+        Args:
+            queries: Query texts (embedded with the same model and cache as the Acts search)
+            n_results: Entries per query (default: kb_top_k)
+            query_embeddings: Vectors of the queries, if already embedded
+
+        Returns:
+            List of knowledge base results for each query (empty lists if there is no knowledge base)
+        """
+        k = min(n_results or self.kb_top_k, len(self.kb_documents))
+        if not queries or k <= 0:
+            return [[] for _ in queries]
 
-        return results
+        if query_embeddings is None:
+            query_embeddings = self.embed_queries(queries)
+        with span("retriever.search_kb", backend="chromadb" if self.kb_collection is not None else "faiss",
+                  queries=len(queries), k=k):
+            if self.kb_collection is not None:
+                results = self.kb_collection.query(
+                    query_embeddings=[embedding.tolist() for embedding in query_embeddings],
+                    n_results=k,
+                    include=["distances"]
+                )
+                hits = [
+                    [(self._kb_rows[kb_id], distance) for kb_id, distance in zip(ids, distances) if kb_id in self._kb_rows]
+                    for ids, distances in zip(results["ids"], results["distances"])
+                ]
+            else:
+                vectors = np.array(query_embeddings, dtype='float32').reshape(len(queries), -1)
+                distances, indices = self.kb_index.search(vectors, k)
+                hits = [
+                    [(int(row), float(distance)) for row, distance in zip(indices[q], distances[q]) if row >= 0]
+                    for q in range(len(queries))
+                ]
+
+        return [[self.kb_result(row, float(distance)) for row, distance in query_hits] for query_hits in hits]
+
+    def _start_kb_search(
+        self,
+        queries: List[str],
+        query_embeddings: List[np.ndarray],
+        filters: Optional[Dict[str, Any]]
+    ):
+        """
+        Start searching the knowledge base in the background, or return None if it does not apply.
+
+        The caller embeds the queries once and searches the Acts with the same
+        vectors. Filters describe Acts metadata, so filtered searches stay on
+        the Acts.
+        """
+        if self._search_pool is None or filters:
+            return None
+        # Run in a copy of this context, so the search span joins the current trace
+        return self._search_pool.submit(
+            contextvars.copy_context().run, self.search_kb_batch, queries, None, query_embeddings
+        )
 
     def retrieve(
         self,
@@ -203,6 +790,11 @@ class TaxActRetriever:
         """
         Retrieve relevant chunks for a query.
 
+        The query is embedded once and the Acts and the compliance knowledge
+        base are searched in parallel. Their results are merged by score and
+        cut to top_k, so knowledge base entries (at most kb_top_k) take the
+        place of weaker Acts results rather than being added on top.
+
         Args:
             query: Query text
             filters: Optional metadata filters (only for ChromaDB)
@@ -210,12 +802,340 @@ class TaxActRetriever:
         Returns:
             List of relevant chunks with metadata
         """
+        with span("retriever.retrieve", backend="chromadb" if self.use_chromadb else "faiss",
+                  mmr=self.use_mmr, small_to_big=self.small_to_big) as retrieve_span:
+            expanded = self.expand_query(query)
+            retrieve_span.set_attribute("query.expanded", expanded != query)
+            query = expanded
+            query_embedding = self.embed_query(query)
+            kb_search = self._start_kb_search([query], [query_embedding], filters)
+
+            if self.use_mmr:
+                results = self.retrieve_mmr(query, filters, query_embedding)
+            elif self.use_chromadb:
+                results = self.search_chromadb(query, filters, query_embedding=query_embedding)
+            else:
+                if filters:
+                    print("Warning: Filters only supported with ChromaDB")
+                results = self.search_faiss(query, query_embedding=query_embedding)
+
+            if self.small_to_big:
+                results = self.expand_to_sections(results)
+
+            if kb_search is not None:
+                kb_results = kb_search.result()[0]
+                retrieve_span.set_attribute("kb_results", len(kb_results))
+                results = merge_by_score([(results, self.metric), (kb_results, self.kb_metric)], self.top_k)
+
+            retrieve_span.set_attribute("results", len(results))
+            return results
+
+    def retrieve_batch(
+        self,
+        queries: List[str],
+        filters: Optional[Dict[str, Any]] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant chunks for several queries at once.
+
+        The queries share one embedding request and one index search per
+        collection; MMR re-ranking, when enabled, is applied per query.
+        Knowledge base results are merged as in retrieve.
+
+        Args:
+            queries: Query texts
+            filters: Optional metadata filters (only for ChromaDB)
+
+        Returns:
+            List of relevant chunks for each query
+        """
+        with span("retriever.retrieve_batch", backend="chromadb" if self.use_chromadb else "faiss",
+                  queries=len(queries), mmr=self.use_mmr, small_to_big=self.small_to_big):
+            queries = [self.expand_query(query) for query in queries]
+            # One request embeds every query, for both collections
+            query_embeddings = self.embed_queries(queries)
+            kb_search = self._start_kb_search(queries, query_embeddings, filters)
+
+            if self.use_mmr:
+                # Each query re-ranks its own candidates
+                batch_results = [
+                    self.retrieve_mmr(query, filters, embedding) for query, embedding in zip(queries, query_embeddings)
+                ]
+            elif self.use_chromadb:
+                batch_results = self.search_chromadb_batch(queries, filters, query_embeddings=query_embeddings)
+            else:
+                if filters:
+                    print("Warning: Filters only supported with ChromaDB")
+                batch_results = self.search_faiss_batch(queries, query_embeddings=query_embeddings)
+
+            if self.small_to_big:
+                batch_results = [self.expand_to_sections(results) for results in batch_results]
+
+            if kb_search is not None:
+                batch_results = [
+                    merge_by_score([(results, self.metric), (kb_results, self.kb_metric)], self.top_k)
+                    for results, kb_results in zip(batch_results, kb_search.result())
+                ]
+
+            return batch_results
+
+    def expand_query(self, query: str) -> str:
+        """
+        Expand acronyms and alternative names in a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Expanded query (unchanged if expansion is disabled)
+        """
+        if not self.query_expander:
+            return query
+
+        expanded = self.query_expander.expand(query)
+        if expanded != query:
+            logger.debug("Expanded query: %r -> %r", query, expanded)
+        return expanded
+
+    def retrieve_mmr(
+        self,
+        query: str,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[np.ndarray] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve an over-fetched candidate set and pick a diverse top_k with MMR.
+
+        Args:
+            query: Query text
+            filters: Optional metadata filters (only for ChromaDB)
+            query_embedding: Vector of the query, if already embedded
+
+        Returns:
+            List of relevant chunks with metadata, in MMR order
+        """
+        fetch_k = max(self.mmr_fetch_k or self.top_k * 4, self.top_k)
+        start = time.perf_counter()
+        if query_embedding is None:
+            query_embedding = self.embed_query(query)
+
         if self.use_chromadb:
-            return self.search_chromadb(query, filters)
+            candidates = self.search_chromadb(query, filters, n_results=fetch_k, include_embeddings=True,
+                                              query_embedding=query_embedding)
+            vectors = [candidate.pop("embedding") for candidate in candidates]
         else:
             if filters:
                 print("Warning: Filters only supported with ChromaDB")
-            return self.search_faiss(query)
+            candidates = self.search_faiss(query, n_results=fetch_k, query_embedding=query_embedding)
+            vectors = self.embeddings[[candidate["chunk_id"] for candidate in candidates]]
+
+        fetched = time.perf_counter()
+
+        with span("retriever.mmr", candidates=len(candidates), k=self.top_k, mmr_lambda=self.mmr_lambda):
+            selected = maximal_marginal_relevance(
+                query_embedding,
+                vectors,
+                self.top_k,
+                self.mmr_lambda
+            )
+
+        logger.info(
+            "MMR: %d candidates -> %d results (lambda=%.2f, fetch %.1f ms, rerank %.1f ms)",
+            len(candidates),
+            len(selected),
+            self.mmr_lambda,
+            (fetched - start) * 1000,
+            (time.perf_counter() - fetched) * 1000
+        )
+
+        return [candidates[i] for i in selected]
+
+    def recorded_token_count(self, record: Dict[str, Any], text: str) -> int:
+        """
+        Token count of a chunk or section, reusing the one recorded at build time.
+
+        A recorded count is only trusted when it was made with this
+        retriever's tokenizer; counts from another tokenizer (or estimated
+        without tiktoken) are recounted.
+
+        Args:
+            record: Chunk metadata or section record with token_count and tokenizer
+            text: Text the count belongs to
+
+        Returns:
+            Number of tokens in text
+        """
+        if record.get("token_count") and record.get("tokenizer") == self.token_counter.name:
+            return record["token_count"]
+        return self.token_counter.count(text)
+
+    def section_window(self, section: Dict[str, Any], start: int, end: int, max_tokens: int) -> Tuple[int, int, int]:
+        """
+        Grow a chunk's span within its section up to a token cap.
+
+        The window takes whole neighbouring chunks, alternating after and
+        before the match, so it always starts and ends on a chunk boundary.
+
+        Args:
+            section: Section record from sections.jsonl
+            start: Character offset of the matched chunk in the section text
+            end: End offset of the matched chunk
+            max_tokens: Token cap for the window
+
+        Returns:
+            Tuple of (start, end, token count) of the window
+        """
+        text = section["text"]
+        section_tokens = self.recorded_token_count(section, text)
+        if section_tokens <= max_tokens:
+            return 0, len(text), section_tokens
+
+        spans = section.get("chunks", [])
+        position = next((i for i, span in enumerate(spans) if span["start"] == start), None)
+        tokens = self.token_counter.count(text[start:end])
+        if position is None:
+            return start, end, tokens
+
+        def fits(low: int, high: int) -> Optional[int]:
+            window_tokens = self.token_counter.count(text[spans[low]["start"]:spans[high]["end"]])
+            return window_tokens if window_tokens <= max_tokens else None
+
+        low = high = position
+        after, before = True, True
+        while after or before:
+            if after:
+                grown = fits(low, high + 1) if high + 1 < len(spans) else None
+                after = grown is not None
+                if after:
+                    high, tokens = high + 1, grown
+            if before:
+                grown = fits(low - 1, high) if low > 0 else None
+                before = grown is not None
+                if before:
+                    low, tokens = low - 1, grown
+
+        return spans[low]["start"], spans[high]["end"], tokens
+
+    def expand_to_sections(
+        self,
+        results: List[Dict[str, Any]],
+        max_tokens: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Replace each matched chunk with its parent section, or the largest
+        window of the section around the chunk that fits the token cap.
+
+        A later hit whose chunk is already inside an earlier hit's window is
+        dropped, so several matches in one section produce one passage.
+
+        Args:
+            results: Retrieval results, best first
+            max_tokens: Token cap per passage (defaults to section_max_tokens)
+
+        Returns:
+            Results whose "text" is the expanded passage; the matched chunk
+            is kept as "chunk_text" and token_count/section_start/section_end
+            describe the passage
+        """
+        with span("retriever.small_to_big", chunks=len(results)) as expand_span:
+            sections = self._load_sections()
+            max_tokens = max_tokens or self.section_max_tokens
+            windows: Dict[str, List[Tuple[int, int]]] = {}
+            expanded = []
+
+            for result in results:
+                metadata = result.get("metadata", {})
+                section = sections.get(metadata.get("section_id", ""))
+                start, end = metadata.get("section_start"), metadata.get("section_end")
+
+                # Keep the chunk as it is if its section is unknown or stale
+                if section is None or start is None or section["text"][start:end] != result["text"]:
+                    expanded.append(result)
+                    continue
+
+                if any(low <= start and end <= high for low, high in windows.get(section["section_id"], [])):
+                    continue
+
+                low, high, tokens = self.section_window(section, start, end, max_tokens)
+                windows.setdefault(section["section_id"], []).append((low, high))
+                expanded.append({
+                    **result,
+                    "text": section["text"][low:high],
+                    "chunk_text": result["text"],
+                    "metadata": {
+                        **metadata,
+                        "token_count": tokens,
+                        "tokenizer": self.token_counter.name,
+                        "section_start": low,
+                        "section_end": high
+                    }
+                })
+
+            expand_span.set_attribute("passages", len(expanded))
+            logger.debug("Small-to-big: %d chunks -> %d passages", len(results), len(expanded))
+            return expanded
+
+    def source_label(self, metadata: Dict[str, Any]) -> str:
+        """
+        Build the source reference shown above a chunk in the context.
+
+        Args:
+            metadata: Result metadata
+
+        Returns:
+            Source reference string
+        """
+        source_parts = []
+        if metadata.get("document_name"):
+            source_parts.append(metadata["document_name"])
+        if metadata.get("section_number"):
+            source_parts.append(f"Section {metadata['section_number']}")
+        if metadata.get("section_title"):
+            source_parts.append(f"({metadata['section_title']})")
+        if metadata.get("page_start"):
+            source_parts.append(f"Page {metadata['page_start']}")
+
+        return " - ".join(source_parts) if source_parts else "Unknown source"
+
+    def fit_context(self, results: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Keep the highest-ranked results whose formatted context fits the token budget.
+
+        The budget is checked against the token count of the context exactly
+        as format_context renders it. A result whose own text already
+        overflows what is left, by its recorded token_count, is skipped
+        without tokenizing the context again.
+
+        Args:
+            results: Retrieval results, best first
+            max_tokens: Token budget (defaults to max_context_tokens; 0 = unlimited)
+
+        Returns:
+            Results to pass to format_context and get_sources
+        """
+        budget = self.max_context_tokens if max_tokens is None else max_tokens
+        if not budget:
+            return results
+
+        kept = []
+        used = 0
+
+        for result in results:
+            if used + self.recorded_token_count(result.get("metadata", {}), result["text"]) > budget:
+                continue
+
+            # Skip a result that does not fit; a shorter one further down may
+            tokens = self.token_counter.count(self.format_context(kept + [result]))
+            if tokens > budget:
+                continue
+
+            kept.append(result)
+            used = tokens
+
+        if len(kept) < len(results):
+            logger.debug("Context budget of %d tokens kept %d of %d results", budget, len(kept), len(results))
+
+        return kept
 
     def format_context(self, results: List[Dict[str, Any]]) -> str:
         """
@@ -230,20 +1150,7 @@ class TaxActRetriever:
         context_parts = []
 
         for i, result in enumerate(results, 1):
-            metadata = result.get("metadata", {})
-
-            # Build source reference
-            source_parts = []
-            if metadata.get("document_name"):
-                source_parts.append(metadata["document_name"])
-            if metadata.get("section_number"):
-                source_parts.append(f"Section {metadata['section_number']}")
-            if metadata.get("section_title"):
-                source_parts.append(f"({metadata['section_title']})")
-            if metadata.get("page_start"):
-                source_parts.append(f"Page {metadata['page_start']}")
-
-            source = " - ".join(source_parts) if source_parts else "Unknown source"
+            source = self.source_label(result.get("metadata", {}))
 
             # Add chunk with source
             context_parts.append(f"[Source {i}] {source}\n{result['text']}")
@@ -273,6 +1180,23 @@ class TaxActRetriever:
                 "type": metadata.get("section_type", "")
             }
 
+            # Knowledge base entries cite their official source
+            citations = metadata.get("citations")
+            if citations:
+                source["url"] = citations[0].get("url", "")
+
+            # Near-identical text found in other documents (a list from chunks.jsonl, a string from ChromaDB)
+            alternates = metadata.get("alternate_sources")
+            if isinstance(alternates, list):
+                alternates = "; ".join(
+                    alternate.get("document_name", "")
+                    + (f" s.{alternate['section_number']}" if alternate.get("section_number") else "")
+                    + (f" p.{alternate['page_start']}" if alternate.get("page_start") else "")
+                    for alternate in alternates
+                )
+            if alternates:
+                source["also_in"] = alternates
+
             sources.append(source)
 
         return sources
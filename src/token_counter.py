@@ -0,0 +1,125 @@
+"""
+Token counting for Nigerian Tax Reform Acts RAG system.
+Uses tiktoken (a required dependency). If it or its encoding is
+unavailable, counts fall back to a characters-per-token estimate, which is
+logged once and recorded wherever counts are stored (see TokenCounter.name).
+"""
+
+import logging
+import threading
+from functools import lru_cache
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Average characters per token for English legal text with cl100k-style encodings
+CHARS_PER_TOKEN = 4
+
+_estimate_warned = False
+_estimate_lock = threading.Lock()
+
+def _warn_estimating(reason: str):
+    """Log once per process that token counts are estimates."""
+    global _estimate_warned
+    with _estimate_lock:
+        if _estimate_warned:
+            return
+        _estimate_warned = True
+    logger.warning(
+        "TOKEN COUNTS ARE ESTIMATED (%s): using %d characters per token, so chunk sizes, recorded "
+        "token_count values and context budgets are approximate. Install tiktoken (requirements.txt) "
+        "and make its encodings available (set TIKTOKEN_CACHE_DIR to a pre-populated cache when offline).",
+        reason, CHARS_PER_TOKEN
+    )
+
+class TokenCounter:
+    """Counts and truncates tokens for a model's encoding."""
+
+    def __init__(self, model: Optional[str] = None):
+        """
+        Initialize counter.
+
+        Args:
+            model: Model name used to select the encoding
+        """
+        self.model = model
+        self.encoding = None
+
+        if tiktoken is None:
+            _warn_estimating("tiktoken is not installed")
+            return
+
+        try:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+            except (KeyError, ValueError):
+                self.encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # Encodings are downloaded on first use; fall back if offline
+            _warn_estimating(f"tiktoken encoding unavailable: {e}")
+            self.encoding = None
+
+    @property
+    def name(self) -> str:
+        """
+        Encoding name, or the estimate used without tiktoken.
+
+        Stored next to recorded counts, so a count is reused only by a
+        counter with the same name.
+        """
+        return self.encoding.name if self.encoding is not None else f"estimate:{CHARS_PER_TOKEN}chars"
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from the real tokenizer."""
+        return self.encoding is not None
+
+    def count(self, text: str) -> int:
+        """
+        Count tokens in text.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Token count (an estimate if exact is False)
+        """
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return max(1, -(-len(text) // CHARS_PER_TOKEN)) if text else 0
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """
+        Truncate text to at most max_tokens tokens.
+
+        Args:
+            text: Input text
+            max_tokens: Token limit
+
+        Returns:
+            Truncated text (unchanged if already within the limit)
+        """
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self.encoding.decode(tokens[:max_tokens])
+        return text[:max_tokens * CHARS_PER_TOKEN]
+
+@lru_cache(maxsize=None)
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """
+    Return a shared counter for a model.
+
+    Args:
+        model: Model name
+
+    Returns:
+        TokenCounter instance
+    """
+    return TokenCounter(model)
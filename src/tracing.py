@@ -0,0 +1,370 @@
+"""
+Request tracing for Nigerian Tax Reform Acts RAG system.
+Lightweight spans around the stages of a request (embedding, search,
+context formatting, completion), kept in context variables so nested calls
+attach to the right request without passing anything around. Trace and span
+IDs follow W3C Trace Context and spans are exported with OpenTelemetry field
+names, so traces can be joined with an OpenTelemetry collector later.
+
+Finished traces are written to a JSONL file: a random sample, plus every
+trace that was slow or failed, so latency outliers can be investigated after
+the fact without an external collector.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Share of traces exported regardless of latency (0 disables sampling)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.05"))
+
+# Traces at least this slow are always exported (0 disables)
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "2000"))
+
+TRACE_EXPORT_PATH = Path(os.getenv(
+    "TRACE_EXPORT_PATH",
+    str(Path(__file__).parent.parent / "data" / "traces" / "traces.jsonl")
+))
+
+# The export file is rotated to <name>.1 when it grows past this size
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def new_trace_id() -> str:
+    """Random 128-bit trace ID as 32 hex characters."""
+    return f"{random.getrandbits(128):032x}"
+
+def new_span_id() -> str:
+    """Random 64-bit span ID as 16 hex characters."""
+    return f"{random.getrandbits(64):016x}"
+
+class Span:
+    """One timed stage of a request."""
+
+    __slots__ = ("name", "trace", "span_id", "parent_span_id", "start_ns", "end_ns", "_start_perf",
+                 "attributes", "status", "status_message")
+
+    def __init__(self, name: str, trace: "Trace", parent_span_id: Optional[str], attributes: Dict[str, Any]):
+        """
+        Start a span.
+
+        Args:
+            name: Stage name, e.g. "retriever.search"
+            trace: Trace the span belongs to
+            parent_span_id: Enclosing span (None for a root without a remote parent)
+            attributes: Initial attributes
+        """
+        self.name = name
+        self.trace = trace
+        self.span_id = new_span_id()
+        self.parent_span_id = parent_span_id
+        self.start_ns = time.time_ns()
+        self._start_perf = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes)
+        self.status = "UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        """Set an attribute (strings, numbers, booleans or lists of them)."""
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes: Any):
+        """Set several attributes."""
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException):
+        """Mark the span as failed."""
+        self.status = "ERROR"
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def set_status(self, status: str, message: str = ""):
+        """Set the status explicitly ("OK" or "ERROR"), e.g. for a handled failure."""
+        self.status = status
+        self.status_message = message
+
+    def end(self):
+        """Stop the span's clock."""
+        if self.end_ns is None:
+            self.end_ns = self.start_ns + time.perf_counter_ns() - self._start_perf
+            if self.status == "UNSET":
+                self.status = "OK"
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds (so far, if still open)."""
+        end_ns = self.end_ns if self.end_ns is not None else self.start_ns + time.perf_counter_ns() - self._start_perf
+        return (end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize with OpenTelemetry span field names."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.status_message}
+        }
+
+class _NoopSpan:
+    """Span returned outside a trace, so instrumented code runs unchanged in scripts."""
+
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes: Any):
+        pass
+
+    def record_error(self, error: BaseException):
+        pass
+
+    def set_status(self, status: str, message: str = ""):
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """All spans of one request."""
+
+    def __init__(self, trace_id: str, request_id: str, sampled: bool):
+        """
+        Initialize trace.
+
+        Args:
+            trace_id: W3C trace ID
+            request_id: Request ID reported in logs and response headers
+            sampled: Export regardless of latency (sampled here or by the caller)
+        """
+        self.trace_id = trace_id
+        self.request_id = request_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        """Record a finished span."""
+        with self._lock:
+            self.spans.append(span)
+
+class JsonlTraceExporter:
+    """Appends finished traces to a JSONL file, one line per trace."""
+
+    def __init__(self, path: Path = TRACE_EXPORT_PATH, max_bytes: int = TRACE_MAX_BYTES):
+        """
+        Initialize exporter.
+
+        Args:
+            path: Output file
+            max_bytes: Rotate the file to <name>.1 past this size
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def export(self, record: Dict[str, Any]):
+        """Write one trace record; failures are logged, never raised into the request."""
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                if self.max_bytes and self.path.exists() and self.path.stat().st_size > self.max_bytes:
+                    os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+            except OSError as e:
+                logger.warning("Could not export trace to %s: %s", self.path, e)
+
+class Tracer:
+    """Creates traces and decides which finished traces to export."""
+
+    def __init__(
+        self,
+        exporter: Optional[JsonlTraceExporter] = None,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        slow_ms: float = TRACE_SLOW_MS
+    ):
+        """
+        Initialize tracer.
+
+        Args:
+            exporter: Where exported traces go (default: JSONL at TRACE_EXPORT_PATH)
+            sample_rate: Share of traces exported regardless of latency
+            slow_ms: Traces at least this slow are always exported (0 disables)
+        """
+        self.exporter = exporter or JsonlTraceExporter()
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    @contextmanager
+    def start_trace(
+        self,
+        name: str,
+        request_id: Optional[str] = None,
+        traceparent: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Span]:
+        """
+        Open the root span of a request.
+
+        Args:
+            name: Root span name, e.g. "POST /chat"
+            request_id: Caller's request ID (default: the trace ID)
+            traceparent: Incoming W3C traceparent header, continued if valid
+            attributes: Root span attributes
+
+        Yields:
+            Root span
+        """
+        parent_span_id = None
+        remote_sampled = False
+        match = TRACEPARENT.match((traceparent or "").strip().lower())
+        if match and match.group(1) != "0" * 32:
+            trace_id, parent_span_id, flags = match.groups()
+            remote_sampled = bool(int(flags, 16) & 1)
+        else:
+            trace_id = new_trace_id()
+
+        if not request_id or not REQUEST_ID.match(request_id):
+            request_id = trace_id
+
+        trace = Trace(trace_id, request_id, remote_sampled or random.random() < self.sample_rate)
+        root = Span(name, trace, parent_span_id, attributes or {})
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            root.record_error(e)
+            raise
+        finally:
+            root.end()
+            trace.add(root)
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self.finish(trace, root)
+
+    def finish(self, trace: Trace, root: Span):
+        """Export a finished trace if it was sampled, slow or failed."""
+        failed = any(span.status == "ERROR" for span in trace.spans)
+        if failed:
+            reason = "error"
+        elif self.slow_ms and root.duration_ms >= self.slow_ms:
+            reason = "slow"
+        elif trace.sampled:
+            reason = "sampled"
+        else:
+            return
+
+        self.exporter.export({
+            "trace_id": trace.trace_id,
+            "request_id": trace.request_id,
+            "name": root.name,
+            "timestamp": datetime.fromtimestamp(root.start_ns / 1e9).isoformat(),
+            "duration_ms": round(root.duration_ms, 3),
+            "status": "ERROR" if failed else "OK",
+            "export_reason": reason,
+            "spans": [span.to_dict() for span in sorted(trace.spans, key=lambda span: span.start_ns)]
+        })
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """Return the shared tracer."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+def start_trace(name: str, **kwargs) -> Any:
+    """Open a request's root span on the shared tracer (see Tracer.start_trace)."""
+    return get_tracer().start_trace(name, **kwargs)
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a stage of the current request.
+
+    Outside a trace (scripts, benchmarks) this yields a span that ignores
+    everything, so instrumented code needs no checks.
+
+    Args:
+        name: Stage name, e.g. "retriever.embed"
+        **attributes: Span attributes
+
+    Yields:
+        Span (or a no-op span outside a trace)
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    current = Span(name, trace, parent.span_id if parent else None, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        current.end()
+        trace.add(current)
+        _current_span.reset(token)
+
+def current_request_id() -> Optional[str]:
+    """Request ID of the current trace, if any."""
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+def traceparent(root: Span) -> str:
+    """W3C traceparent header value pointing at a span."""
+    return f"00-{root.trace.trace_id}-{root.span_id}-{'01' if root.trace.sampled else '00'}"
+
+class RequestIdFilter(logging.Filter):
+    """Adds request_id and trace_id to log records (\"-\" outside a request)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace = _current_trace.get()
+        record.request_id = trace.request_id if trace else "-"
+        record.trace_id = trace.trace_id if trace else "-"
+        return True
+
+def install_log_filter(target: Optional[logging.Logger] = None):
+    """
+    Attach RequestIdFilter to a logger's handlers.
+
+    Filters on handlers see records from every child logger, so adding it to
+    the root handlers covers the retriever, generator and API loggers.
+
+    Args:
+        target: Logger whose handlers get the filter (default: root)
+    """
+    target = target or logging.getLogger()
+    for handler in target.handlers:
+        if not any(isinstance(existing, RequestIdFilter) for existing in handler.filters):
+            handler.addFilter(RequestIdFilter())
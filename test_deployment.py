@@ -3,13 +3,64 @@
 Test script to verify Railway deployment is working correctly.
 Usage: python test_deployment.py <your-railway-url>
 Example: python test_deployment.py https://legal-aid-production.up.railway.app
+
+Load test: python test_deployment.py <url> --load --concurrency 20 --duration 60 --ramp-up 10
+Local load test (MODEL_PROVIDER=local, no API calls): python test_deployment.py --local --load
 """
 
+import os
 import sys
 import json
+import time
+import random
+import socket
+import argparse
+import threading
+import subprocess
+from pathlib import Path
+from typing import List, Dict, Any
+
 import requests
 from datetime import datetime
 
+# Load test question pool: each group is one question and its paraphrases.
+# Groups are drawn with Zipf-like weights, so popular questions repeat as in real traffic.
+QUERY_GROUPS = [
+    ["What is the VAT rate?",
+     "How much is VAT in Nigeria now?",
+     "What percentage is value added tax under the new law?"],
+    ["What is the commencement date of the Nigeria Tax Reform Acts?",
+     "When do the new tax laws take effect?",
+     "From what date does the Nigeria Tax Act apply?"],
+    ["Who replaces FIRS in the 2026 regime?",
+     "What happened to the Federal Inland Revenue Service?",
+     "Which agency collects federal taxes after FIRS?"],
+    ["Define taxable income",
+     "What does taxable income mean?",
+     "What is the meaning of taxable income under the Act?"],
+    ["Are digital assets taxed?",
+     "How is cryptocurrency treated under the new tax law?",
+     "Do I pay tax on gains from NFTs?"],
+    ["Do freelancers need to charge VAT?",
+     "Must an independent contractor register for VAT?",
+     "I'm a freelancer, do I charge VAT on my services?"],
+    ["How are dividends paid out of untaxed profits treated?",
+     "What tax applies to dividends from untaxed profits?"],
+    ["How do I get a TIN?",
+     "What is the process to register for a tax identification number?",
+     "Where can my business apply for a TIN?"],
+    ["What are the personal income tax rates?",
+     "How much income tax does an individual pay?",
+     "What are the PAYE bands under the 2025 reform?"],
+]
+NON_TAX_QUERIES = [
+    "What is the weather like today?",
+    "Tell me a joke",
+    "Who won the football match yesterday?",
+]
+SEARCH_QUERIES = ["VAT", "digital assets", "Nigeria Revenue Service", "commencement", "dividends", "TIN registration"]
+
+
 def test_health(base_url):
     """Test the health endpoint."""
     print("\n" + "="*70)
@@ -192,15 +243,300 @@ def test_search(base_url):
         print(f"❌ Error: {e}")
         return False
 
-def main():
-    """Run all deployment tests."""
-    if len(sys.argv) < 2:
-        print("Usage: python test_deployment.py <railway-url>")
-        print("Example: python test_deployment.py https://legal-aid-production.up.railway.app")
-        sys.exit(1)
+class QueryMix:
+    """Draws chat and search queries: repeated popular questions, paraphrases and off-topic messages."""
+
+    def __init__(self, repeat_ratio: float, non_tax_ratio: float):
+        """
+        Initialize mix.
+
+        Args:
+            repeat_ratio: Share of tax questions asked in their canonical wording
+            non_tax_ratio: Share of chat messages that are not about tax
+        """
+        self.repeat_ratio = repeat_ratio
+        self.non_tax_ratio = non_tax_ratio
+        self.weights = [1 / (rank + 1) for rank in range(len(QUERY_GROUPS))]
+
+    def chat_message(self, rng: random.Random) -> str:
+        """Pick a chat message."""
+        if rng.random() < self.non_tax_ratio:
+            return rng.choice(NON_TAX_QUERIES)
+        group = rng.choices(QUERY_GROUPS, weights=self.weights)[0]
+        return group[0] if rng.random() < self.repeat_ratio else rng.choice(group[1:])
+
+    def search_query(self, rng: random.Random) -> str:
+        """Pick a search query."""
+        return rng.choice(SEARCH_QUERIES)
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    Parse an endpoint mix such as "chat=70,search=25,health=5".
+
+    Args:
+        spec: Comma-separated endpoint=weight pairs
+
+    Returns:
+        Mapping of endpoint to weight
+    """
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("chat", "search", "health", "stats"):
+            raise ValueError(f"unknown endpoint in mix: {name!r}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def timed_request(session: requests.Session, method: str, url: str, timeout: float, **kwargs) -> Dict[str, Any]:
+    """
+    Send one request, timing the first body byte and the complete response.
+
+    Args:
+        session: HTTP session of the calling worker
+        method: HTTP method
+        url: Request URL
+        timeout: Timeout in seconds
+        **kwargs: Passed to requests
+
+    Returns:
+        Sample with status (0 on connection errors), latency, ttfb and error
+    """
+    start = time.perf_counter()
+    ttfb = None
+    try:
+        with session.request(method, url, stream=True, timeout=timeout, **kwargs) as response:
+            for block in response.iter_content(chunk_size=None):
+                if ttfb is None and block:
+                    ttfb = time.perf_counter() - start
+            status = response.status_code
+        error = None
+    except requests.RequestException as e:
+        status = 0
+        error = type(e).__name__
+
+    latency = time.perf_counter() - start
+    return {"status": status, "latency": latency, "ttfb": ttfb if ttfb is not None else latency, "error": error}
+
+def run_worker(
+    worker_id: int,
+    base_url: str,
+    args: argparse.Namespace,
+    mix: Dict[str, float],
+    queries: QueryMix,
+    start_time: float,
+    stop: threading.Event,
+    samples: List[Dict[str, Any]]
+):
+    """Send requests from one simulated client until the test ends."""
+    # Ramp-up: workers join evenly spread over the ramp-up period
+    if stop.wait(args.ramp_up * worker_id / args.concurrency):
+        return
+
+    rng = random.Random(args.seed * 1000 + worker_id)
+    session = requests.Session()
+    endpoints = list(mix)
+    weights = [mix[name] for name in endpoints]
+
+    while not stop.is_set():
+        endpoint = rng.choices(endpoints, weights=weights)[0]
+        if endpoint == "chat":
+            sample = timed_request(session, "POST", f"{base_url}/chat", args.timeout,
+                                   json={"message": queries.chat_message(rng), "conversation_history": []})
+        elif endpoint == "search":
+            sample = timed_request(session, "POST", f"{base_url}/search", args.timeout,
+                                   params={"query": queries.search_query(rng), "top_k": 5})
+        else:
+            sample = timed_request(session, "GET", f"{base_url}/{endpoint}", args.timeout)
+
+        sample["endpoint"] = endpoint
+        sample["started"] = time.perf_counter() - start_time - sample["latency"]
+        samples.append(sample)
+
+        if args.think_time:
+            stop.wait(rng.expovariate(1000 / args.think_time))
+
+def percentile_summary(values: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99/max of values in milliseconds."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {"p50": at(0.50), "p95": at(0.95), "p99": at(0.99), "max": ordered[-1] * 1000}
+
+def summarize(samples: List[Dict[str, Any]], measured_from: float, window: float) -> Dict[str, Any]:
+    """
+    Aggregate samples into throughput, latency, TTFB, error and 429 rates.
+
+    Latency and TTFB percentiles cover successful responses only, since
+    rejected requests return quickly and would flatter them.
+
+    Args:
+        samples: Request samples
+        measured_from: Seconds after start when ramp-up ended
+        window: Length of the steady-state window in seconds
+
+    Returns:
+        Summary dictionary
+    """
+    total = len(samples)
+    ok = [sample for sample in samples if 200 <= sample["status"] < 300]
+    limited = sum(1 for sample in samples if sample["status"] == 429)
+    errors = total - len(ok) - limited
+    steady = sum(1 for sample in samples if sample["started"] >= measured_from)
+
+    return {
+        "requests": total,
+        "throughput_rps": steady / window if window > 0 else 0.0,
+        "success_rate": len(ok) / total if total else 0.0,
+        "error_rate": errors / total if total else 0.0,
+        "rate_limited_rate": limited / total if total else 0.0,
+        "latency_ms": percentile_summary([sample["latency"] for sample in ok]),
+        "ttfb_ms": percentile_summary([sample["ttfb"] for sample in ok]),
+        "errors": sorted({sample["error"] or str(sample["status"]) for sample in samples
+                          if sample["status"] != 429 and not 200 <= sample["status"] < 300})
+    }
 
-    base_url = sys.argv[1].rstrip('/')
+def run_load_test(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run the load test and print its report.
+
+    Args:
+        base_url: API base URL
+        args: Parsed command-line arguments
+
+    Returns:
+        Report dictionary
+    """
+    mix = parse_mix(args.mix)
+    queries = QueryMix(args.repeat_ratio, args.non_tax_ratio)
+    samples: List[Dict[str, Any]] = []
+    stop = threading.Event()
+
+    print("\n" + "=" * 70)
+    print("🔥 LOAD TEST")
+    print("=" * 70)
+    print(f"Base URL: {base_url}")
+    print(f"Concurrency: {args.concurrency}  Duration: {args.duration}s  Ramp-up: {args.ramp_up}s  Mix: {args.mix}")
+
+    start_time = time.perf_counter()
+    workers = [
+        threading.Thread(target=run_worker, args=(i, base_url, args, mix, queries, start_time, stop, samples),
+                         daemon=True)
+        for i in range(args.concurrency)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # Progress line every few seconds
+    while time.perf_counter() - start_time < args.duration:
+        time.sleep(min(5, max(0.0, args.duration - (time.perf_counter() - start_time))))
+        elapsed = time.perf_counter() - start_time
+        active = min(args.concurrency, int(args.concurrency * elapsed / args.ramp_up) + 1) if args.ramp_up else args.concurrency
+        print(f"   ⏱  {elapsed:5.1f}s  {active} clients  {len(samples)} requests")
+
+    stop.set()
+    for worker in workers:
+        worker.join(timeout=args.timeout)
+
+    measured_from = min(args.ramp_up, args.duration)
+    window = args.duration - measured_from if args.duration > measured_from else args.duration
+    measured_from = measured_from if args.duration > measured_from else 0.0
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "base_url": base_url,
+        "settings": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "ramp_up": args.ramp_up,
+            "think_time_ms": args.think_time,
+            "mix": args.mix,
+            "repeat_ratio": args.repeat_ratio,
+            "non_tax_ratio": args.non_tax_ratio
+        },
+        "all": summarize(samples, measured_from, window),
+        "endpoints": {
+            endpoint: summarize([s for s in samples if s["endpoint"] == endpoint], measured_from, window)
+            for endpoint in mix
+        }
+    }
 
+    print("\n" + "=" * 70)
+    print("LOAD TEST SUMMARY")
+    print("=" * 70)
+    print(f"{'Endpoint':<10}{'Reqs':>7}{'Req/s':>8}{'Err %':>7}{'429 %':>7}"
+          f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'TTFB p50':>10}{'TTFB p95':>10}")
+    for name, summary in [("all", report["all"])] + list(report["endpoints"].items()):
+        latency = summary["latency_ms"]
+        ttfb = summary["ttfb_ms"]
+        print(f"{name:<10}{summary['requests']:>7}{summary['throughput_rps']:>8.1f}"
+              f"{summary['error_rate'] * 100:>7.1f}{summary['rate_limited_rate'] * 100:>7.1f}"
+              f"{latency['p50']:>9.0f}{latency['p95']:>9.0f}{latency['p99']:>9.0f}"
+              f"{ttfb['p50']:>10.0f}{ttfb['p95']:>10.0f}")
+    print(f"\nThroughput counts requests started after the {measured_from:g}s ramp-up; "
+          f"latency and TTFB cover 2xx responses.")
+    if report["all"]["errors"]:
+        print(f"Errors: {', '.join(report['all']['errors'])}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n📁 Results saved to: {args.output}")
+
+    return report
+
+def start_local_server(args: argparse.Namespace) -> subprocess.Popen:
+    """
+    Start the API with the local model provider on a free local port.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Server process (already answering /health)
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    env = dict(os.environ)
+    env["MODEL_PROVIDER"] = "local"
+    env["LOCAL_EMBED_LATENCY_MS"] = str(args.local_embed_ms)
+    env["LOCAL_CHAT_LATENCY_MS"] = str(args.local_chat_ms)
+    if not args.rate_limits:
+        env["RATE_LIMIT_ENABLED"] = "false"
+
+    print(f"🔧 Starting local API with the local model provider on port {port} "
+          f"(embed {args.local_embed_ms:g} ms, chat {args.local_chat_ms:g} ms)...")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.api:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=Path(__file__).parent,
+        env=env
+    )
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Local API exited with code {process.returncode}")
+        try:
+            health = requests.get(f"{base_url}/health", timeout=2).json()
+            if health.get("rag_initialized"):
+                args.url = base_url
+                return process
+            raise RuntimeError("Local API started without the RAG pipeline (is the index built?)")
+        except requests.RequestException:
+            time.sleep(0.5)
+
+    process.terminate()
+    raise RuntimeError("Local API did not start within 120s")
+
+def run_smoke_tests(base_url: str) -> int:
+    """Run the endpoint checks and print a summary."""
     print("\n" + "="*70)
     print("🚀 RAILWAY DEPLOYMENT TEST")
     print("="*70)
@@ -247,5 +583,53 @@ def main():
         print("4. Verify OPENAI_API_KEY has credits")
         return 1
 
+def main():
+    """Run the deployment tests or a load test."""
+    arg_parser = argparse.ArgumentParser(description="Test a deployed Legal AI.d API")
+    arg_parser.add_argument("url", nargs="?", help="API base URL, e.g. https://legal-aid-production.up.railway.app")
+    arg_parser.add_argument("--local", action="store_true",
+                            help="Start the API locally with MODEL_PROVIDER=local and test it")
+    arg_parser.add_argument("--load", action="store_true", help="Run a load test instead of the endpoint checks")
+    arg_parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients (default: 10)")
+    arg_parser.add_argument("--duration", type=float, default=30, help="Test length in seconds (default: 30)")
+    arg_parser.add_argument("--ramp-up", type=float, default=5,
+                            help="Seconds over which clients join (default: 5)")
+    arg_parser.add_argument("--think-time", type=float, default=0,
+                            help="Mean pause between a client's requests in ms (default: 0)")
+    arg_parser.add_argument("--mix", default="chat=70,search=25,health=5",
+                            help="Endpoint weights (default: chat=70,search=25,health=5)")
+    arg_parser.add_argument("--repeat-ratio", type=float, default=0.5,
+                            help="Share of questions asked in their canonical wording (default: 0.5)")
+    arg_parser.add_argument("--non-tax-ratio", type=float, default=0.1,
+                            help="Share of off-topic chat messages (default: 0.1)")
+    arg_parser.add_argument("--timeout", type=float, default=60, help="Request timeout in seconds (default: 60)")
+    arg_parser.add_argument("--seed", type=int, default=0, help="Random seed for the query mix (default: 0)")
+    arg_parser.add_argument("--output", help="Write the load test report to this JSON file")
+    arg_parser.add_argument("--rate-limits", action="store_true",
+                            help="Keep the API rate limits on in --local mode (off by default)")
+    arg_parser.add_argument("--local-embed-ms", type=float, default=50,
+                            help="Simulated embeddings latency in --local mode (default: 50)")
+    arg_parser.add_argument("--local-chat-ms", type=float, default=800,
+                            help="Simulated chat completion latency in --local mode (default: 800)")
+    args = arg_parser.parse_args()
+
+    if not args.url and not args.local:
+        print("Usage: python test_deployment.py <railway-url>")
+        print("Example: python test_deployment.py https://legal-aid-production.up.railway.app")
+        print("Load test: python test_deployment.py <railway-url> --load (or --local --load)")
+        return 1
+
+    server = start_local_server(args) if args.local else None
+    try:
+        base_url = args.url.rstrip('/')
+        if args.load:
+            report = run_load_test(base_url, args)
+            return 0 if report["all"]["requests"] and report["all"]["error_rate"] == 0 else 1
+        return run_smoke_tests(base_url)
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+
 if __name__ == "__main__":
     sys.exit(main())
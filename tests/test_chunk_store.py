@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar chunk store (src/chunk_store.py).
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from chunk_store import ChunkStore
+
+CHUNKS = [
+    {
+        "text": "Every company shall pay tax — 30%.",
+        "document_name": "Nigeria Tax Bill 2024",
+        "section_number": "56",
+        "page_start": 40,
+        "page_end": 41,
+        "contains_rate": True,
+        "hash": "0123456789abcdef0123456789abcdef",
+        "uncertainty_notes": ["OCR"],
+        "alternate_sources": [{"document_name": "Finance Act"}]
+    },
+    {
+        "text": "Short chunk without optional fields.",
+        "document_name": "Nigeria Tax Bill 2024",
+        "hash": "fedcba9876543210fedcba9876543210"
+    }
+]
+
+@pytest.fixture
+def store():
+    return ChunkStore.from_chunks(CHUNKS)
+
+def test_store_round_trips_every_field(store):
+    assert len(store) == 2
+    for row, chunk in enumerate(CHUNKS):
+        for field, value in chunk.items():
+            assert store.get(row, field) == value
+        assert store.view(row, fields=list(chunk)).to_dict() == chunk
+
+def test_view_raises_key_error_for_absent_field(store):
+    view = store.view(1)
+
+    with pytest.raises(KeyError):
+        view["page_start"]
+    with pytest.raises(KeyError):
+        view["alternate_sources"]
+    with pytest.raises(KeyError):
+        view["not_a_field"]
+
+def test_view_get_and_contains_follow_stored_fields(store):
+    full, sparse = store.view(0), store.view(1)
+
+    assert "alternate_sources" in full and "alternate_sources" not in sparse
+    assert "page_start" in full and "page_start" not in sparse
+    assert sparse.get("page_start", "n/a") == "n/a"
+    assert full.get("page_start") == 40
+    assert "text" not in full
+
+def test_view_restricted_to_fields(store):
+    view = store.view(0, fields=["document_name", "text"])
+
+    assert dict(view) == {"document_name": "Nigeria Tax Bill 2024", "text": CHUNKS[0]["text"]}
+    with pytest.raises(KeyError):
+        view["page_start"]
+
+def test_from_jsonl_applies_keep(tmp_path):
+    path = tmp_path / "chunks.jsonl"
+    path.write_text("\n".join(json.dumps(chunk) for chunk in CHUNKS) + "\n", encoding="utf-8")
+
+    store = ChunkStore.from_jsonl(path, keep=lambda chunk: "page_start" in chunk)
+
+    assert len(store) == 1
+    assert store.text(0) == CHUNKS[0]["text"]
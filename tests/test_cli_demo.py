@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch mode output handling of cli_demo.py.
+"""
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cli_demo import compact_output, load_checkpoint
+
+def write_records(path: Path, records: list):
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+def read_records(path: Path) -> list:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def test_compact_output_drops_error_records_of_retried_queries(tmp_path):
+    output = tmp_path / "results.jsonl"
+    write_records(output, [
+        {"query": "a", "answer": "A"},
+        {"query": "b", "error": "timeout"},
+        {"query": "c", "answer": "C"}
+    ])
+
+    assert compact_output(output, {"b"}) == 1
+    assert [record["query"] for record in read_records(output)] == ["a", "c"]
+
+def test_compact_output_keeps_last_record_per_query(tmp_path):
+    output = tmp_path / "results.jsonl"
+    write_records(output, [
+        {"query": "a", "error": "timeout"},
+        {"query": "b", "answer": "B"},
+        {"query": "a", "answer": "A"}
+    ])
+
+    assert compact_output(output, set()) == 1
+    assert read_records(output) == [{"query": "b", "answer": "B"}, {"query": "a", "answer": "A"}]
+
+def test_compact_output_drops_truncated_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"query": "a", "answer": "A"}\n{"query": "b", "ans', encoding='utf-8')
+
+    assert compact_output(output, set()) == 1
+    assert read_records(output) == [{"query": "a", "answer": "A"}]
+
+def test_compact_output_leaves_clean_file_untouched(tmp_path):
+    output = tmp_path / "results.jsonl"
+    write_records(output, [{"query": "a", "answer": "A"}])
+    before = output.stat().st_mtime_ns
+
+    assert compact_output(output, set()) == 0
+    assert output.stat().st_mtime_ns == before
+    assert compact_output(tmp_path / "missing.jsonl", {"a"}) == 0
+
+def test_load_checkpoint_skips_truncated_line(tmp_path):
+    checkpoint = tmp_path / "results.checkpoint"
+    checkpoint.write_text('"a"\n"b"\n"c', encoding='utf-8')
+
+    assert load_checkpoint(checkpoint) == {"a", "b"}
+    assert load_checkpoint(tmp_path / "missing.checkpoint") == set()
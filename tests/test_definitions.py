@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for alias handling in the definitions index (src/definitions.py).
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from definitions import DefinitionIndex
+from query_expander import ALIASES_FILE
+
+DEFINITIONS = [
+    {"term": "small company", "definition": "a company with gross turnover of ₦50,000,000 or less", "page": 3},
+    {"term": "digital asset", "definition": "a digital representation of value", "page": 3},
+    {"term": "virtual asset", "definition": "has the same meaning as digital asset", "same_as": "digital asset", "page": 3},
+    {"term": "Nigeria Revenue Service", "definition": "the Service established under the Act", "page": 4}
+]
+
+@pytest.fixture
+def index(tmp_path):
+    parsed = {"filename": "Nigeria Tax Act", "definitions": DEFINITIONS, "sections": []}
+    (tmp_path / "nigeria_tax_act_parsed.json").write_text(json.dumps(parsed), encoding="utf-8")
+    return DefinitionIndex.build(processed_dir=tmp_path, aliases_file=ALIASES_FILE)
+
+def test_curated_acronyms_and_legacy_names_resolve(index):
+    assert index.lookup("FIRS")[0]["term"] == "Nigeria Revenue Service"
+    assert index.lookup("NRS")[0]["term"] == "Nigeria Revenue Service"
+
+def test_statutory_same_meaning_resolves(index):
+    assert "digital asset" in [entry["term"] for entry in index.lookup("virtual asset")]
+
+@pytest.mark.parametrize("question", [
+    "What is a small business?",
+    "Define SME",
+    "What is cryptocurrency?"
+])
+def test_distinct_terms_do_not_borrow_definitions(index, question):
+    assert index.match_question(question) is None
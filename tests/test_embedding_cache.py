@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent embedding cache (scripts/embedding_cache.py).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from embedding_cache import EmbeddingCache, text_key
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embeddings.sqlite3")
+    yield cache
+    cache.close()
+
+def test_text_key_normalizes_whitespace_but_not_case():
+    assert text_key("Value  Added\nTax ") == text_key("Value Added Tax")
+    assert text_key("Value Added Tax") != text_key("value added tax")
+
+def test_round_trip_keeps_vectors_and_counts_hits(cache):
+    vector = np.array([0.25, -0.5, 1.0], dtype=np.float32)
+    cache.put_many([("a", vector)], "text-embedding-3-small", 0)
+
+    found = cache.get_many(["a", "b", "a"], "text-embedding-3-small", 0)
+
+    assert list(found) == ["a"]
+    np.testing.assert_array_equal(found["a"], vector)
+    assert cache.stats() == {"hits": 1, "misses": 1, "writes": 1, "hit_rate": 0.5}
+
+def test_entries_are_separated_by_model_and_dimensions(cache):
+    cache.put_many([("a", np.ones(3))], "text-embedding-3-small", 0)
+
+    assert cache.get_many(["a"], "text-embedding-3-small", 256) == {}
+    assert cache.get_many(["a"], "local/text-embedding-3-small", 0) == {}
+    assert "a" in cache.get_many(["a"], "text-embedding-3-small", 0)
+
+def test_cache_persists_across_instances(tmp_path):
+    path = tmp_path / "embeddings.sqlite3"
+    first = EmbeddingCache(path)
+    first.put_many([("a", np.ones(3))], "model", 0)
+    first.close()
+
+    second = EmbeddingCache(path)
+    try:
+        assert "a" in second.get_many(["a"], "model", 0)
+        assert second.size_report()["entries"] == 1
+    finally:
+        second.close()
+
+def test_compact_drops_stale_entries_except_kept_keys(cache, monkeypatch):
+    cache.put_many([("old", np.ones(3)), ("kept", np.ones(3))], "model", 0)
+
+    later = time.time() + 10 * 86400
+    monkeypatch.setattr(time, "time", lambda: later)
+    cache.put_many([("new", np.ones(3))], "model", 0)
+
+    assert cache.compact(max_age_days=5, keep_keys={"kept"}) == 1
+    assert set(cache.get_many(["old", "kept", "new"], "model", 0)) == {"kept", "new"}
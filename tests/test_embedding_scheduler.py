@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for retries in the embedding scheduler (scripts/embedding_scheduler.py).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from embedding_scheduler import EmbeddingError, EmbeddingScheduler, is_retryable
+from token_counter import get_token_counter
+
+class APIError(Exception):
+    """Stand-in for an HTTP error of an API client."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+def flaky(*errors):
+    """Embedding function raising the given errors, then succeeding."""
+    calls = []
+
+    def embed_batch(texts):
+        calls.append(texts)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return [[1.0, 0.0] for _ in texts]
+
+    return embed_batch, calls
+
+def run(embed_batch, max_retries=3):
+    scheduler = EmbeddingScheduler(embed_batch, get_token_counter("text-embedding-3-small"),
+                                   max_retries=max_retries, backoff_base=0.0, backoff_max=0.0)
+    return scheduler.embed(["a", "b"], verbose=False, token_counts=[1, 1])
+
+@pytest.mark.parametrize("error", [APIError(429), APIError(500), APIError(503), TimeoutError(), ConnectionResetError()])
+def test_transient_errors_are_retried(error):
+    embed_batch, calls = flaky(error, error)
+
+    assert len(run(embed_batch)) == 2
+    assert len(calls) == 3
+
+@pytest.mark.parametrize("error", [APIError(400), APIError(401), APIError(403), ValueError("bad input")])
+def test_permanent_errors_fail_fast(error):
+    embed_batch, calls = flaky(error)
+
+    with pytest.raises(EmbeddingError):
+        run(embed_batch)
+    assert len(calls) == 1
+
+def test_retries_run_out():
+    embed_batch, calls = flaky(*[APIError(429)] * 5)
+
+    with pytest.raises(EmbeddingError):
+        run(embed_batch, max_retries=2)
+    assert len(calls) == 3
+
+def test_openai_errors_are_classified():
+    openai = pytest.importorskip("openai")
+    httpx = pytest.importorskip("httpx")
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+
+    def status_error(cls, status):
+        return cls("error", response=httpx.Response(status, request=request), body=None)
+
+    assert is_retryable(status_error(openai.RateLimitError, 429))
+    assert is_retryable(status_error(openai.InternalServerError, 500))
+    assert is_retryable(openai.APITimeoutError(request=request))
+    assert not is_retryable(status_error(openai.AuthenticationError, 401))
+    assert not is_retryable(status_error(openai.BadRequestError, 400))
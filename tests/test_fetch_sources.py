@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests for conditional, resumable and concurrent downloads in scripts/01_fetch_sources.py.
+"""
+
+import sys
+import time
+import hashlib
+import importlib
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+fetch_sources = importlib.import_module("01_fetch_sources")
+
+BODY = bytes(range(256)) * 256  # 64 KiB stand-in for a PDF
+LAST_MODIFIED = "Wed, 01 Oct 2025 12:00:00 GMT"
+
+class PdfHandler(BaseHTTPRequestHandler):
+    """Serves the server's body with ETag, conditional GET and byte-range support."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(dict(self.headers))
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+
+        try:
+            time.sleep(server.delay)
+            self.respond(server)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def respond(self, server):
+        body = server.body
+        if self.headers.get("If-None-Match") == server.etag or (
+            "If-None-Match" not in self.headers and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        ):
+            return self.send(304)
+
+        start = 0
+        byte_range = self.headers.get("Range", "")
+        # A range only applies to the version named by If-Range
+        if byte_range.startswith("bytes=") and self.headers.get("If-Range") in (None, server.etag):
+            start = int(byte_range[len("bytes="):].rstrip("-"))
+            if start >= len(body):
+                return self.send(416, {"Content-Range": f"bytes */{len(body)}"})
+
+        status = 206 if start else 200
+        headers = {"Content-Type": "application/pdf", "ETag": server.etag, "Last-Modified": LAST_MODIFIED}
+        if start:
+            headers["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+        payload = body[start:]
+
+        # Drop the connection part way through once, like a network failure
+        if server.truncate_at is not None:
+            self.send(status, headers, payload[:server.truncate_at], length=len(payload))
+            server.truncate_at = None
+            self.close_connection = True
+            return
+
+        self.send(status, headers, payload)
+
+    def send(self, status, headers=None, payload=b"", length=None):
+        self.server.statuses.append(status)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload) if length is None else length))
+        self.end_headers()
+        self.wfile.write(payload)
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def server(monkeypatch):
+    # requests must not route the stand-in through a configured proxy
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PdfHandler)
+    httpd.daemon_threads = True
+    httpd.body = BODY
+    httpd.etag = '"v1"'
+    httpd.delay = 0.0
+    httpd.truncate_at = None
+    httpd.requests, httpd.statuses = [], []
+    httpd.lock = threading.Lock()
+    httpd.active = httpd.peak = 0
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/act.pdf"
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def part_files(output_path):
+    return [output_path.with_name(output_path.name + suffix) for suffix in (".part", ".part.json")]
+
+def test_download_publishes_checksummed_file(tmp_path, server):
+    output_path = tmp_path / "act.pdf"
+
+    result = fetch_sources.download_file(server.url, output_path, "Act")
+
+    assert result["status"] == "downloaded"
+    assert output_path.read_bytes() == BODY
+    assert result["sha256"] == hashlib.sha256(BODY).hexdigest()
+    assert (result["etag"], result["last_modified"]) == ('"v1"', LAST_MODIFIED)
+    assert not any(path.exists() for path in part_files(output_path))
+
+def test_unchanged_file_gets_304(tmp_path, server):
+    output_path = tmp_path / "act.pdf"
+    first = fetch_sources.download_file(server.url, output_path, "Act")
+
+    result = fetch_sources.download_file(server.url, output_path, "Act", etag=first["etag"],
+                                         last_modified=first["last_modified"])
+
+    assert result["status"] == "not_modified"
+    assert server.statuses == [200, 304]
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+    assert output_path.read_bytes() == BODY
+
+def test_interrupted_download_keeps_old_file_and_resumes(tmp_path, server):
+    output_path = tmp_path / "act.pdf"
+    output_path.write_bytes(b"previous version")
+    server.truncate_at = 20000
+
+    interrupted = fetch_sources.download_file(server.url, output_path, "Act", conditional=False)
+
+    part_path = part_files(output_path)[0]
+    assert interrupted["status"] == "error"
+    # Nothing is renamed into place until the transfer completes
+    assert output_path.read_bytes() == b"previous version"
+    received = part_path.stat().st_size
+    assert 0 < received < len(BODY)
+
+    resumed = fetch_sources.download_file(server.url, output_path, "Act", conditional=False)
+
+    assert server.requests[-1]["Range"] == f"bytes={received}-"
+    assert server.requests[-1]["If-Range"] == '"v1"'
+    assert server.statuses[-1] == 206
+    assert resumed["status"] == "downloaded"
+    assert output_path.read_bytes() == BODY
+    assert resumed["sha256"] == hashlib.sha256(BODY).hexdigest()
+    assert not any(path.exists() for path in part_files(output_path))
+
+def test_changed_upstream_restarts_from_scratch(tmp_path, server):
+    output_path = tmp_path / "act.pdf"
+    part_path, part_meta_path = part_files(output_path)
+    part_path.write_bytes(b"bytes of the old version")
+    part_meta_path.write_text('{"validator": "\\"v0\\""}', encoding="utf-8")
+
+    result = fetch_sources.download_file(server.url, output_path, "Act")
+
+    assert server.requests[0]["If-Range"] == '"v0"'
+    assert server.statuses == [200]
+    assert result["status"] == "downloaded"
+    assert output_path.read_bytes() == BODY
+
+def test_416_discards_partial_file_and_restarts(tmp_path, server):
+    output_path = tmp_path / "act.pdf"
+    part_path, part_meta_path = part_files(output_path)
+    part_path.write_bytes(BODY + b"trailing garbage")
+    part_meta_path.write_text('{"validator": "\\"v1\\""}', encoding="utf-8")
+
+    result = fetch_sources.download_file(server.url, output_path, "Act")
+
+    assert server.statuses == [416, 200]
+    assert "Range" not in server.requests[-1]
+    assert result["status"] == "downloaded"
+    assert output_path.read_bytes() == BODY
+
+def test_host_limiter_shares_a_semaphore_per_host():
+    limiter = fetch_sources.HostLimiter(per_host=2)
+
+    assert limiter.for_url("https://NASS.gov.ng/a.pdf") is limiter.for_url("https://nass.gov.ng/b.pdf")
+    assert limiter.for_url("https://nass.gov.ng/a.pdf") is not limiter.for_url("https://firs.gov.ng/a.pdf")
+
+def test_fetch_all_limits_connections_per_host(tmp_path, server):
+    server.delay = 0.2
+    sources = [{"name": f"Act {i}", "url": server.url, "filename": f"act_{i}.pdf"} for i in range(5)]
+
+    results = fetch_sources.fetch_all(sources, tmp_path, workers=5, per_host=2)
+
+    assert server.peak == 2
+    assert [metadata["filename"] for metadata in results] == [source["filename"] for source in sources]
+    assert {metadata["fetch_status"] for metadata in results} == {"downloaded"}
+    assert {metadata["sha256"] for metadata in results} == {hashlib.sha256(BODY).hexdigest()}
+
+    # The recorded validators make the next run conditional
+    server.delay = 0.0
+    again = fetch_sources.fetch_all(results, tmp_path, workers=5, per_host=2)
+    assert {metadata["fetch_status"] for metadata in again} == {"not_modified"}
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for versioned index storage (src/index_versions.py).
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from index_versions import (
+    IndexIntegrityError, collect_garbage, current_version, new_version_dir,
+    publish, verify_version, write_manifest
+)
+
+@pytest.fixture
+def layout(tmp_path):
+    return tmp_path / "versions", tmp_path / "CURRENT"
+
+def build(versions_dir: Path, content: bytes = b"vectors") -> Path:
+    version_dir = new_version_dir(versions_dir)
+    (version_dir / "faiss_index.bin").write_bytes(content)
+    write_manifest(version_dir, ["faiss_index.bin"], ["h1", "h2"], "model", 4, {"chunk_size": 512})
+    return version_dir
+
+def test_publish_points_current_at_sealed_version(layout):
+    versions_dir, current_file = layout
+    assert current_version(current_file, versions_dir) is None
+
+    version_dir = build(versions_dir)
+    publish(version_dir, current_file)
+
+    assert current_version(current_file, versions_dir) == version_dir
+    manifest = verify_version(version_dir, checksums=True)
+    assert manifest["chunk_count"] == 2
+    assert manifest["params"] == {"chunk_size": 512}
+
+def test_publish_refuses_unsealed_build(layout):
+    versions_dir, current_file = layout
+    with pytest.raises(IndexIntegrityError):
+        publish(new_version_dir(versions_dir), current_file)
+    assert not current_file.exists()
+
+def test_verify_detects_modified_artifact(layout):
+    version_dir = build(layout[0])
+
+    (version_dir / "faiss_index.bin").write_bytes(b"VECTORS")
+    verify_version(version_dir)  # same size, so only the checksum catches it
+    with pytest.raises(IndexIntegrityError):
+        verify_version(version_dir, checksums=True)
+
+    (version_dir / "faiss_index.bin").unlink()
+    with pytest.raises(IndexIntegrityError):
+        verify_version(version_dir)
+
+def test_collect_garbage_keeps_current_and_newest(layout):
+    versions_dir, current_file = layout
+    versions = [build(versions_dir) for _ in range(4)]
+    publish(versions[1], current_file)
+
+    abandoned = new_version_dir(versions_dir)
+    fresh = new_version_dir(versions_dir)
+    stale = time.time() - 2 * 86400
+    os.utime(abandoned, (stale, stale))
+
+    removed = collect_garbage(2, current_file, versions_dir)
+
+    assert set(removed) == {versions[0], versions[2], abandoned}
+    assert sorted(path for path in versions_dir.iterdir()) == sorted([versions[1], versions[3], fresh])
+    assert current_version(current_file, versions_dir) == versions[1]
+    verify_version(versions[1], checksums=True)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the chunk and index stages of scripts/ingest.py.
+"""
+
+import os
+import sys
+import queue
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+# Importing the embedding script needs a configured provider
+os.environ.setdefault("MODEL_PROVIDER", "local")
+
+import ingest
+from ingest_manifest import IngestManifest
+
+make_chunks = ingest.make_chunks
+embed_and_index = ingest.embed_and_index
+
+PARSED_DIR = Path(__file__).parent.parent / "data" / "processed"
+TAX_BILL = PARSED_DIR / "nigeria_tax_bill_2024_parsed.json"
+PIT_REFORMS = PARSED_DIR / "personal_income_tax_reforms_2025_parsed.json"
+
+pytestmark = pytest.mark.skipif(
+    not (TAX_BILL.exists() and PIT_REFORMS.exists()),
+    reason="parsed documents not found, run 02_parse_pdf.py first"
+)
+
+@pytest.fixture
+def ingest_run(tmp_path, monkeypatch):
+    """
+    Run the chunk and index stages over the parsed files in a scratch directory.
+
+    Chunking runs inline; embedding and index writing are replaced by stubs
+    that record the chunks that would be indexed.
+    """
+    monkeypatch.setattr(make_chunks, "PROCESSED_DIR", tmp_path)
+    monkeypatch.setattr(make_chunks, "OUTPUT_FILE", tmp_path / "chunks.jsonl")
+    monkeypatch.setattr(make_chunks, "SECTIONS_FILE", tmp_path / "sections.jsonl")
+    monkeypatch.setattr(make_chunks, "save_chunks", lambda all_chunks: make_chunks.OUTPUT_FILE.touch())
+
+    indexed = []
+    monkeypatch.setattr(embed_and_index, "index_input_hash", lambda: "")
+    monkeypatch.setattr(embed_and_index, "index_artifacts", lambda: [])
+    monkeypatch.setattr(embed_and_index, "embed_chunks",
+                        lambda indexer, chunks, previous, verbose=True: ([np.zeros(4) for _ in chunks], len(chunks)))
+    monkeypatch.setattr(embed_and_index, "embed_kb", lambda indexer, verbose=True: ([], []))
+    monkeypatch.setattr(embed_and_index, "write_indices",
+                        lambda indexer, chunks, *args, **kwargs: indexed.append(chunks))
+    monkeypatch.setattr(embed_and_index, "record_index", lambda *args: None)
+
+    def run(force: bool = False):
+        manifest = IngestManifest(tmp_path / "ingest_manifest.json")
+        chunk_stage = ingest.ChunkStage("chunk", 1, queue.Queue(), None, manifest=manifest, force=force)
+        index_stage = ingest.IndexStage("index", 1, queue.Queue(), None, manifest=manifest, indexer=None,
+                                        previous_embeddings={}, force=force)
+
+        for parsed_file in sorted(tmp_path.glob("*_parsed.json")):
+            outcome = {"output_path": str(parsed_file), "name": parsed_file.name}
+            planned = chunk_stage.plan(outcome)
+            if isinstance(planned, ingest.Work):
+                planned = chunk_stage.complete(outcome, planned.func(*planned.args))
+            for doc in planned:
+                index_stage.plan({**doc, "vectors": {}, "embedded_hashes": set()})
+
+        index_stage.finish()
+        manifest.save()
+        return indexed[-1]
+
+    return run
+
+def hashes(chunks):
+    return [chunk["hash"] for chunk in chunks]
+
+def test_reingest_after_earlier_document_changes(tmp_path, ingest_run):
+    # b duplicates a, so every chunk of b is dropped
+    shutil.copyfile(TAX_BILL, tmp_path / "a_parsed.json")
+    shutil.copyfile(TAX_BILL, tmp_path / "b_parsed.json")
+    first = ingest_run()
+    tax_bill_name = first[0]["document_name"]
+
+    # Once a changes, b's chunks must come back
+    shutil.copyfile(PIT_REFORMS, tmp_path / "a_parsed.json")
+    incremental = ingest_run()
+    forced = ingest_run(force=True)
+
+    assert hashes(incremental) == hashes(forced)
+    assert tax_bill_name in {chunk["document_name"] for chunk in incremental}
+
+def test_unchanged_reingest_indexes_the_same_chunks(tmp_path, ingest_run):
+    shutil.copyfile(TAX_BILL, tmp_path / "a_parsed.json")
+    shutil.copyfile(PIT_REFORMS, tmp_path / "b_parsed.json")
+    first = ingest_run()
+    second = ingest_run()
+
+    assert hashes(second) == hashes(first)
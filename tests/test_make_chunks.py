@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental chunking in scripts/03_make_chunks.py.
+"""
+
+import sys
+import json
+import shutil
+import importlib
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+make_chunks = importlib.import_module("03_make_chunks")
+from ingest_manifest import IngestManifest
+
+PARSED_DIR = Path(__file__).parent.parent / "data" / "processed"
+TAX_BILL = PARSED_DIR / "nigeria_tax_bill_2024_parsed.json"
+PIT_REFORMS = PARSED_DIR / "personal_income_tax_reforms_2025_parsed.json"
+
+pytestmark = pytest.mark.skipif(
+    not (TAX_BILL.exists() and PIT_REFORMS.exists()),
+    reason="parsed documents not found, run 02_parse_pdf.py first"
+)
+
+@pytest.fixture
+def chunker(tmp_path, monkeypatch):
+    """Point the chunker at a scratch directory and capture what it would save."""
+    monkeypatch.setattr(make_chunks, "PROCESSED_DIR", tmp_path)
+    monkeypatch.setattr(make_chunks, "OUTPUT_FILE", tmp_path / "chunks.jsonl")
+    monkeypatch.setattr(make_chunks, "SECTIONS_FILE", tmp_path / "sections.jsonl")
+    monkeypatch.setattr(make_chunks, "IngestManifest", lambda: IngestManifest(tmp_path / "ingest_manifest.json"))
+
+    runs = []
+
+    def save_chunks(all_chunks):
+        runs.append(all_chunks)
+        make_chunks.OUTPUT_FILE.touch()
+
+    monkeypatch.setattr(make_chunks, "save_chunks", save_chunks)
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["03_make_chunks.py", *args])
+        assert make_chunks.main() == 0
+        return runs[-1] if runs else []
+
+    return run
+
+@pytest.fixture
+def chunked(monkeypatch):
+    """Record the documents actually chunked (rather than reused)."""
+    paths = []
+    original = make_chunks.chunk_document
+
+    def chunk_document(parsed_file, **kwargs):
+        paths.append(parsed_file)
+        return original(parsed_file, **kwargs)
+
+    monkeypatch.setattr(make_chunks, "chunk_document", chunk_document)
+    return paths
+
+def document_names(chunks):
+    return {chunk["document_name"] for chunk in chunks}
+
+def test_duplicates_come_back_when_earlier_document_changes(tmp_path, chunker):
+    # b duplicates a, so every chunk of b is dropped
+    shutil.copyfile(TAX_BILL, tmp_path / "a_parsed.json")
+    shutil.copyfile(TAX_BILL, tmp_path / "b_parsed.json")
+    first = chunker()
+    assert first
+
+    # Once a changes, b's chunks are no longer duplicates
+    shutil.copyfile(PIT_REFORMS, tmp_path / "a_parsed.json")
+    incremental = chunker()
+    forced = chunker("--force")
+
+    assert [chunk["hash"] for chunk in incremental] == [chunk["hash"] for chunk in forced]
+    assert first[0]["document_name"] in document_names(incremental)
+
+def test_unchanged_documents_are_reused(tmp_path, chunker, chunked):
+    shutil.copyfile(TAX_BILL, tmp_path / "a_parsed.json")
+    shutil.copyfile(PIT_REFORMS, tmp_path / "b_parsed.json")
+    first = chunker()
+    chunked.clear()
+
+    shutil.copyfile(TAX_BILL, tmp_path / "b_parsed.json")
+    second = chunker()
+
+    assert chunked == [tmp_path / "b_parsed.json"]
+    # b is now a copy of a, so only a's chunks remain
+    a_name = first[0]["document_name"]
+    assert [chunk["hash"] for chunk in second] == [chunk["hash"] for chunk in first if chunk["document_name"] == a_name]
+
+def test_force_rechunks_documents_with_no_chunks_left(tmp_path, chunker, chunked):
+    shutil.copyfile(TAX_BILL, tmp_path / "a_parsed.json")
+    shutil.copyfile(TAX_BILL, tmp_path / "b_parsed.json")
+    chunker()
+    chunked.clear()
+    chunker("--force")
+
+    assert chunked == [tmp_path / "a_parsed.json", tmp_path / "b_parsed.json"]
+
+PAGES = [
+    {"page_number": 1, "text": "NIGERIA TAX ACT\n1. Imposition of tax\n"
+                               "Every company shall pay tax on its profits.\n\n\"profits\" means total profits;\n"},
+    {"page_number": 2, "text": "Profits are computed for each year of assessment.\n"
+                               "2. Rate of tax\nThe rate of tax shall be thirty per cent.\n"}
+]
+
+def test_section_text_is_read_back_from_pages():
+    parser = importlib.import_module("02_parse_pdf").TaxActParser(Path("act.pdf"), verbose=False)
+    definitions = [{"term": "profits", "page": 1}]
+
+    sections = parser.identify_sections(PAGES, definitions)
+
+    assert "content" not in sections[0]
+    assert [(s["page_start"], s["heading_line"]) for s in sections] == [(1, 1), (2, 1)]
+    assert definitions[0]["section_number"] == "1"
+    assert [s["content"] for s in make_chunks.iter_section_contents(PAGES, sections)] == [
+        "Every company shall pay tax on its profits.\n\"profits\" means total profits;\n"
+        "Profits are computed for each year of assessment.\n",
+        "The rate of tax shall be thirty per cent.\n"
+    ]
+
+def test_sections_are_streamed_to_document_sections_file(tmp_path):
+    text = "Every company shall pay tax on its total profits for each year of assessment. " * 12
+    pages_file = tmp_path / "act_pages.jsonl"
+    pages_file.write_text(
+        json.dumps({"type": "header", "page_count": 1}) + "\n"
+        + json.dumps({"type": "page", "page_number": 1, "text": f"1. Imposition of tax\n{text}\n"}) + "\n",
+        encoding="utf-8"
+    )
+    section = {"type": "section", "number": "1", "title": "Imposition of tax",
+               "page_start": 1, "page_end": 1, "heading_line": 0}
+    parsed_file = tmp_path / "act_parsed.json"
+    parsed_file.write_text(json.dumps({"filename": "act.pdf", "pages_file": pages_file.name, "sections": [section]}),
+                           encoding="utf-8")
+
+    chunks = make_chunks.chunk_document(parsed_file)
+
+    lines = make_chunks.sections_path(parsed_file).read_text(encoding="utf-8").splitlines()
+    record = json.loads(lines[0])
+    assert len(lines) == 1 and len(chunks) > 1
+    assert record["text"] == text.strip()
+    assert (record["section_id"], record["section_number"]) == ("act.pdf#0", "1")
+    assert [span["hash"] for span in record["chunks"]] == [chunk["hash"] for chunk in chunks]
+    for chunk in chunks:
+        assert record["text"][chunk["section_start"]:chunk["section_end"]] == chunk["text"]
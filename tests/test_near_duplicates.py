@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for MinHash/LSH near-duplicate detection (scripts/near_duplicates.py).
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from near_duplicates import (
+    MinHashLSH, format_alternate_sources, is_representative, lsh_params,
+    mark_near_duplicates, shingles
+)
+
+BASE = (
+    "Every company shall pay tax at the rate of thirty per cent on its total profits "
+    "for each year of assessment, except that a small company shall be exempt from the "
+    "tax imposed under this section where its gross turnover does not exceed fifty million "
+    "naira and its total fixed assets do not exceed two hundred and fifty million naira."
+)
+# One word changed near the end, so most shingles are shared
+NEAR_COPY = BASE.replace("two hundred and fifty", "two hundred and sixty")
+UNRELATED = (
+    "The Service shall maintain a register of taxable persons and may request any "
+    "information it considers necessary for the administration of value added tax, "
+    "including records of supplies, invoices and returns filed in previous months."
+)
+
+def chunk(text, hash_, document_name="Doc", section_number="1"):
+    return {"text": text, "hash": hash_, "document_name": document_name,
+            "section_number": section_number, "page_start": 1, "page_end": 1}
+
+def test_shingles_ignore_case_and_punctuation():
+    assert list(shingles("Tax, Rate.")) == list(shingles("tax rate"))
+    assert len(shingles("one two three four five six", size=5)) == 2
+
+def test_lsh_params_split_signature_below_threshold():
+    for threshold in (0.5, 0.85, 0.95):
+        bands, rows = lsh_params(threshold)
+        assert bands * rows == 128
+        assert (1 / bands) ** (1 / rows) <= threshold
+
+def test_signatures_are_reproducible():
+    first, second = MinHashLSH(0.85), MinHashLSH(0.85)
+    assert (first.signature(BASE) == second.signature(BASE)).all()
+
+def test_lsh_finds_near_copy_but_not_unrelated_text():
+    lsh = MinHashLSH(0.7)
+    assert lsh.add(BASE) == (0, None, 0.0)
+
+    item, match, similarity = lsh.add(NEAR_COPY)
+    assert (item, match) == (1, 0)
+    assert similarity >= 0.7
+
+    _, match, _ = lsh.add(UNRELATED)
+    assert match is None
+
+def test_mark_near_duplicates_annotates_clusters():
+    chunks = [chunk(BASE, "h1", "Act A", "12"), chunk(UNRELATED, "h2"), chunk(NEAR_COPY, "h3", "Act B", "7")]
+
+    clusters = mark_near_duplicates(chunks, 0.7)
+
+    assert len(clusters) == 1
+    assert clusters[0]["representative"]["hash"] == "h1"
+    assert chunks[2]["duplicate_of"] == "h1"
+    assert [source["hash"] for source in chunks[0]["alternate_sources"]] == ["h3"]
+    assert format_alternate_sources(chunks[0]) == "Act B s.7 p.1"
+    assert [is_representative(c) for c in chunks] == [True, True, False]
+
+def test_mark_near_duplicates_replaces_previous_marks():
+    chunks = [chunk(BASE, "h1"), chunk(NEAR_COPY, "h2")]
+    mark_near_duplicates(chunks, 0.7)
+
+    chunks[1]["text"] = UNRELATED
+    assert mark_near_duplicates(chunks, 0.7) == []
+    assert all(is_representative(c) and "alternate_sources" not in c for c in chunks)
+
+def test_zero_threshold_disables_detection():
+    chunks = [chunk(BASE, "h1"), chunk(BASE, "h2")]
+    assert mark_near_duplicates(chunks, 0) == []
+    assert all(is_representative(c) for c in chunks)
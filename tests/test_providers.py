@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the model providers (src/providers.py).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from providers import LocalProvider, ModelProvider
+from generator import AnswerGenerator
+
+CONTEXT = (
+    "\n\n[Source 1] Nigeria Tax Bill 2024 - Section 146\n"
+    "Value Added Tax shall be charged at the rate of 7.5%. Exports are zero-rated."
+    "\n\n---\n\n[Source 2] Nigeria Tax Bill 2024 - Section 1\n"
+    "This Act shall commence on 1st January 2026."
+)
+
+def test_provider_must_implement_every_method():
+    class EmbedOnly(ModelProvider):
+        def embed(self, texts, model, dimensions=None):
+            return []
+
+    with pytest.raises(TypeError):
+        EmbedOnly()
+
+@pytest.fixture
+def generator(monkeypatch):
+    monkeypatch.setenv("MODEL_PROVIDER", "local")
+    return AnswerGenerator()
+
+def test_local_answer_quotes_context_of_generator_prompt(generator):
+    prompt = generator.build_user_prompt("What is the VAT rate?", CONTEXT)
+
+    answer = LocalProvider(chat_mode="extractive").extract_answer(prompt, max_sentences=1)
+
+    assert answer == "**Answer**\n\n- Value Added Tax shall be charged at the rate of 7.5%."
+
+def test_local_answer_without_context(generator):
+    prompt = generator.build_user_prompt("What is the VAT rate?", "")
+
+    assert "does not contain" in LocalProvider().extract_answer(prompt)
+
+def test_local_embeddings_are_deterministic_unit_vectors():
+    provider = LocalProvider()
+    first, second = provider.embed(["VAT rate", "VAT rate"], "text-embedding-3-small", 64)
+
+    assert first == second
+    assert np.linalg.norm(first) == pytest.approx(1.0)
+    assert len(provider.embed(["VAT"], "text-embedding-3-small")[0]) == 1536
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for merging Acts and knowledge base results in src/retriever.py.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("chromadb")
+
+from retriever import TaxActRetriever, check_unit_length, cosine_score, faiss_metric, merge_by_score
+from token_counter import get_token_counter
+from index_versions import IndexIntegrityError
+
+def bare_retriever(max_context_tokens):
+    retriever = TaxActRetriever.__new__(TaxActRetriever)
+    retriever.token_counter = get_token_counter("text-embedding-3-small")
+    retriever.max_context_tokens = max_context_tokens
+    return retriever
+
+def passage(text, **metadata):
+    return {"text": text, "metadata": {"document_name": "Nigeria Tax Act 2025", **metadata}}
+
+def results(*distances):
+    return [{"id": f"r{i}", "distance": distance} for i, distance in enumerate(distances)]
+
+def test_cosine_score_per_metric():
+    # cos = 0.6 expressed in each metric's distance
+    assert cosine_score(0.8, "l2") == pytest.approx(0.6)
+    assert cosine_score(0.4, "cosine") == pytest.approx(0.6)
+    assert cosine_score(0.6, "inner_product") == pytest.approx(0.6)
+
+def test_faiss_metric():
+    assert faiss_metric(faiss.IndexFlatL2(4)) == "l2"
+    assert faiss_metric(faiss.IndexFlatIP(4)) == "inner_product"
+
+def test_merge_compares_collections_by_cosine():
+    acts = results(0.4, 1.0)             # cos 0.8, 0.5
+    kb = results(0.3, 0.45)              # cos 0.7, 0.55 in the cosine space
+
+    merged = merge_by_score([(acts, "l2"), (kb, "cosine")])
+
+    assert [result["score"] for result in merged] == pytest.approx([0.8, 0.7, 0.55, 0.5])
+
+def test_merge_keeps_list_order_and_limit():
+    # MMR order is not sorted by distance and must survive the merge
+    acts = results(0.2, 0.6, 0.4)
+    kb = results(0.5)
+
+    merged = merge_by_score([(acts, "l2"), (kb, "l2")], limit=3)
+
+    assert [result["distance"] for result in merged] == [0.2, 0.5, 0.6]
+
+def test_check_unit_length():
+    vectors = np.eye(3, dtype=np.float32)
+    check_unit_length("index", vectors)
+
+    with pytest.raises(IndexIntegrityError):
+        check_unit_length("index", vectors * 2)
+
+def test_fit_context_packs_formatted_context_exactly():
+    retriever = bare_retriever(0)
+    passages = [passage("Companies pay tax on profits. " * n, section_number=str(n)) for n in (30, 50, 5, 8)]
+    budget = retriever.token_counter.count(retriever.format_context([passages[0], passages[2]])) + 2
+
+    kept = retriever.fit_context(passages, budget)
+
+    assert kept == [passages[0], passages[2]]
+    assert retriever.token_counter.count(retriever.format_context(kept)) <= budget
+
+def test_recorded_count_from_another_tokenizer_is_recounted():
+    retriever = bare_retriever(0)
+    text = "Every company shall pay tax."
+    exact = retriever.token_counter.count(text)
+
+    assert retriever.recorded_token_count({"token_count": 999, "tokenizer": retriever.token_counter.name}, text) == 999
+    assert retriever.recorded_token_count({"token_count": 999, "tokenizer": "other"}, text) == exact
+    assert retriever.recorded_token_count({"token_count": 999}, text) == exact
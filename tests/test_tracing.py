@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for request tracing (src/tracing.py).
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tracing import (
+    NOOP_SPAN, JsonlTraceExporter, Tracer, current_request_id, span, traceparent
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+class MemoryExporter:
+    """Keeps exported trace records in a list."""
+
+    def __init__(self):
+        self.records = []
+
+    def export(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def exporter():
+    return MemoryExporter()
+
+def make_tracer(exporter, sample_rate=0.0):
+    return Tracer(exporter=exporter, sample_rate=sample_rate, slow_ms=0)
+
+def test_incoming_traceparent_is_continued_and_propagated(exporter):
+    tracer = make_tracer(exporter)
+    incoming = f"00-{TRACE_ID}-{PARENT_ID}-01"
+
+    with tracer.start_trace("POST /chat", traceparent=incoming.upper()) as root:
+        outgoing = traceparent(root)
+
+    assert root.trace.trace_id == TRACE_ID
+    assert root.parent_span_id == PARENT_ID
+    assert outgoing == f"00-{TRACE_ID}-{root.span_id}-01"
+    # The caller's sampled flag is honoured even with local sampling off
+    assert exporter.records[0]["export_reason"] == "sampled"
+
+def test_unsampled_traceparent_is_not_exported(exporter):
+    tracer = make_tracer(exporter)
+
+    with tracer.start_trace("POST /chat", traceparent=f"00-{TRACE_ID}-{PARENT_ID}-00") as root:
+        assert traceparent(root).endswith("-00")
+
+    assert exporter.records == []
+
+@pytest.mark.parametrize("header", [
+    None,
+    "garbage",
+    f"01-{TRACE_ID}-{PARENT_ID}-01",
+    f"00-{'0' * 32}-{PARENT_ID}-01",
+    f"00-{TRACE_ID}-{PARENT_ID[:-1]}-01"
+])
+def test_invalid_traceparent_starts_new_trace(exporter, header):
+    with make_tracer(exporter).start_trace("POST /chat", traceparent=header) as root:
+        pass
+
+    assert root.trace.trace_id != TRACE_ID
+    assert len(root.trace.trace_id) == 32
+    assert root.parent_span_id is None
+
+def test_request_id_defaults_to_trace_id(exporter):
+    tracer = make_tracer(exporter)
+
+    with tracer.start_trace("POST /chat", request_id="req-42") as root:
+        assert current_request_id() == "req-42"
+    with tracer.start_trace("POST /chat", request_id="bad id\n") as root:
+        assert current_request_id() == root.trace.trace_id
+
+    assert current_request_id() is None
+
+def test_spans_nest_under_current_span(exporter):
+    tracer = make_tracer(exporter, sample_rate=1.0)
+
+    with tracer.start_trace("POST /chat") as root:
+        with span("retriever.search", top_k=5) as search:
+            with span("retriever.embed") as embed:
+                pass
+
+    spans = {record["name"]: record for record in exporter.records[0]["spans"]}
+    assert spans["retriever.search"]["parent_span_id"] == root.span_id
+    assert spans["retriever.embed"]["parent_span_id"] == search.span_id
+    assert spans["retriever.search"]["attributes"] == {"top_k": 5}
+    assert {record["trace_id"] for record in spans.values()} == {root.trace.trace_id}
+    assert embed.end_ns is not None
+
+def test_failed_trace_is_exported_with_error(exporter):
+    tracer = make_tracer(exporter)
+
+    with pytest.raises(ValueError):
+        with tracer.start_trace("POST /chat"):
+            with span("generator.complete"):
+                raise ValueError("boom")
+
+    record = exporter.records[0]
+    assert (record["status"], record["export_reason"]) == ("ERROR", "error")
+    assert {s["status"]["code"] for s in record["spans"]} == {"ERROR"}
+
+def test_span_outside_trace_is_noop():
+    with span("retriever.search") as current:
+        assert current is NOOP_SPAN
+        current.set_attribute("top_k", 5)
+
+def test_jsonl_exporter_rotates(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonlTraceExporter(path, max_bytes=10)
+
+    exporter.export({"trace_id": "a" * 32})
+    exporter.export({"trace_id": "b" * 32})
+
+    assert json.loads(path.read_text(encoding="utf-8"))["trace_id"] == "b" * 32
+    assert json.loads(path.with_name("traces.jsonl.1").read_text(encoding="utf-8"))["trace_id"] == "a" * 32